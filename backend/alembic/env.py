@@ -0,0 +1,48 @@
+# backend/alembic/env.py
+from logging.config import fileConfig
+
+from alembic import context
+
+from api.models import Base
+from utils.db import get_engine
+
+config = context.config
+target_metadata = Base.metadata
+
+# ``init_db`` passes its own connection and has already configured logging.
+if config.config_file_name is not None and "connection" not in config.attributes:
+    fileConfig(config.config_file_name)
+
+
+def run_migrations_offline() -> None:
+    from utils.config import get_settings
+
+    context.configure(
+        url=get_settings().database_url,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        render_as_batch=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations(connection) -> None:
+    context.configure(connection=connection, target_metadata=target_metadata, render_as_batch=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        run_migrations(connection)
+        return
+    with get_engine().connect() as connection:
+        run_migrations(connection)
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,30 @@
+"""Add ensemble parent and parallelism to jobs.
+
+Revision ID: 0309d84ed942
+Revises: 29c9371c9f90
+Create Date: 2026-10-19 12:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0309d84ed942"
+down_revision = "29c9371c9f90"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("jobs") as batch:
+        batch.add_column(sa.Column("parent_id", sa.Integer(), nullable=True))
+        batch.add_column(sa.Column("parallelism", sa.Integer(), nullable=True))
+        batch.create_foreign_key("fk_jobs_parent_id_jobs", "jobs", ["parent_id"], ["id"])
+        batch.create_index("ix_jobs_parent_id", ["parent_id"])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("jobs") as batch:
+        batch.drop_index("ix_jobs_parent_id")
+        batch.drop_constraint("fk_jobs_parent_id_jobs", type_="foreignkey")
+        batch.drop_column("parallelism")
+        batch.drop_column("parent_id")
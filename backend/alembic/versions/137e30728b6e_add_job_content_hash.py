@@ -0,0 +1,25 @@
+"""Add the job content hash used to reuse identical submissions.
+
+Revision ID: 137e30728b6e
+Revises: 92771d52d845
+Create Date: 2026-10-19 12:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "137e30728b6e"
+down_revision = "92771d52d845"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("jobs", sa.Column("content_hash", sa.String(64), nullable=True))
+    op.create_index("ix_jobs_content_hash", "jobs", ["content_hash"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_jobs_content_hash", table_name="jobs")
+    with op.batch_alter_table("jobs") as batch:
+        batch.drop_column("content_hash")
@@ -0,0 +1,41 @@
+"""Create the jobs table.
+
+Revision ID: 29c9371c9f90
+Revises:
+Create Date: 2026-10-19 12:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "29c9371c9f90"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "jobs",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("type", sa.String(32), nullable=False),
+        sa.Column("status", sa.String(16), nullable=False),
+        sa.Column("parameters", sa.JSON(), nullable=False),
+        sa.Column("result", sa.JSON(), nullable=True),
+        sa.Column("logs", sa.Text(), nullable=False),
+        sa.Column("owner", sa.String(128), nullable=True),
+        sa.Column("worker_id", sa.String(128), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_jobs_status", "jobs", ["status"])
+    op.create_index("ix_jobs_owner", "jobs", ["owner"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_jobs_owner", table_name="jobs")
+    op.drop_index("ix_jobs_status", table_name="jobs")
+    op.drop_table("jobs")
@@ -0,0 +1,40 @@
+"""Add job leases and the workers table.
+
+Revision ID: 47115cd04609
+Revises: 137e30728b6e
+Create Date: 2026-10-19 12:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "47115cd04609"
+down_revision = "137e30728b6e"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("jobs", sa.Column("lease_expires_at", sa.DateTime(), nullable=True))
+    op.add_column("jobs", sa.Column("heartbeat_at", sa.DateTime(), nullable=True))
+    op.create_index("ix_jobs_lease_expires_at", "jobs", ["lease_expires_at"])
+    op.create_table(
+        "workers",
+        sa.Column("id", sa.String(128), primary_key=True),
+        sa.Column("hostname", sa.String(255), nullable=False),
+        sa.Column("pid", sa.Integer(), nullable=True),
+        sa.Column("status", sa.String(16), nullable=False),
+        sa.Column("capabilities", sa.JSON(), nullable=False),
+        sa.Column("current_job_id", sa.Integer(), nullable=True),
+        sa.Column("jobs_run", sa.Integer(), nullable=False),
+        sa.Column("started_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column("heartbeat_at", sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("workers")
+    op.drop_index("ix_jobs_lease_expires_at", table_name="jobs")
+    with op.batch_alter_table("jobs") as batch:
+        batch.drop_column("heartbeat_at")
+        batch.drop_column("lease_expires_at")
@@ -0,0 +1,23 @@
+"""Add per-job metrics.
+
+Revision ID: 92771d52d845
+Revises: 0309d84ed942
+Create Date: 2026-10-19 12:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "92771d52d845"
+down_revision = "0309d84ed942"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("jobs", sa.Column("metrics", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("jobs") as batch:
+        batch.drop_column("metrics")
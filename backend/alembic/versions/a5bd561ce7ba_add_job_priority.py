@@ -0,0 +1,23 @@
+"""Add the job priority class.
+
+Revision ID: a5bd561ce7ba
+Revises: 47115cd04609
+Create Date: 2026-10-19 12:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "a5bd561ce7ba"
+down_revision = "47115cd04609"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("jobs", sa.Column("priority", sa.String(16), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("jobs") as batch:
+        batch.drop_column("priority")
@@ -1,15 +1,238 @@
 from datetime import datetime, timedelta
-from typing import Optional, Any, Union
+from typing import Optional, Any, Union, Dict, Tuple
+from collections import OrderedDict
+import hashlib
+import json
 import logging
+import os
+import threading
+import time
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from utils.config import get_settings
+from utils.error_handlers import ConfigurationError
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/users/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/users/login", auto_error=False)
+
+# Algorithms accepted for tokens carrying a ``kid`` resolved through the JWKS.
+# HMAC is deliberately excluded so a public key can never be used as a secret.
+ASYMMETRIC_ALGORITHMS = ("RS256", "RS384", "RS512", "ES256", "ES384", "ES512", "PS256", "PS384", "PS512")
+
+
+class TokenCache:
+    """Bounded LRU of already-verified token claims.
+
+    Entries are keyed by a SHA-256 digest of the raw token (the token itself is
+    never stored) and expire together with the token's ``exp`` claim, or after
+    ``max_ttl`` seconds, whichever comes first.
+    """
+
+    def __init__(self, max_size: int = 4096, max_ttl: float = 300.0):
+        self.max_size = max_size
+        self.max_ttl = max_ttl
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def digest(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        key = self.digest(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                claims, expires_at = entry
+                if expires_at > time.time():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return claims
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, token: str, claims: Dict[str, Any]) -> None:
+        expires_at = time.time() + self.max_ttl
+        if isinstance(claims.get("exp"), (int, float)):
+            expires_at = min(expires_at, float(claims["exp"]))
+        if expires_at <= time.time():
+            return
+        key = self.digest(token)
+        with self._lock:
+            self._entries[key] = (claims, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class JWKSKeyStore:
+    """Public keys loaded from a local JWKS file, looked up by key ID.
+
+    The file is re-read when its modification time changes, so keys can be
+    rotated without restarting the service.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._keys: Dict[str, Dict[str, Any]] = {}
+        self._mtime: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _refresh(self) -> None:
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            logger.error("JWKS file not found: %s", self.path)
+            self._keys, self._mtime = {}, None
+            return
+        if mtime == self._mtime:
+            return
+        try:
+            with open(self.path, "r") as f:
+                document = json.load(f)
+            keys = {key["kid"]: key for key in document.get("keys", []) if "kid" in key}
+        except (ValueError, AttributeError, TypeError) as e:
+            raise ConfigurationError(f"JWKS file {self.path} is not a valid key set: {e}") from e
+        self._keys = keys
+        self._mtime = mtime
+        logger.info("Loaded %d key(s) from JWKS %s", len(self._keys), self.path)
+
+    def get(self, kid: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._refresh()
+            return self._keys.get(kid)
+
+
+class TokenVerifier:
+    """Verifies JWTs, consulting the validated-token cache first."""
+
+    def __init__(
+        self,
+        secret_key: str,
+        algorithm: str,
+        jwks_path: Optional[str] = None,
+        cache: Optional[TokenCache] = None,
+    ):
+        self.secret_key = secret_key
+        self.algorithm = algorithm
+        self.jwks = JWKSKeyStore(jwks_path) if jwks_path else None
+        self.cache = cache or TokenCache()
+
+    def _resolve_key(self, token: str) -> Tuple[Union[str, Dict[str, Any]], list]:
+        header = jwt.get_unverified_header(token)
+        kid = header.get("kid")
+        if kid is None:
+            return self.secret_key, [self.algorithm]
+        if self.jwks is None:
+            raise JWTError("Token has a key ID but no JWKS is configured")
+        key = self.jwks.get(kid)
+        if key is None:
+            raise JWTError(f"Unknown key ID '{kid}'")
+        algorithm = key.get("alg") or header.get("alg")
+        if algorithm not in ASYMMETRIC_ALGORITHMS:
+            raise JWTError(f"Algorithm '{algorithm}' not allowed for JWKS keys")
+        return key, [algorithm]
+
+    def verify(self, token: str) -> Dict[str, Any]:
+        claims = self.cache.get(token)
+        if claims is not None:
+            return claims
+        key, algorithms = self._resolve_key(token)
+        claims = jwt.decode(token, key, algorithms=algorithms)
+        self.cache.put(token, claims)
+        return claims
+
+
+_VERIFIER: Optional[TokenVerifier] = None
+
+def get_token_verifier() -> TokenVerifier:
+    global _VERIFIER
+    if _VERIFIER is None:
+        _VERIFIER = TokenVerifier(
+            settings.jwt_secret_key,
+            settings.jwt_algorithm,
+            jwks_path=settings.jwt_jwks_path,
+            cache=TokenCache(max_size=settings.jwt_cache_size, max_ttl=settings.jwt_cache_ttl),
+        )
+    return _VERIFIER
+
+class TokenSigner:
+    """Signs access tokens with the shared secret, or with a private key.
+
+    With a private key, tokens carry ``key_id`` as their ``kid`` so verifiers
+    only need the public half from the JWKS. The key is read once, the
+    algorithm must then be asymmetric, and a JWKS must be configured so this
+    server can verify the tokens it issues.
+    """
+
+    def __init__(
+        self,
+        secret_key: str,
+        algorithm: str,
+        private_key_path: Optional[str] = None,
+        key_id: Optional[str] = None,
+        jwks_path: Optional[str] = None,
+    ):
+        self.algorithm = algorithm
+        self.headers: Optional[Dict[str, str]] = None
+        if not private_key_path:
+            self.key = secret_key
+            return
+        if algorithm not in ASYMMETRIC_ALGORITHMS:
+            raise ConfigurationError(
+                f"JWT_PRIVATE_KEY_PATH requires an asymmetric JWT_ALGORITHM "
+                f"({', '.join(ASYMMETRIC_ALGORITHMS)}), not '{algorithm}'"
+            )
+        if not jwks_path:
+            raise ConfigurationError(
+                "JWT_PRIVATE_KEY_PATH requires JWT_JWKS_PATH with the public key, "
+                "or issued tokens cannot be verified"
+            )
+        try:
+            with open(private_key_path, "r") as f:
+                self.key = f.read()
+        except OSError as e:
+            raise ConfigurationError(f"Cannot read JWT private key {private_key_path}: {e}") from e
+        self.headers = {"kid": key_id}
+
+    def sign(self, claims: Dict[str, Any]) -> str:
+        return jwt.encode(claims, self.key, algorithm=self.algorithm, headers=self.headers)
+
+
+_SIGNER: Optional[TokenSigner] = None
+
+def get_token_signer() -> TokenSigner:
+    global _SIGNER
+    if _SIGNER is None:
+        _SIGNER = TokenSigner(
+            settings.jwt_secret_key,
+            settings.jwt_algorithm,
+            private_key_path=settings.jwt_private_key_path,
+            key_id=settings.jwt_key_id,
+            jwks_path=settings.jwt_jwks_path,
+        )
+    return _SIGNER
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -18,8 +241,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     else:
         expire = datetime.utcnow() + timedelta(days=1)
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
-    return encoded_jwt
+    return get_token_signer().sign(to_encode)
 
 async def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
     credentials_exception = HTTPException(
@@ -28,12 +250,33 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
+        payload = get_token_verifier().verify(token)
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-        
+
     # Return a stateless mock user object
-    return {"id": 101, "username": username, "email": f"{username}@stateless.delta.ai"}
\ No newline at end of file
+    return {"id": 101, "username": username, "email": f"{username}@stateless.delta.ai"}
+
+
+def is_admin(user: Optional[dict]) -> bool:
+    return bool(user) and user.get("username") in get_settings().admin_users
+
+
+async def get_admin_user(current_user: dict = Depends(get_current_user)) -> dict:
+    """The current user, who must be listed in ``ADMIN_USERS``."""
+    if not is_admin(current_user):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Administrator access required")
+    return current_user
+
+
+async def get_optional_user(token: Optional[str] = Depends(optional_oauth2_scheme)) -> Optional[dict]:
+    """Resolve the current user when a valid token is present, otherwise None."""
+    if not token:
+        return None
+    try:
+        return await get_current_user(token)
+    except HTTPException:
+        return None
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional, Any, Union
+from typing import List, Dict, Optional, Any, Sequence, Union
 import inspect
 import os
 import logging
@@ -93,19 +93,19 @@ class GeminiProvider(LLMProvider):
             logger.info("Initializing Gemini via Google AI Studio")
             self.client = genai.Client(api_key=api_key)
 
-    def _format_history(self, history: List[Dict[str, Any]]) -> List[types.Content]:
-        """Formats internal history format to Gemini content objects."""
-        formatted_contents = []
-        for msg in history:
-            role = "user" if msg.get("role") == "user" or msg.get("sender") == "user" else "model"
-            content = msg.get("content", "")
-            formatted_contents.append(
-                types.Content(
-                    role=role,
-                    parts=[types.Part.from_text(text=content)]
-                )
+    def _format_history(self, history: Sequence[Any]) -> List[types.Content]:
+        """Formats internal history format to Gemini content objects.
+
+        Accepts plain dicts or compact ``Message`` objects (and zero-copy
+        history views over them) without materialising an intermediate copy.
+        """
+        return [
+            types.Content(
+                role="user" if msg.get("role") == "user" or msg.get("sender") == "user" else "model",
+                parts=[types.Part.from_text(text=msg.get("content", ""))]
             )
-        return formatted_contents
+            for msg in history
+        ]
 
     async def generate_response(self, prompt: str, system_prompt: str) -> str:
         return await self.generate_response_with_history(prompt, system_prompt, [])
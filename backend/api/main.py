@@ -20,11 +20,30 @@ def create_app() -> FastAPI:
     async def lifespan(app: FastAPI):
         log.info("DELTA Backend Starting (Stateless Mode)...")
         
+        from .auth import get_token_signer
+        # Refuse to start with a signing key this server could not verify.
+        get_token_signer()
+
         from .services.llm_service import get_llm_service
         get_llm_service().init_vertex()
 
+        from modules.educational import get_educational_module
+        get_educational_module()
+
+        from utils.db import init_db
+        from .services.job_service import get_job_service
+        from modules.job_worker import get_worker_pool
+        init_db()
+        get_job_service().reclaim_expired()
+        worker_pool = get_worker_pool()
+        if worker_pool.size > 0:
+            worker_pool.start()
+
         yield
 
+        if worker_pool.size > 0:
+            worker_pool.stop()
+
     app = FastAPI(title="DELTA Orchestrator", lifespan=lifespan)
     register_exception_handlers(app, log)
 
@@ -39,6 +58,7 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],  # Allows all methods, including PUT
         allow_headers=["*"],  # Allows all headers
+        expose_headers=["Retry-After", "X-Series-Length", "X-Series-Layout"],
     )
 
     @app.get("/")
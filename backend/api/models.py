@@ -0,0 +1,76 @@
+# backend/api/models.py
+from sqlalchemy import JSON, Column, DateTime, ForeignKey, Integer, String, Text, func
+from sqlalchemy.orm import declarative_base
+
+Base = declarative_base()
+
+# Job lifecycle states
+JOB_PENDING = "PENDING"
+JOB_RUNNING = "RUNNING"
+JOB_COMPLETED = "COMPLETED"
+JOB_FAILED = "FAILED"
+JOB_CANCELLED = "CANCELLED"
+JOB_STALLED = "STALLED"
+
+# States a job never leaves; STALLED jobs used up their attempts.
+TERMINAL_JOB_STATES = (JOB_COMPLETED, JOB_FAILED, JOB_CANCELLED, JOB_STALLED)
+
+# Job types
+JOB_TYPE_SIMULATION = "SIMULATION"
+JOB_TYPE_ENSEMBLE = "ENSEMBLE"
+JOB_TYPE_CALIBRATION = "CALIBRATION"
+
+# Worker node states
+WORKER_ACTIVE = "ACTIVE"
+WORKER_STOPPED = "STOPPED"
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    type = Column(String(32), nullable=False, default=JOB_TYPE_SIMULATION)
+    status = Column(String(16), nullable=False, default=JOB_PENDING, index=True)
+    parameters = Column(JSON, nullable=False, default=dict)
+    result = Column(JSON, nullable=True)
+    # Phase timings, CPU, peak memory and I/O recorded by the job runner.
+    metrics = Column(JSON, nullable=True)
+    logs = Column(Text, nullable=False, default="")
+    owner = Column(String(128), nullable=True, index=True)
+    # Scheduling class (see modules.job_scheduler); NULL means "standard".
+    priority = Column(String(16), nullable=True)
+
+    # Ensemble members point at their parent; parents cap how many run at once.
+    parent_id = Column(Integer, ForeignKey("jobs.id"), nullable=True, index=True)
+    parallelism = Column(Integer, nullable=True)
+
+    # Hash of type, parameters and input versions; identical submissions reuse the job.
+    content_hash = Column(String(64), nullable=True, index=True)
+
+    # Lease held by the claiming worker; it must heartbeat before the lease expires.
+    worker_id = Column(String(128), nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True, index=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    updated_at = Column(DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+
+class Worker(Base):
+    """A worker process pulling from the shared queue, possibly on another node."""
+    __tablename__ = "workers"
+
+    id = Column(String(128), primary_key=True)
+    hostname = Column(String(255), nullable=False)
+    pid = Column(Integer, nullable=True)
+    status = Column(String(16), nullable=False, default=WORKER_ACTIVE)
+    # e.g. {"cores": 16, "domains": ["Bow_at_Banff_lumped"], "job_types": null}
+    capabilities = Column(JSON, nullable=False, default=dict)
+    current_job_id = Column(Integer, nullable=True)
+    jobs_run = Column(Integer, nullable=False, default=0)
+
+    started_at = Column(DateTime, nullable=False, server_default=func.now())
+    heartbeat_at = Column(DateTime, nullable=True)
@@ -1,26 +1,41 @@
-from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
 from ..services.chat_service import ChatService, get_chat_service
-from ..schemas import APIResponse, ChatRequest
+from ..services.summary_service import SummaryService, get_summary_service
+from ..schemas import APIResponse, ChatRequest, ConversationSummary
 import logging
-from typing import Dict
+from typing import Any, Dict, List, Optional
 
 from fastapi.responses import StreamingResponse
-from ..auth import get_current_user
+from starlette.background import BackgroundTask
+from ..auth import get_admin_user, get_current_user, get_optional_user
 from ..llm_providers import get_tts_provider
+from ..services.admission import AdmissionController, get_admission_controller
+from ..services.answer_cache import get_answer_cache
+from modules.educational import get_educational_module
+from modules.knowledge_base import KnowledgeBase, get_knowledge_base
 from utils.config import get_settings
+from utils.error_handlers import NotFoundError
 
 log = logging.getLogger(__name__)
 router = APIRouter()
 
+def _client_key(http_request: Request, current_user: Optional[dict]) -> str:
+    """Fair-share key: the JWT subject when authenticated, else the client address."""
+    if current_user:
+        return current_user["username"]
+    return f"anon:{http_request.client.host if http_request.client else 'unknown'}"
+
 @router.post("/process")
 async def process_input(
     request: ChatRequest,
     chat_service: ChatService = Depends(get_chat_service),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    admission: AdmissionController = Depends(get_admission_controller)
 ):
-    llm_response, error = await chat_service.process_user_input(
-        None, request.user_input, request.conversation_id
-    )
+    async with admission.slot(current_user["username"], "interactive"):
+        llm_response, error = await chat_service.process_user_input(
+            None, request.user_input, request.conversation_id, current_user["username"]
+        )
     if error:
         raise HTTPException(status_code=404, detail=error)
     return APIResponse(data=llm_response)
@@ -28,28 +43,81 @@ async def process_input(
 @router.post("/process_stream")
 async def process_input_stream(
     request: ChatRequest,
+    http_request: Request,
     chat_service: ChatService = Depends(get_chat_service),
     # Optional auth for easier local development/demo
-    # current_user: dict = Depends(get_current_user)
+    current_user: Optional[dict] = Depends(get_optional_user),
+    admission: AdmissionController = Depends(get_admission_controller)
 ):
     log.info(f"Stream request received for conversation {request.conversation_id}")
+    owner = _client_key(http_request, current_user)
+    ticket = await admission.acquire(owner, "interactive")
     return StreamingResponse(
-        chat_service.process_user_input_stream(None, request.user_input, request.conversation_id),
-        media_type="text/event-stream"
+        admission.guard_stream(
+            chat_service.process_user_input_stream(None, request.user_input, request.conversation_id, owner),
+            ticket
+        ),
+        media_type="text/event-stream",
+        background=BackgroundTask(admission.release, ticket)
     )
 
-@router.get("/summary/{conversation_id}", response_model=APIResponse[str])
+@router.get("/knowledge/search", response_model=APIResponse[List[Dict[str, Any]]])
+async def search_knowledge(
+    q: str = Query(..., min_length=1, max_length=500),
+    k: int = Query(default=3, ge=1, le=20),
+    knowledge_base: KnowledgeBase = Depends(get_knowledge_base),
+    current_user: dict = Depends(get_current_user)
+):
+    """Knowledge base passages ranked by BM25 for ``q``."""
+    return APIResponse(data=[
+        {"doc_id": hit.passage.doc_id, "title": hit.passage.title, "text": hit.passage.text, "score": hit.score}
+        for hit in knowledge_base.search(q, k)
+    ])
+
+@router.post("/knowledge/refresh", response_model=APIResponse[Dict[str, Any]])
+def refresh_knowledge(
+    knowledge_base: KnowledgeBase = Depends(get_knowledge_base),
+    current_user: dict = Depends(get_admin_user)
+):
+    """Re-index added, edited or deleted knowledge documents (admins only).
+
+    A plain ``def`` so the file scan and embedding run in the threadpool, off the event loop.
+    """
+    changes = knowledge_base.refresh()
+    embeddings = get_educational_module().sync_embeddings()
+    if changes["updated"] or changes["removed"]:
+        # Cached answers were grounded in the old documents.
+        get_answer_cache().clear()
+    return APIResponse(data={**changes, **knowledge_base.stats(), "embeddings": embeddings})
+
+@router.get("/summary/{conversation_id}", response_model=APIResponse[ConversationSummary])
 async def get_summary(
     conversation_id: int, 
-    chat_service: ChatService = Depends(get_chat_service),
+    summary_service: SummaryService = Depends(get_summary_service),
     current_user: dict = Depends(get_current_user)
 ):
-    return APIResponse(data="Stateless summary unavailable.")
+    key = (current_user["username"], conversation_id)
+    if not summary_service.store.exists(key):
+        raise NotFoundError(f"Conversation {conversation_id} not found")
+    # Served from the stored summary; any unsummarised tail is folded in the background.
+    summary_service.schedule_update(key, force=True)
+    stored = summary_service.get(key)
+    return APIResponse(data=ConversationSummary(
+        conversation_id=conversation_id,
+        summary=stored.text if stored else None,
+        message_count=stored.message_count if stored else 0,
+        pending_messages=summary_service.pending_messages(key),
+        updating=summary_service.is_updating(key),
+        updated_at=stored.updated_at if stored else None,
+    ))
 
 @router.post("/tts_stream")
 async def text_to_speech_stream(
     request: dict,
-    settings = Depends(get_settings)
+    http_request: Request,
+    settings = Depends(get_settings),
+    current_user: Optional[dict] = Depends(get_optional_user),
+    admission: AdmissionController = Depends(get_admission_controller)
 ):
     text = request.get("text", "")
     if not text:
@@ -59,7 +127,9 @@ async def text_to_speech_stream(
     if not tts_provider:
         raise HTTPException(status_code=501, detail="TTS provider not configured")
     
+    ticket = await admission.acquire(_client_key(http_request, current_user), "standard")
     return StreamingResponse(
-        tts_provider.generate_speech_stream(text),
-        media_type="audio/mpeg"
+        admission.guard_stream(tts_provider.generate_speech_stream(text), ticket),
+        media_type="audio/mpeg",
+        background=BackgroundTask(admission.release, ticket)
     )
@@ -1,9 +1,16 @@
 """Health check endpoint for monitoring service status."""
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 from typing import Dict, Any
 import datetime
 
+from ..auth import TokenVerifier, get_token_verifier
+from ..services.admission import AdmissionController, get_admission_controller
+from ..services.answer_cache import SemanticAnswerCache, get_answer_cache
+from ..services.conversation_store import ConversationStore, get_conversation_store
+from modules.job_worker import get_worker_pool
+from modules.workspace_cache import get_workspace_cache
+
 router = APIRouter()
 
 @router.get("/health")
@@ -13,4 +20,50 @@ async def health_check() -> Dict[str, Any]:
         "status": "healthy",
         "mode": "stateless",
         "timestamp": datetime.datetime.now().isoformat()
-    }
\ No newline at end of file
+    }
+
+@router.get("/health/admission")
+async def admission_metrics(
+    admission: AdmissionController = Depends(get_admission_controller)
+) -> Dict[str, Any]:
+    """Queue depth and admission counters for the generation endpoints."""
+    return admission.snapshot()
+
+
+@router.get("/health/conversations")
+async def conversation_memory(
+    store: ConversationStore = Depends(get_conversation_store)
+) -> Dict[str, Any]:
+    """Approximate memory held by cached conversation histories."""
+    return store.memory_stats()
+
+
+@router.get("/health/auth")
+async def auth_cache_metrics(
+    verifier: TokenVerifier = Depends(get_token_verifier)
+) -> Dict[str, Any]:
+    """Hit rate of the validated-token cache."""
+    return verifier.cache.stats()
+
+
+@router.get("/health/answer-cache")
+async def answer_cache_metrics(
+    cache: SemanticAnswerCache = Depends(get_answer_cache)
+) -> Dict[str, Any]:
+    """Per-role hits, misses and sampled false hits of the semantic answer cache."""
+    return cache.stats()
+
+
+@router.get("/health/workers")
+async def worker_pool_metrics() -> Dict[str, Any]:
+    """Job worker processes, recycling and warm versus cold job starts."""
+    return get_worker_pool().stats()
+
+
+@router.get("/health/workspace-cache")
+async def workspace_cache_metrics() -> Dict[str, Any]:
+    """Entries, size and hit counts of the prepared-workspace cache, across all job processes."""
+    cache = get_workspace_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
@@ -1,37 +1,206 @@
-from fastapi import APIRouter, HTTPException, Depends
-from ..schemas import Job, JobCreate, APIResponse
+from fastapi import APIRouter, HTTPException, Depends, Header, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
+from ..schemas import Job, JobCreate, APIResponse, QueuedJob
 from typing import List, Dict, Any, Optional
-from ..auth import get_current_user
-import datetime
+from ..auth import get_current_user, is_admin
+from ..models import JOB_TYPE_ENSEMBLE
+from ..services.job_service import JobService, get_job_service
+from ..services.job_events import JobEventBroker, get_job_event_broker
+from ..services.worker_registry import WorkerRegistry, get_worker_registry
+from modules.downsample import SeriesCache, arrow_series, downsample, get_series_cache, pack_series
+from modules.result_store import ResultStore, get_result_store
+from utils.config import get_settings
+from utils.error_handlers import ValidationError
 
 router = APIRouter()
 
+# Endpoints are sync so FastAPI runs the database calls in its threadpool
+# instead of on the event loop that serves chat streaming.
+
+def _owner_scope(current_user: dict) -> Optional[str]:
+    """The owner to restrict job access to; None lets administrators see every job."""
+    return None if is_admin(current_user) else current_user["username"]
+
 @router.post("/run_modeling", response_model=APIResponse[Dict[str, Any]])
-async def run_modeling(
+def run_modeling(
     input_data: JobCreate,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    job_service: JobService = Depends(get_job_service)
+):
+    """Queue a SIMULATION, ENSEMBLE or CALIBRATION job.
+
+    CALIBRATION jobs only support the synthetic ``synthetic_reservoir``
+    objective for now; they do not calibrate the basin model.
+    """
+    job, reused = job_service.submit(input_data, owner=current_user["username"])
+    data = {"message": "Modeling job queued", "job_id": job.id, "reused": reused, "status": job.status}
+    if reused:
+        data["message"] = f"Identical job {job.id} is already {job.status.lower()}"
+        data["result"] = job.result
+    if job.type == JOB_TYPE_ENSEMBLE:
+        data["members"] = job.parameters["members"]
+    return APIResponse(data=data)
+
+@router.get("/jobs/pending", response_model=APIResponse[List[QueuedJob]])
+def get_pending_jobs(
+    limit: int = Query(default=100, ge=1, le=1000),
+    current_user: dict = Depends(get_current_user),
+    job_service: JobService = Depends(get_job_service)
+):
+    """Running jobs, then queued jobs with their queue position and estimated start."""
+    return APIResponse(data=job_service.queue_status(limit, _owner_scope(current_user)))
+
+@router.get("/jobs/stats", response_model=APIResponse[Dict[str, Any]])
+def get_job_stats(
+    window: Optional[int] = Query(default=None, ge=1, le=100000),
+    current_user: dict = Depends(get_current_user),
+    job_service: JobService = Depends(get_job_service)
 ):
-    # Return a stateless placeholder
-    return APIResponse(data={"message": "Modeling initiated (Stateless)", "job_id": 123})
+    """Wall time, per-phase time, CPU, peak memory and I/O distributions by job type."""
+    return APIResponse(data=job_service.metrics_summary(window))
 
-@router.get("/jobs/pending", response_model=APIResponse[List[Job]])
-async def get_pending_jobs(
-    current_user: dict = Depends(get_current_user)
+@router.get("/workers", response_model=APIResponse[List[Dict[str, Any]]])
+def get_workers(
+    include_stopped: bool = False,
+    current_user: dict = Depends(get_current_user),
+    registry: WorkerRegistry = Depends(get_worker_registry)
 ):
-    return APIResponse(data=[])
+    """Workers on every node sharing this queue, with capabilities and last heartbeat."""
+    return APIResponse(data=registry.list_workers(include_stopped))
 
 @router.get("/jobs/{job_id}", response_model=APIResponse[Job])
-async def get_job(
+def get_job(
     job_id: int, 
-    current_user: dict = Depends(get_current_user)
-):
-    # Return a stateless placeholder job
-    mock_job = {
-        "id": job_id,
-        "status": "COMPLETED",
-        "type": "SIMULATION",
-        "parameters": {},
-        "created_at": datetime.datetime.now(),
-        "updated_at": datetime.datetime.now()
-    }
-    return APIResponse(data=mock_job)
\ No newline at end of file
+    current_user: dict = Depends(get_current_user),
+    job_service: JobService = Depends(get_job_service)
+):
+    return APIResponse(data=job_service.get(job_id, _owner_scope(current_user)))
+
+@router.get("/jobs/{job_id}/members", response_model=APIResponse[List[Job]])
+def get_job_members(
+    job_id: int,
+    current_user: dict = Depends(get_current_user),
+    job_service: JobService = Depends(get_job_service)
+):
+    return APIResponse(data=job_service.members(job_id, _owner_scope(current_user)))
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job_events(
+    job_id: int,
+    cursor: Optional[int] = None,
+    last_event_id: Optional[int] = Header(default=None),
+    current_user: dict = Depends(get_current_user),
+    job_service: JobService = Depends(get_job_service),
+    broker: JobEventBroker = Depends(get_job_event_broker)
+):
+    """Server-sent events with new log lines and status changes.
+
+    Resume with the standard ``Last-Event-ID`` header or ``?cursor=<id>``.
+    """
+    # 404 for unknown jobs and other users' jobs
+    await run_in_threadpool(job_service.get, job_id, _owner_scope(current_user))
+    resume_from = cursor if cursor is not None else (last_event_id or 0)
+    return StreamingResponse(
+        broker.subscribe(job_id, resume_from),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/jobs/{job_id}/cancel", response_model=APIResponse[Job])
+def cancel_job(
+    job_id: int,
+    current_user: dict = Depends(get_current_user),
+    job_service: JobService = Depends(get_job_service)
+):
+    return APIResponse(data=job_service.cancel(job_id, _owner_scope(current_user)))
+
+@router.get("/jobs/{job_id}/results", response_model=APIResponse[Dict[str, Any]])
+def get_job_results(
+    job_id: int,
+    current_user: dict = Depends(get_current_user),
+    job_service: JobService = Depends(get_job_service),
+    store: ResultStore = Depends(get_result_store)
+):
+    """Variables, HRUs and time span of a job's stored outputs."""
+    job_service.get(job_id, _owner_scope(current_user))
+    return APIResponse(data=store.open(f"job_{job_id}").describe())
+
+@router.get("/jobs/{job_id}/results/query", response_model=APIResponse[Dict[str, Any]])
+def query_job_results(
+    job_id: int,
+    variables: Optional[str] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    hru: Optional[List[str]] = Query(default=None),
+    current_user: dict = Depends(get_current_user),
+    job_service: JobService = Depends(get_job_service),
+    store: ResultStore = Depends(get_result_store)
+):
+    """Slices of stored outputs; ``variables`` is comma separated, ``hru`` may repeat."""
+    job_service.get(job_id, _owner_scope(current_user))
+    result_set = store.open(f"job_{job_id}")
+    names = [v for v in variables.split(",") if v] if variables else None
+    rows = result_set.time_slice(start, end)
+    n_values = (rows.stop - rows.start) * (len(hru) if hru else len(result_set.hru_ids)) * len(names or result_set.variables)
+    limit = get_settings().result_query_max_values
+    if n_values > limit:
+        raise ValidationError(f"Query would return {n_values} values (limit {limit}); narrow the time range or HRUs")
+
+    sliced = result_set.query(names, start, end, hru)
+    return APIResponse(data={
+        "time": sliced["time"].astype(str).tolist(),
+        "hru_ids": sliced["hru_ids"],
+        "values": {name: values.tolist() for name, values in sliced["values"].items()},
+    })
+
+@router.get("/jobs/{job_id}/results/series")
+def get_job_series(
+    job_id: int,
+    variable: str,
+    hru: Optional[str] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    width: int = Query(default=1000, ge=2, le=20000),
+    method: str = "minmax",
+    format: Optional[str] = None,
+    accept: Optional[str] = Header(default=None),
+    current_user: dict = Depends(get_current_user),
+    job_service: JobService = Depends(get_job_service),
+    store: ResultStore = Depends(get_result_store),
+    cache: SeriesCache = Depends(get_series_cache)
+):
+    """One variable/HRU downsampled to about ``width`` points for charting.
+
+    ``format`` (or the ``Accept`` header) selects ``arrow`` (Arrow IPC stream,
+    when pyarrow is installed), ``binary`` (float64 epoch milliseconds followed
+    by float32 values, little-endian; length in ``X-Series-Length``) or ``json``.
+    """
+    job_service.get(job_id, _owner_scope(current_user))
+    result_set = store.open(f"job_{job_id}")
+    key = (str(result_set.path), result_set.version, variable, hru, start, end, width, method)
+
+    times, values = cache.get_or_compute(
+        key, lambda: downsample(*result_set.series(variable, hru, start, end), width, method)
+    )
+
+    if format is None:
+        accept = accept or ""
+        format = "arrow" if "arrow" in accept else "binary" if "octet-stream" in accept else "json"
+    if format == "arrow":
+        payload = arrow_series(times, values)
+        if payload is not None:
+            return Response(payload, media_type="application/vnd.apache.arrow.stream")
+        format = "binary"
+    if format == "binary":
+        return Response(
+            pack_series(times, values),
+            media_type="application/octet-stream",
+            headers={"X-Series-Length": str(len(values)), "X-Series-Layout": "time:f8ms,value:f4"}
+        )
+    if format != "json":
+        raise ValidationError(f"Unknown series format '{format}'")
+    return APIResponse(data={
+        "time": times.astype(str).tolist(),
+        "values": values.tolist(),
+    })
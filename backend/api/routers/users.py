@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException, Depends, status
 from fastapi.security import OAuth2PasswordRequestForm
 from ..auth import create_access_token, get_current_user
+from ..services.conversation_store import ConversationStore, get_conversation_store
 from ..schemas import (
     User, 
     ConversationCreate, Conversation,
@@ -37,16 +38,17 @@ async def read_users_me(current_user: dict = Depends(get_current_user)):
 @router.post("/conversations/", response_model=APIResponse[Conversation])
 def create_conversation(
     conversation: ConversationCreate,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    store: ConversationStore = Depends(get_conversation_store)
 ):
-    # Return a stateless mock conversation
-    mock_conv = {
-        "id": 999, 
+    # Ids are allocated per user; history is keyed by (username, id).
+    created = {
+        "id": store.create(current_user["username"]),
         "user_id": current_user["id"] if isinstance(current_user, dict) else current_user.id, 
         "start_time": datetime.datetime.now(), 
         "active_mode": conversation.active_mode
     }
-    return APIResponse(data=mock_conv)
+    return APIResponse(data=created)
 
 @router.get("/conversations/", response_model=APIResponse[List[Conversation]])
 def get_conversations(
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field, ConfigDict
-from typing import List, Optional, Any, Generic, TypeVar
+from typing import List, Literal, Optional, Any, Generic, TypeVar
 from datetime import datetime
 
 T = TypeVar("T")
@@ -27,14 +27,43 @@ class Conversation(BaseModel):
     start_time: datetime
     active_mode: str
 
+class ConversationSummary(BaseModel):
+    conversation_id: int
+    summary: Optional[str] = None
+    message_count: int = 0
+    pending_messages: int = 0
+    updating: bool = False
+    updated_at: Optional[datetime] = None
+
 class JobCreate(BaseModel):
-    type: str = "SIMULATION"
+    # The job types in api.models; anything else is rejected before it is queued.
+    type: Literal["SIMULATION", "ENSEMBLE", "CALIBRATION"] = "SIMULATION"
     parameters: dict = {}
+    # Run even if an identical job is queued, running or already completed.
+    force: bool = False
+    # "interactive", "standard" or "bulk"; ensembles default to "bulk".
+    priority: Optional[str] = None
 
 class Job(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     status: str
     type: str
     parameters: dict
     created_at: datetime
-    updated_at: datetime
\ No newline at end of file
+    updated_at: datetime
+    owner: Optional[str] = None
+    result: Optional[dict] = None
+    metrics: Optional[dict] = None
+    logs: Optional[str] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    parent_id: Optional[int] = None
+    parallelism: Optional[int] = None
+    priority: Optional[str] = None
+
+class QueuedJob(Job):
+    # 1-based position among pending jobs in scheduling order; None once running.
+    queue_position: Optional[int] = None
+    estimated_start: Optional[datetime] = None
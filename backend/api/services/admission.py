@@ -0,0 +1,243 @@
+# backend/api/services/admission.py
+import asyncio
+import itertools
+import logging
+import math
+import time
+from collections import Counter, OrderedDict, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+from modules.job_scheduler import PRIORITY_CLASSES
+from utils.config import get_settings
+from utils.error_handlers import OverloadedError, ValidationError
+
+logger = logging.getLogger(__name__)
+
+_EWMA_ALPHA = 0.2
+
+
+@dataclass
+class Ticket:
+    """An admitted request slot. Release it exactly once via the controller."""
+    id: int
+    user: str
+    priority: str
+    admitted_at: float
+    released: bool = False
+
+
+@dataclass(eq=False)
+class _Waiter:
+    user: str
+    priority: str
+    enqueued_at: float
+    future: "asyncio.Future[Ticket]" = field(repr=False)
+
+
+class AdmissionController:
+    """Global concurrency limit with a bounded, fair-share wait queue.
+
+    Requests beyond ``max_concurrency`` wait in a per-priority queue. Each
+    priority class keeps one FIFO per user and dispatches between users
+    round-robin, preferring users with the fewest in-flight requests. When the
+    queue (or a user's share of it) is full the request is rejected straight
+    away with an :class:`OverloadedError` carrying a ``Retry-After`` estimate.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 16,
+        max_queue: int = 64,
+        max_queued_per_user: int = 8,
+        queue_timeout: float = 30.0,
+    ):
+        if max_concurrency < 1:
+            raise ValidationError("max_concurrency must be at least 1")
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_queued_per_user = max_queued_per_user
+        self.queue_timeout = queue_timeout
+
+        self._ids = itertools.count(1)
+        self._active = 0
+        self._active_by_user: Counter = Counter()
+        self._queued = 0
+        self._queued_by_user: Counter = Counter()
+        self._queues: Dict[str, "OrderedDict[str, Deque[_Waiter]]"] = {
+            name: OrderedDict() for name in sorted(PRIORITY_CLASSES, key=PRIORITY_CLASSES.get)
+        }
+
+        self._admitted = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._completed = 0
+        self._avg_service_time = 1.0
+        self._avg_wait_time = 0.0
+
+    # ------------------------------------------------------------------ #
+    # Public API
+    # ------------------------------------------------------------------ #
+    async def acquire(self, user: str, priority: str = "standard") -> Ticket:
+        if priority not in PRIORITY_CLASSES:
+            raise ValidationError(f"Unknown priority class '{priority}'")
+
+        if self._active < self.max_concurrency and self._queued == 0:
+            return self._admit(user, priority, waited=0.0)
+
+        if self._queued >= self.max_queue or self._queued_by_user[user] >= self.max_queued_per_user:
+            self._rejected += 1
+            retry_after = self.estimate_retry_after()
+            logger.warning(
+                "Admission rejected for %s (%s): active=%d queued=%d",
+                user, priority, self._active, self._queued,
+            )
+            raise OverloadedError(retry_after=retry_after)
+
+        waiter = _Waiter(
+            user=user,
+            priority=priority,
+            enqueued_at=time.monotonic(),
+            future=asyncio.get_running_loop().create_future(),
+        )
+        self._enqueue(waiter)
+        try:
+            return await asyncio.wait_for(asyncio.shield(waiter.future), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            if self._discard(waiter):
+                self._timed_out += 1
+                raise OverloadedError("Timed out waiting for capacity", retry_after=self.estimate_retry_after())
+            # Admitted in the same tick the timeout fired; honour the slot.
+            return waiter.future.result()
+        except asyncio.CancelledError:
+            if not self._discard(waiter) and waiter.future.done() and not waiter.future.cancelled():
+                self.release(waiter.future.result())
+            raise
+
+    def release(self, ticket: Ticket) -> None:
+        if ticket.released:
+            return
+        ticket.released = True
+        self._active -= 1
+        self._active_by_user[ticket.user] -= 1
+        if self._active_by_user[ticket.user] <= 0:
+            del self._active_by_user[ticket.user]
+        self._completed += 1
+        elapsed = time.monotonic() - ticket.admitted_at
+        self._avg_service_time += _EWMA_ALPHA * (elapsed - self._avg_service_time)
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, user: str, priority: str = "standard"):
+        ticket = await self.acquire(user, priority)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+
+    async def guard_stream(self, stream: AsyncIterator[Any], ticket: Ticket) -> AsyncIterator[Any]:
+        """Hold ``ticket`` for the lifetime of a streaming response body."""
+        try:
+            async for chunk in stream:
+                yield chunk
+        finally:
+            self.release(ticket)
+
+    def estimate_retry_after(self) -> int:
+        backlog = self._queued + 1
+        return max(1, math.ceil(backlog / self.max_concurrency * self._avg_service_time))
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "active": self._active,
+            "queued": self._queued,
+            "queued_by_priority": {
+                name: sum(len(q) for q in users.values()) for name, users in self._queues.items()
+            },
+            "active_users": len(self._active_by_user),
+            "queued_users": len(self._queued_by_user),
+            "admitted_total": self._admitted,
+            "rejected_total": self._rejected,
+            "timed_out_total": self._timed_out,
+            "completed_total": self._completed,
+            "avg_service_time_s": round(self._avg_service_time, 4),
+            "avg_wait_time_s": round(self._avg_wait_time, 4),
+        }
+
+    # ------------------------------------------------------------------ #
+    # Internals
+    # ------------------------------------------------------------------ #
+    def _admit(self, user: str, priority: str, waited: float) -> Ticket:
+        self._active += 1
+        self._active_by_user[user] += 1
+        self._admitted += 1
+        self._avg_wait_time += _EWMA_ALPHA * (waited - self._avg_wait_time)
+        return Ticket(id=next(self._ids), user=user, priority=priority, admitted_at=time.monotonic())
+
+    def _enqueue(self, waiter: _Waiter) -> None:
+        users = self._queues[waiter.priority]
+        users.setdefault(waiter.user, deque()).append(waiter)
+        self._queued += 1
+        self._queued_by_user[waiter.user] += 1
+
+    def _discard(self, waiter: _Waiter) -> bool:
+        """Remove a waiter that gave up. Returns False if it was already dispatched."""
+        users = self._queues[waiter.priority]
+        pending = users.get(waiter.user)
+        if not pending or waiter not in pending:
+            return False
+        pending.remove(waiter)
+        if not pending:
+            del users[waiter.user]
+        self._dequeued(waiter.user)
+        waiter.future.cancel()
+        return True
+
+    def _dequeued(self, user: str) -> None:
+        self._queued -= 1
+        self._queued_by_user[user] -= 1
+        if self._queued_by_user[user] <= 0:
+            del self._queued_by_user[user]
+
+    def _next_waiter(self) -> Optional[_Waiter]:
+        for users in self._queues.values():
+            if not users:
+                continue
+            # Iteration order is the round-robin order; min() keeps the first
+            # user on ties so rotation still applies between equals.
+            user = min(users, key=lambda u: self._active_by_user[u])
+            pending = users.pop(user)
+            waiter = pending.popleft()
+            if pending:
+                users[user] = pending  # re-inserted at the back of the rotation
+            self._dequeued(user)
+            return waiter
+        return None
+
+    def _dispatch(self) -> None:
+        while self._active < self.max_concurrency:
+            waiter = self._next_waiter()
+            if waiter is None:
+                return
+            if waiter.future.done():
+                continue
+            waited = time.monotonic() - waiter.enqueued_at
+            waiter.future.set_result(self._admit(waiter.user, waiter.priority, waited))
+
+
+_CONTROLLER: Optional[AdmissionController] = None
+
+def get_admission_controller() -> AdmissionController:
+    global _CONTROLLER
+    if _CONTROLLER is None:
+        settings = get_settings()
+        _CONTROLLER = AdmissionController(
+            max_concurrency=settings.admission_max_concurrency,
+            max_queue=settings.admission_max_queue,
+            max_queued_per_user=settings.admission_max_queued_per_user,
+            queue_timeout=settings.admission_queue_timeout,
+        )
+    return _CONTROLLER
@@ -0,0 +1,336 @@
+# backend/api/services/answer_cache.py
+import logging
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from modules.embeddings import Embedder, get_embedder
+from modules.knowledge_base import tokenize
+from utils.config import get_settings
+from utils.prompts import is_failed_reply
+
+logger = logging.getLogger(__name__)
+
+# Words that frame a question without changing what is asked, so
+# "explain watersheds" and "what is a watershed" share a key.
+_FRAMING = frozenset("explain describe define definition tell give overview please briefly what".split())
+# Words that change what is asked but that the tokenizer drops as stopwords.
+# Prompts only match when they agree on these, so "how does snowmelt affect
+# runoff" never gets the answer to "why does snowmelt affect runoff".
+_INTERROGATIVES = frozenset("how why when where which who whom whose whether".split())
+_NEGATIONS = frozenset("not no never nor without cannot".split())
+# Words pointing back at earlier messages; the answer depends on the conversation.
+_REFERENCES = frozenset(
+    "it its that this these those they them their he she his her one ones above previous "
+    "earlier again more else also same".split()
+)
+_WORD = re.compile(r"[a-z0-9']+")
+# Roles whose answers are general knowledge and may be shared between users;
+# answers in any other role are only ever served back to the user they were
+# generated for.
+SHARED_ROLES = frozenset({"EDUCATIONAL"})
+
+
+@dataclass
+class _Entry:
+    prompt: str
+    answer: str
+    expires_at: float
+    signature: Tuple[str, ...] = ()
+    scope: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class CacheHit:
+    """A stored answer to a similar prompt.
+
+    ``audit`` hits were sampled for checking: generate a fresh reply anyway
+    and pass it to ``SemanticAnswerCache.audit``.
+    """
+    role: str
+    user: Optional[str]
+    slot: int
+    query: str
+    prompt: str
+    answer: str
+    score: float
+    audit: bool = False
+
+
+class _RoleCache:
+    """Prompt vectors of one role in a growable matrix with LRU slot reuse."""
+
+    def __init__(self, dim: int):
+        self.vectors = np.zeros((16, dim), dtype=np.float32)
+        self.expires = np.zeros(16, dtype=np.float64)
+        # Per slot, the id of its (signature, scope) pair; -1 marks a free slot.
+        self.groups = np.full(16, -1, dtype=np.int64)
+        self.group_ids: Dict[Tuple[Tuple[str, ...], Optional[str]], int] = {}
+        self.entries: List[Optional[_Entry]] = []
+        self.lru: "OrderedDict[int, None]" = OrderedDict()
+        self.free: List[int] = []
+        self.hits = 0
+        self.misses = 0
+        self.audits = 0
+        self.false_hits = 0
+
+    def evict(self, slot: int) -> None:
+        self.entries[slot] = None
+        self.vectors[slot] = 0.0
+        self.groups[slot] = -1
+        self.lru.pop(slot, None)
+        self.free.append(slot)
+
+    def allocate(self) -> int:
+        if self.free:
+            return self.free.pop()
+        slot = len(self.entries)
+        if slot == len(self.vectors):
+            grown = np.zeros((2 * slot, self.vectors.shape[1]), dtype=np.float32)
+            grown[:slot] = self.vectors
+            self.vectors = grown
+            self.expires = np.concatenate([self.expires, np.zeros(slot, dtype=np.float64)])
+            self.groups = np.concatenate([self.groups, np.full(slot, -1, dtype=np.int64)])
+        self.entries.append(None)
+        return slot
+
+    def store(self, slot: int, entry: _Entry, vector: np.ndarray) -> None:
+        key = (entry.signature, entry.scope)
+        group = self.group_ids.setdefault(key, len(self.group_ids))
+        self.entries[slot] = entry
+        self.vectors[slot] = vector
+        self.expires[slot] = entry.expires_at
+        self.groups[slot] = group
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.audits
+        return {
+            "size": len(self.lru),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "audits": self.audits,
+            "false_hits": self.false_hits,
+            "false_hit_rate": round(self.false_hits / self.audits, 4) if self.audits else 0.0,
+        }
+
+
+class SemanticAnswerCache:
+    """LLM answers reused for prompts that mean the same thing.
+
+    Prompts are embedded after dropping question framing ("explain",
+    "describe", ...) and compared with earlier prompts of the same role that
+    ask with the same interrogatives and negation; the best match at or above
+    the role's threshold is served instead of calling the model. Each role
+    keeps at most ``max_size`` answers, evicting the least recently used, and
+    answers expire after ``ttl`` seconds.
+
+    Answers of roles outside ``SHARED_ROLES`` are scoped to the user they were
+    generated for. Callers must only use the cache for prompts without
+    conversation history (see ``LLMService``); prompts that still refer to
+    something earlier ("why is that?") are bypassed as well. A
+    ``sample_rate`` fraction of hits is audited:
+    the caller generates a fresh answer and, when it disagrees with the stored
+    one (similarity below ``agreement``), the hit counts as false and the
+    entry is replaced.
+    """
+
+    def __init__(
+        self,
+        embedder: Embedder,
+        max_size: int = 2048,
+        ttl: float = 86400.0,
+        threshold: float = 0.95,
+        thresholds: Optional[Mapping[str, float]] = None,
+        sample_rate: float = 0.0,
+        agreement: float = 0.5,
+        rng: Optional[random.Random] = None,
+    ):
+        self.embedder = embedder
+        self.max_size = max_size
+        self.ttl = ttl
+        self.threshold = threshold
+        self.thresholds = dict(thresholds or {})
+        self.sample_rate = sample_rate
+        self.agreement = agreement
+        self._rng = rng or random.Random()
+        self._roles: Dict[str, _RoleCache] = {}
+        self._lock = threading.Lock()
+        self.bypassed = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def threshold_for(self, role: str) -> float:
+        return self.thresholds.get(role, self.threshold)
+
+    @staticmethod
+    def scope(role: str, user: Optional[str]) -> Optional[str]:
+        return None if role in SHARED_ROLES else user
+
+    def bypass(self) -> None:
+        """Count a prompt the caller decided not to look up."""
+        with self._lock:
+            self.bypassed += 1
+
+    @staticmethod
+    def key_text(prompt: str) -> Optional[str]:
+        """The part of ``prompt`` that is compared, or None if it should not be cached."""
+        if _REFERENCES.intersection(_WORD.findall(prompt.lower())):
+            return None
+        terms = [term for term in tokenize(prompt) if term not in _FRAMING]
+        return " ".join(terms) or None
+
+    @staticmethod
+    def signature(prompt: str) -> Tuple[str, ...]:
+        """Interrogatives and negation of ``prompt``, which must match exactly for a hit."""
+        words = _WORD.findall(prompt.lower())
+        negated = any(w in _NEGATIONS or w.endswith("n't") for w in words)
+        return tuple(sorted(_INTERROGATIVES.intersection(words))) + (("not",) if negated else ())
+
+    def _role(self, role: str) -> _RoleCache:
+        cache = self._roles.get(role)
+        if cache is None:
+            cache = self._roles[role] = _RoleCache(self.embedder.dim)
+        return cache
+
+    def _embed(self, text: str) -> np.ndarray:
+        return np.asarray(self.embedder.embed([text])[0], dtype=np.float32)
+
+    def _best(
+        self,
+        cache: _RoleCache,
+        vector: np.ndarray,
+        signature: Tuple[str, ...],
+        scope: Optional[str],
+        now: float,
+    ) -> Optional[tuple]:
+        used = len(cache.entries)
+        groups = cache.groups[:used]
+        for slot in np.flatnonzero((groups >= 0) & (cache.expires[:used] <= now)):
+            cache.evict(int(slot))
+        group = cache.group_ids.get((signature, scope))
+        if group is None:
+            return None
+        # Only entries asked the same way, in the same scope, can match.
+        candidates = np.flatnonzero(groups == group)
+        if not candidates.size:
+            return None
+        scores = cache.vectors[candidates] @ vector
+        best = int(np.argmax(scores))
+        slot = int(candidates[best])
+        return slot, float(scores[best]), cache.entries[slot]
+
+    def get(self, role: str, prompt: str, user: Optional[str] = None) -> Optional[CacheHit]:
+        if not self.enabled:
+            return None
+        text = self.key_text(prompt)
+        if text is None:
+            self.bypass()
+            return None
+        vector = self._embed(text)
+        with self._lock:
+            cache = self._role(role)
+            best = self._best(cache, vector, self.signature(prompt), self.scope(role, user), time.time())
+            if best is None or best[1] < self.threshold_for(role):
+                cache.misses += 1
+                return None
+            slot, score, entry = best
+            cache.lru.move_to_end(slot)
+            # Audited hits are answered fresh, so they are not counted as hits.
+            audit = self._rng.random() < self.sample_rate
+            if audit:
+                cache.audits += 1
+            else:
+                cache.hits += 1
+            return CacheHit(role, user, slot, prompt, entry.prompt, entry.answer, round(score, 4), audit)
+
+    def put(self, role: str, prompt: str, answer: str, user: Optional[str] = None) -> bool:
+        """Store ``answer``; False if the prompt or the reply is not cacheable."""
+        if not self.enabled or is_failed_reply(answer):
+            return False
+        text = self.key_text(prompt)
+        if text is None:
+            return False
+        vector = self._embed(text)
+        signature = self.signature(prompt)
+        scope = self.scope(role, user)
+        now = time.time()
+        with self._lock:
+            cache = self._role(role)
+            best = self._best(cache, vector, signature, scope, now)
+            # A prompt already stored (up to rounding) replaces its own entry.
+            if best is not None and best[1] >= 0.9999:
+                slot = best[0]
+            else:
+                slot = cache.allocate()
+            cache.store(slot, _Entry(prompt, answer, now + self.ttl, signature, scope), vector)
+            cache.lru[slot] = None
+            cache.lru.move_to_end(slot)
+            while len(cache.lru) > self.max_size:
+                cache.evict(next(iter(cache.lru)))
+            return True
+
+    def audit(self, hit: CacheHit, fresh_answer: str) -> bool:
+        """Compare a sampled hit with a freshly generated answer; True if it was a false hit."""
+        if is_failed_reply(fresh_answer):
+            return False
+        stored, fresh = self.embedder.embed([hit.answer, fresh_answer])
+        false_hit = float(np.dot(stored, fresh)) < self.agreement
+        with self._lock:
+            cache = self._role(hit.role)
+            if false_hit:
+                cache.false_hits += 1
+                logger.info(
+                    "False cache hit (score %.3f): %r matched %r", hit.score, hit.query, hit.prompt
+                )
+                entry = cache.entries[hit.slot]
+                if entry is not None and entry.answer == hit.answer:
+                    cache.evict(hit.slot)
+        if false_hit:
+            self.put(hit.role, hit.query, fresh_answer, hit.user)
+        return false_hit
+
+    def clear(self) -> None:
+        with self._lock:
+            for role, cache in list(self._roles.items()):
+                fresh = _RoleCache(self.embedder.dim)
+                fresh.hits, fresh.misses = cache.hits, cache.misses
+                fresh.audits, fresh.false_hits = cache.audits, cache.false_hits
+                self._roles[role] = fresh
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "max_size": self.max_size,
+                "bypassed": self.bypassed,
+                "roles": {
+                    role: {**cache.stats(), "threshold": self.threshold_for(role)}
+                    for role, cache in self._roles.items()
+                },
+            }
+
+
+_CACHE: Optional[SemanticAnswerCache] = None
+
+def get_answer_cache() -> SemanticAnswerCache:
+    global _CACHE
+    if _CACHE is None:
+        settings = get_settings()
+        _CACHE = SemanticAnswerCache(
+            get_embedder(),
+            max_size=settings.answer_cache_size,
+            ttl=settings.answer_cache_ttl,
+            threshold=settings.answer_cache_threshold,
+            thresholds=settings.answer_cache_thresholds,
+            sample_rate=settings.answer_cache_sample_rate,
+        )
+    return _CACHE
@@ -1,48 +1,109 @@
 import logging
 from typing import List, Dict, Any, Union, Optional, Tuple
+from .conversation_store import ConversationKey, HistoryView
 from .llm_service import get_llm_service
+from utils.config import get_settings
 
 log = logging.getLogger(__name__)
 
 class ChatService:
-    def __init__(self, llm_service=None):
+    def __init__(self, llm_service=None, conversation_store=None, summary_service=None):
         from .llm_service import get_llm_service
+        from .conversation_store import get_conversation_store
+        from .summary_service import get_summary_service
         self.llm_service = llm_service or get_llm_service()
+        self.conversation_store = conversation_store or get_conversation_store()
+        self.summary_service = summary_service or get_summary_service()
+        self.history_window = get_settings().chat_history_window
+
+    def _record_exchange(self, key: ConversationKey, user_input: str, reply: str) -> None:
+        self.conversation_store.append(key, "user", user_input)
+        self.conversation_store.append(key, "assistant", reply)
+        self.summary_service.schedule_update(key)
+
+    def _remember_answer(self, user_input: str, reply: str, history: HistoryView) -> None:
+        """Keep generated explanations retrievable as references for similar questions.
+
+        Replies that drew on earlier messages are user-specific and never kept.
+        """
+        from modules.educational import get_educational_module
+
+        if history:
+            return
+        try:
+            get_educational_module().record_answer(user_input, reply)
+        except Exception as e:
+            log.warning("Could not index answer: %s", e)
+
+    def _knowledge_answer(self, user_input: str) -> Optional[str]:
+        """``/learn`` and ``/explain`` topics the knowledge base covers skip the LLM."""
+        from modules.educational import get_educational_module
+
+        try:
+            return get_educational_module().answer_command(user_input)
+        except Exception as e:
+            log.warning("Knowledge base lookup failed: %s", e)
+            return None
 
     async def process_user_input(
         self,
         db: Optional[Any], 
         user_input: str, 
-        conversation_id: int
+        conversation_id: int,
+        owner: str,
     ) -> Tuple[Optional[str], Optional[str]]:
-        # Stateless mode: no history, no persistence
-        llm_response = await self.llm_service.generate_response(user_input, history=[])
+        # History is a zero-copy window over the caller's own conversation buffer
+        key = (owner, conversation_id)
+        direct = self._knowledge_answer(user_input)
+        if direct is not None:
+            self._record_exchange(key, user_input, direct)
+            return direct, None
+        history = self.conversation_store.history(key, self.history_window)
+        llm_response = await self.llm_service.generate_response(user_input, history=history, user=owner)
         
         if isinstance(llm_response, dict):
-            return llm_response.get("text", "Task acknowledged."), None
-        return str(llm_response), None
+            reply = llm_response.get("text", "Task acknowledged.")
+        else:
+            reply = str(llm_response)
+        self._record_exchange(key, user_input, reply)
+        self._remember_answer(user_input, reply, history)
+        return reply, None
 
-    async def process_user_input_stream(self, db: Optional[Any], user_input: str, conversation_id: int):
+    async def process_user_input_stream(
+        self, db: Optional[Any], user_input: str, conversation_id: int, owner: str
+    ):
         log.info("Starting stateless stream for conversation %s", conversation_id)
         
         import json
+        key = (owner, conversation_id)
+        direct = self._knowledge_answer(user_input)
+        if direct is not None:
+            yield f"data: {json.dumps(direct)}\n\n"
+            self._record_exchange(key, user_input, direct)
+            return
         log.info("Requesting LLM stream for input: %s", user_input[:50] + "..." if len(user_input) > 50 else user_input)
+        chunks: List[str] = []
         try:
-            async for chunk in self.llm_service.generate_stream(user_input, history=[]):
+            history = self.conversation_store.history(key, self.history_window)
+            async for chunk in self.llm_service.generate_stream(user_input, history=history, user=owner):
                 if chunk:
+                    chunks.append(chunk)
                     # Safely escape the chunk using JSON
                     safe_chunk = json.dumps(chunk)
                     yield f"data: {safe_chunk}\n\n"
             
             log.info("Stream completed successfully for conversation %s", conversation_id)
+            self._record_exchange(key, user_input, "".join(chunks))
+            self._remember_answer(user_input, "".join(chunks), history)
         except Exception as e:
             log.error("LLM Stream Error: %s", e, exc_info=True)
             error_msg = json.dumps(f"Error: LLM stream failed - {str(e)}")
             yield f"data: {error_msg}\n\n"
             return
 
-    async def get_conversation_summary(self, db: Optional[Any], conversation_id: int) -> Optional[str]:
-        return "Stateless summary unavailable."
+    async def get_conversation_summary(self, db: Optional[Any], conversation_id: int, owner: str) -> Optional[str]:
+        summary = self.summary_service.get((owner, conversation_id))
+        return summary.text if summary else None
 
 _SERVICE: Optional[ChatService] = None
 
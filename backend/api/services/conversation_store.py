@@ -0,0 +1,194 @@
+# backend/api/services/conversation_store.py
+import itertools
+import logging
+import sys
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from utils.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Conversations are identified by their owner (JWT subject, or the client
+# key for anonymous requests) together with the conversation id, so ids
+# chosen by one user never reach another user's history.
+ConversationKey = Tuple[str, int]
+
+
+class Message:
+    """Compact chat message.
+
+    Uses ``__slots__`` instead of a per-instance dict, and interns ``role`` and
+    ``sender`` so the handful of distinct values are shared by every message.
+    Supports the mapping-style reads (``msg["content"]``, ``msg.get("role")``)
+    that the providers and summarizer already use for plain dict history.
+    """
+    __slots__ = ("role", "sender", "content")
+
+    def __init__(self, role: str, content: str, sender: Optional[str] = None):
+        self.role = sys.intern(role)
+        self.sender = sys.intern(sender or ("user" if role == "user" else "DELTA"))
+        self.content = content
+
+    def __getitem__(self, key: str) -> str:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default) if key in self.__slots__ else default
+
+    def to_dict(self) -> Dict[str, str]:
+        return {"role": self.role, "sender": self.sender, "content": self.content}
+
+    def nbytes(self) -> int:
+        # Interned role/sender strings are shared, so only the content is owned.
+        return sys.getsizeof(self) + sys.getsizeof(self.content)
+
+    def __repr__(self) -> str:
+        return f"Message(role={self.role!r}, content={self.content[:30]!r})"
+
+
+class HistoryView(Sequence):
+    """Read-only window over a :class:`ConversationBuffer` without copying.
+
+    The buffer is append-only, so a ``[start, stop)`` range stays valid.
+    """
+    __slots__ = ("_messages", "_start", "_stop")
+
+    def __init__(self, messages: List[Message], start: int, stop: int):
+        self._messages = messages
+        self._start = start
+        self._stop = stop
+
+    def __len__(self) -> int:
+        return self._stop - self._start
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return HistoryView(self._messages, self._start + start, self._start + max(start, stop))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("history index out of range")
+        return self._messages[self._start + index]
+
+    def __iter__(self) -> Iterator[Message]:
+        messages = self._messages
+        for i in range(self._start, self._stop):
+            yield messages[i]
+
+
+class ConversationBuffer:
+    """Append-only message log for one conversation."""
+    __slots__ = ("_messages",)
+
+    def __init__(self) -> None:
+        self._messages: List[Message] = []
+
+    def append(self, message: Message) -> int:
+        self._messages.append(message)
+        return len(self._messages)
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def window(self, start: int = 0, stop: Optional[int] = None) -> HistoryView:
+        start, stop, _ = slice(start, stop).indices(len(self._messages))
+        return HistoryView(self._messages, start, max(start, stop))
+
+    def tail(self, n: int) -> HistoryView:
+        return self.window(max(0, len(self._messages) - n))
+
+    def nbytes(self) -> int:
+        return (
+            sys.getsizeof(self)
+            + sys.getsizeof(self._messages)
+            + sum(m.nbytes() for m in self._messages)
+        )
+
+
+class ConversationStore:
+    """In-process, append-only message log per conversation.
+
+    Holds at most ``max_conversations`` buffers; the least recently used
+    conversation is dropped when the limit is exceeded, and the callbacks
+    registered with ``on_evict`` are told so they can drop derived state.
+    """
+
+    def __init__(self, max_conversations: int = 10000) -> None:
+        self.max_conversations = max_conversations
+        self._conversations: "OrderedDict[ConversationKey, ConversationBuffer]" = OrderedDict()
+        self._evict_callbacks: List[Callable[[ConversationKey], None]] = []
+        self._ids = itertools.count(1)
+
+    def on_evict(self, callback: Callable[[ConversationKey], None]) -> None:
+        self._evict_callbacks.append(callback)
+
+    def create(self, owner: str) -> int:
+        """Allocate a new conversation id for ``owner``."""
+        conversation_id = next(self._ids)
+        self._buffer((owner, conversation_id), create=True)
+        return conversation_id
+
+    def _buffer(self, key: ConversationKey, create: bool = False) -> Optional[ConversationBuffer]:
+        buffer = self._conversations.get(key)
+        if buffer is None and create:
+            buffer = self._conversations[key] = ConversationBuffer()
+            while len(self._conversations) > self.max_conversations:
+                evicted, _ = self._conversations.popitem(last=False)
+                logger.info("Evicted conversation %s from history cache", evicted)
+                for callback in self._evict_callbacks:
+                    callback(evicted)
+        if buffer is not None:
+            self._conversations.move_to_end(key)
+        return buffer
+
+    def append(self, key: ConversationKey, role: str, content: str) -> int:
+        """Append a message and return the new message count."""
+        return self._buffer(key, create=True).append(Message(role, content))
+
+    def exists(self, key: ConversationKey) -> bool:
+        return key in self._conversations
+
+    def count(self, key: ConversationKey) -> int:
+        buffer = self._conversations.get(key)
+        return len(buffer) if buffer else 0
+
+    def messages(self, key: ConversationKey, start: int = 0, stop: Optional[int] = None) -> HistoryView:
+        buffer = self._buffer(key)
+        if buffer is None:
+            return HistoryView([], 0, 0)
+        return buffer.window(start, stop)
+
+    def history(self, key: ConversationKey, limit: int) -> HistoryView:
+        """The most recent ``limit`` messages, for use as LLM context."""
+        buffer = self._buffer(key)
+        if buffer is None or limit <= 0:
+            return HistoryView([], 0, 0)
+        return buffer.tail(limit)
+
+    def memory_stats(self) -> Dict[str, Any]:
+        sizes = [buffer.nbytes() for buffer in self._conversations.values()]
+        messages = sum(len(buffer) for buffer in self._conversations.values())
+        total = sum(sizes)
+        return {
+            "conversations": len(sizes),
+            "max_conversations": self.max_conversations,
+            "messages": messages,
+            "total_bytes": total,
+            "avg_bytes_per_conversation": total // len(sizes) if sizes else 0,
+            "max_bytes_per_conversation": max(sizes, default=0),
+        }
+
+
+_STORE: Optional[ConversationStore] = None
+
+def get_conversation_store() -> ConversationStore:
+    global _STORE
+    if _STORE is None:
+        _STORE = ConversationStore(max_conversations=get_settings().chat_max_conversations)
+    return _STORE
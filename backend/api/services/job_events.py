@@ -0,0 +1,191 @@
+# backend/api/services/job_events.py
+import asyncio
+import json
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..models import Job as DBJob, TERMINAL_JOB_STATES
+from utils.config import get_settings
+from utils.db import get_session_local
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class JobEvent:
+    seq: int
+    type: str  # "log", "status", "gap" or "end"
+    data: Dict[str, Any]
+
+    def to_sse(self) -> str:
+        return f"id: {self.seq}\nevent: {self.type}\ndata: {json.dumps(self.data)}\n\n"
+
+
+class JobEventStream:
+    """Ring buffer of events for one job, shared by all of its subscribers."""
+
+    def __init__(self, job_id: int, capacity: int):
+        self.job_id = job_id
+        self.events: Deque[JobEvent] = deque(maxlen=capacity)
+        self.next_seq = 1
+        self.log_offset = 0
+        self.status: Optional[str] = None
+        self.finished = False
+        self.subscribers = 0
+        self.poller: Optional[asyncio.Task] = None
+        self.changed = asyncio.Condition()
+
+    def publish(self, type_: str, data: Dict[str, Any]) -> None:
+        self.events.append(JobEvent(self.next_seq, type_, data))
+        self.next_seq += 1
+
+    def since(self, cursor: int) -> Tuple[List[JobEvent], bool]:
+        """Events after ``cursor`` and whether some were already evicted."""
+        if not self.events:
+            return [], False
+        oldest = self.events[0].seq
+        missed = cursor + 1 < oldest
+        return [e for e in self.events if e.seq > cursor], missed
+
+
+class JobEventBroker:
+    """Tails job rows and fans new log lines and status changes out to subscribers.
+
+    One poller per watched job reads only the log text past the last offset it
+    has seen, so the cost of a job's stream is independent of its subscriber
+    count and of how long its log already is.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Session]] = None,
+        poll_interval: float = 0.5,
+        capacity: int = 1000,
+        heartbeat_interval: float = 15.0,
+        max_streams: int = 256,
+    ):
+        self.session_factory = session_factory or get_session_local()
+        self.poll_interval = poll_interval
+        self.capacity = capacity
+        self.heartbeat_interval = heartbeat_interval
+        self.max_streams = max_streams
+        self._streams: Dict[int, JobEventStream] = {}
+
+    def _read_job(self, job_id: int, offset: int) -> Optional[Tuple[str, str]]:
+        with self.session_factory() as db:
+            row = (
+                db.query(DBJob.status, func.substr(DBJob.logs, offset + 1))
+                .filter(DBJob.id == job_id)
+                .first()
+            )
+            return (row[0], row[1] or "") if row else None
+
+    async def _poll(self, stream: JobEventStream) -> None:
+        while True:
+            try:
+                row = await asyncio.to_thread(self._read_job, stream.job_id, stream.log_offset)
+            except Exception as e:
+                logger.error("Event poller for job %s failed to read: %s", stream.job_id, e)
+                row = None
+
+            if row is not None:
+                status, tail = row
+                async with stream.changed:
+                    # Only publish complete lines; a partial line waits for the next poll.
+                    complete = tail[: tail.rfind("\n") + 1]
+                    if complete:
+                        for line in complete.splitlines():
+                            stream.publish("log", {"line": line})
+                        stream.log_offset += len(complete)
+                    if status != stream.status:
+                        stream.status = status
+                        stream.publish("status", {"status": status})
+                    if status in TERMINAL_JOB_STATES:
+                        stream.publish("end", {"status": status})
+                        stream.finished = True
+                    stream.changed.notify_all()
+                if stream.finished:
+                    return
+            await asyncio.sleep(self.poll_interval)
+
+    def _acquire(self, job_id: int) -> JobEventStream:
+        stream = self._streams.get(job_id)
+        if stream is None:
+            stream = self._streams[job_id] = JobEventStream(job_id, self.capacity)
+            self._prune()
+        stream.subscribers += 1
+        if not stream.finished and (stream.poller is None or stream.poller.done()):
+            stream.poller = asyncio.create_task(self._poll(stream))
+        return stream
+
+    def _release(self, stream: JobEventStream) -> None:
+        stream.subscribers -= 1
+        if stream.subscribers > 0:
+            return
+        if stream.poller is not None and not stream.poller.done():
+            stream.poller.cancel()
+        # A new subscriber starts a fresh poller rather than waiting on this one.
+        stream.poller = None
+        self._prune()
+
+    def _prune(self) -> None:
+        # Streams without subscribers are retained so clients can resume by
+        # cursor; drop the oldest idle ones, finished or not, once over the limit.
+        excess = len(self._streams) - self.max_streams
+        if excess <= 0:
+            return
+        idle = [jid for jid, s in self._streams.items() if s.subscribers == 0]
+        for job_id in idle[:excess]:
+            del self._streams[job_id]
+
+    async def subscribe(self, job_id: int, cursor: int = 0) -> AsyncIterator[str]:
+        """Yield SSE frames for events after ``cursor`` until the job ends."""
+        stream = self._acquire(job_id)
+        try:
+            if cursor >= stream.next_seq:
+                # Cursor from a previous broker instance (e.g. before a restart).
+                cursor = 0
+            while True:
+                async with stream.changed:
+                    events, missed = stream.since(cursor)
+                    if not events and not stream.finished:
+                        try:
+                            await asyncio.wait_for(stream.changed.wait(), self.heartbeat_interval)
+                        except asyncio.TimeoutError:
+                            pass
+                        events, missed = stream.since(cursor)
+                if missed:
+                    yield JobEvent(cursor, "gap", {"resume_from": events[0].seq if events else stream.next_seq}).to_sse()
+                if not events:
+                    if stream.finished:
+                        return
+                    yield ": keep-alive\n\n"
+                    continue
+                for event in events:
+                    yield event.to_sse()
+                    cursor = event.seq
+                    if event.type == "end":
+                        return
+        finally:
+            self._release(stream)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "streams": len(self._streams),
+            "subscribers": sum(s.subscribers for s in self._streams.values()),
+            "buffered_events": sum(len(s.events) for s in self._streams.values()),
+        }
+
+
+_BROKER: Optional[JobEventBroker] = None
+
+def get_job_event_broker() -> JobEventBroker:
+    global _BROKER
+    if _BROKER is None:
+        _BROKER = JobEventBroker(poll_interval=get_settings().job_events_poll_interval)
+    return _BROKER
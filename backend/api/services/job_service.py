@@ -0,0 +1,598 @@
+# backend/api/services/job_service.py
+import datetime
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.orm import Session, aliased
+
+from ..models import (
+    Job as DBJob,
+    JOB_CANCELLED,
+    JOB_COMPLETED,
+    JOB_FAILED,
+    JOB_PENDING,
+    JOB_RUNNING,
+    JOB_STALLED,
+    JOB_TYPE_CALIBRATION,
+    JOB_TYPE_ENSEMBLE,
+    JOB_TYPE_SIMULATION,
+    TERMINAL_JOB_STATES,
+)
+from ..schemas import JobCreate, QueuedJob
+from modules.config_templates import get_template_cache, resolve_template_path
+from modules.ensemble import aggregate_members, ensemble_status, expand_ensemble
+from modules.job_dedup import input_data_version, job_content_hash
+from modules.job_metrics import aggregate
+from modules.job_scheduler import (
+    DEFAULT_JOB_SECONDS,
+    DEFAULT_PRIORITY,
+    ENSEMBLE_PRIORITY,
+    FairShareScheduler,
+    PRIORITY_CLASSES,
+    QueuedJob as ScheduledJob,
+    RunningJob,
+)
+from utils.config import get_settings
+from utils.db import get_session_local
+from utils.error_handlers import NotFoundError, ValidationError
+
+logger = logging.getLogger(__name__)
+
+
+def _epoch(moment: datetime.datetime) -> float:
+    """Seconds since the epoch of a naive UTC timestamp."""
+    return moment.replace(tzinfo=datetime.timezone.utc).timestamp()
+
+
+class JobService:
+    """Durable job queue backed by the ``jobs`` table.
+
+    The API process enqueues and reads jobs; worker processes claim them with
+    a conditional ``UPDATE`` so each job is handed to exactly one worker even
+    when several processes poll the same database.
+
+    Read and cancel methods take an ``owner``: when given, jobs belonging to
+    anyone else are reported as not found. The API passes the caller's
+    username, or None for administrators; workers pass nothing.
+    """
+
+    def __init__(self, session_factory: Optional[Callable[[], Session]] = None):
+        self.session_factory = session_factory or get_session_local()
+
+    @staticmethod
+    def scheduler() -> FairShareScheduler:
+        settings = get_settings()
+        return FairShareScheduler(settings.job_user_weights, settings.job_max_running_per_user)
+
+    @staticmethod
+    def _priority(job_in: JobCreate, default: str = DEFAULT_PRIORITY) -> str:
+        priority = job_in.priority or default
+        if priority not in PRIORITY_CLASSES:
+            raise ValidationError(f"Unknown priority class '{priority}'")
+        return priority
+
+    def content_hash(self, job_type: str, parameters: Dict[str, Any]) -> str:
+        settings = get_settings()
+        template = get_template_cache().get(resolve_template_path(settings.symfluence_code_dir))
+        data_version = input_data_version(settings.symfluence_data_dir, parameters.get("watershed"))
+        return job_content_hash(job_type, parameters, template.version, data_version)
+
+    def find_reusable(self, content_hash: str, owner: Optional[str] = None) -> Optional[DBJob]:
+        """The owner's newest job with this hash that is queued, running or completed.
+
+        Only the submitter's own jobs are reused, so a duplicate never hands
+        out another user's job id or result.
+        """
+        with self.session_factory() as db:
+            return (
+                db.query(DBJob)
+                .filter(
+                    DBJob.content_hash == content_hash,
+                    DBJob.owner.is_(None) if owner is None else DBJob.owner == owner,
+                    DBJob.status.in_((JOB_PENDING, JOB_RUNNING, JOB_COMPLETED)),
+                )
+                .order_by(DBJob.id.desc())
+                .first()
+            )
+
+    def submit(self, job_in: JobCreate, owner: Optional[str] = None) -> Tuple[DBJob, bool]:
+        """Create a job unless an identical one can be reused.
+
+        Returns the job and whether it already existed: a queued or running
+        duplicate is attached to, and a completed one returns its stored result.
+        ``force`` always creates a new job.
+        """
+        content_hash = self.content_hash(job_in.type, job_in.parameters)
+        if not job_in.force:
+            existing = self.find_reusable(content_hash, owner)
+            if existing is not None:
+                logger.info("Reusing %s job %s for %s", existing.status, existing.id, owner)
+                return existing, True
+        return self.create(job_in, owner, content_hash), False
+
+    def create(
+        self, job_in: JobCreate, owner: Optional[str] = None, content_hash: Optional[str] = None
+    ) -> DBJob:
+        if job_in.type == JOB_TYPE_ENSEMBLE:
+            return self.create_ensemble(job_in, owner, content_hash)
+        if job_in.type == JOB_TYPE_CALIBRATION:
+            from modules.calibration import CalibrationModule
+
+            # Reject a bad objective, bounds or budget now rather than as a FAILED job.
+            CalibrationModule(get_settings()).build_spec(job_in.parameters)
+        with self.session_factory() as db:
+            job = DBJob(
+                type=job_in.type,
+                status=JOB_PENDING,
+                parameters=dict(job_in.parameters),
+                logs="",
+                owner=owner,
+                priority=self._priority(job_in),
+                content_hash=content_hash or self.content_hash(job_in.type, job_in.parameters),
+            )
+            db.add(job)
+            db.commit()
+            db.refresh(job)
+            logger.info("Enqueued %s job %s for %s", job.type, job.id, owner)
+            return job
+
+    def create_ensemble(
+        self, job_in: JobCreate, owner: Optional[str] = None, content_hash: Optional[str] = None
+    ) -> DBJob:
+        """Expand an ENSEMBLE submission into queued member jobs under one parent.
+
+        The parent is never claimed by a worker; it stays RUNNING until its last
+        member finishes and then holds the aggregated summary as its result.
+        """
+        settings = get_settings()
+        template = get_template_cache().get(resolve_template_path(settings.symfluence_code_dir))
+        members = expand_ensemble(job_in.parameters, template.base, settings.ensemble_max_members)
+        parallelism = job_in.parameters.get("parallelism", settings.ensemble_parallelism)
+        if parallelism is not None:
+            try:
+                parallelism = int(parallelism)
+            except (TypeError, ValueError):
+                raise ValidationError("Ensemble parallelism must be an integer")
+            if parallelism < 1:
+                raise ValidationError("Ensemble parallelism must be positive")
+        priority = self._priority(job_in, ENSEMBLE_PRIORITY)
+
+        with self.session_factory() as db:
+            parent = DBJob(
+                type=JOB_TYPE_ENSEMBLE,
+                status=JOB_RUNNING,
+                parameters=dict(job_in.parameters, members=len(members)),
+                logs=f"Ensemble expanded into {len(members)} member runs.\n",
+                owner=owner,
+                priority=priority,
+                parallelism=parallelism,
+                started_at=datetime.datetime.utcnow(),
+                content_hash=content_hash or self.content_hash(JOB_TYPE_ENSEMBLE, job_in.parameters),
+            )
+            db.add(parent)
+            db.flush()
+            db.add_all([
+                DBJob(
+                    type=JOB_TYPE_SIMULATION,
+                    status=JOB_PENDING,
+                    parameters=member,
+                    logs="",
+                    owner=owner,
+                    priority=priority,
+                    parent_id=parent.id,
+                    content_hash=self.content_hash(JOB_TYPE_SIMULATION, member),
+                )
+                for member in members
+            ])
+            db.commit()
+            db.refresh(parent)
+            logger.info("Enqueued ensemble job %s with %d members for %s", parent.id, len(members), owner)
+            return parent
+
+    @staticmethod
+    def _owned(job: Optional[DBJob], job_id: int, owner: Optional[str]) -> DBJob:
+        if job is None or (owner is not None and job.owner != owner):
+            raise NotFoundError(f"Job {job_id} not found")
+        return job
+
+    def members(self, parent_id: int, owner: Optional[str] = None) -> List[DBJob]:
+        with self.session_factory() as db:
+            self._owned(db.get(DBJob, parent_id), parent_id, owner)
+            return db.query(DBJob).filter(DBJob.parent_id == parent_id).order_by(DBJob.id).all()
+
+    def get(self, job_id: int, owner: Optional[str] = None) -> DBJob:
+        with self.session_factory() as db:
+            return self._owned(db.get(DBJob, job_id), job_id, owner)
+
+    def is_cancelled(self, job_id: int) -> bool:
+        with self.session_factory() as db:
+            status = db.query(DBJob.status).filter(DBJob.id == job_id).scalar()
+            return status == JOB_CANCELLED
+
+    def list_pending(self, owner: Optional[str] = None, limit: int = 100) -> List[DBJob]:
+        with self.session_factory() as db:
+            query = db.query(DBJob).filter(DBJob.status.in_((JOB_PENDING, JOB_RUNNING)))
+            if owner is not None:
+                query = query.filter(DBJob.owner == owner)
+            return query.order_by(DBJob.created_at, DBJob.id).limit(limit).all()
+
+    def queue_status(self, limit: int = 100, owner: Optional[str] = None) -> List[QueuedJob]:
+        """Running jobs, then pending jobs in the order the scheduler will start them.
+
+        Start times replay the scheduler over the live workers, using each job
+        type's mean run time from recent metrics. With ``owner`` only that
+        user's jobs are listed, still with their position in the whole queue.
+        """
+        from .worker_registry import WorkerRegistry
+
+        now = datetime.datetime.utcnow()
+        durations = {
+            job_type: entry["wall_seconds"]["mean"]
+            for job_type, entry in self.metrics_summary()["types"].items()
+            if "wall_seconds" in entry
+        }
+        slots = sum(1 for w in WorkerRegistry(self.session_factory).list_workers() if w["alive"])
+        with self.session_factory() as db:
+            running = (
+                db.query(DBJob)
+                .filter(DBJob.status == JOB_RUNNING, DBJob.type != JOB_TYPE_ENSEMBLE)
+                .order_by(DBJob.started_at, DBJob.id)
+                .all()
+            )
+            pending = [
+                ScheduledJob(job_id, owner, priority, job_type, parent_id)
+                for job_id, owner, priority, job_type, parent_id in db.query(
+                    DBJob.id, DBJob.owner, DBJob.priority, DBJob.type, DBJob.parent_id
+                )
+                .filter(DBJob.status == JOB_PENDING)
+                .order_by(DBJob.created_at, DBJob.id)
+            ]
+            parent_caps = dict(
+                db.query(DBJob.id, DBJob.parallelism)
+                .filter(DBJob.type == JOB_TYPE_ENSEMBLE, DBJob.status == JOB_RUNNING, DBJob.parallelism.isnot(None))
+                .all()
+            )
+            last_started = self._last_started(db)
+            plan = self.scheduler().plan(
+                pending,
+                [
+                    RunningJob(
+                        job.owner,
+                        durations.get(job.type, DEFAULT_JOB_SECONDS) - (now - (job.started_at or now)).total_seconds(),
+                        job.parent_id,
+                    )
+                    for job in running
+                ],
+                slots,
+                durations,
+                last_started,
+                parent_caps,
+                now=_epoch(now),
+            )
+            if owner is not None:
+                running = [job for job in running if job.owner == owner]
+                plan = {job.id: plan[job.id] for job in pending if job.owner == owner}
+            upcoming = sorted(plan, key=lambda job_id: plan[job_id][0])[: max(limit - len(running), 0)]
+            jobs = {job.id: job for job in db.query(DBJob).filter(DBJob.id.in_(upcoming))}
+
+        queue = [QueuedJob.model_validate(job) for job in running[:limit]]
+        for job_id in upcoming:
+            position, seconds = plan[job_id]
+            queue.append(QueuedJob.model_validate(jobs[job_id]).model_copy(update={
+                "queue_position": position,
+                "estimated_start": None if seconds is None else now + datetime.timedelta(seconds=seconds),
+            }))
+        return queue
+
+    def metrics_summary(self, window: Optional[int] = None) -> Dict[str, Any]:
+        """Resource metrics aggregated by job type over the most recent finished jobs."""
+        window = window or get_settings().job_stats_window
+        with self.session_factory() as db:
+            rows = (
+                db.query(DBJob.type, DBJob.metrics)
+                .filter(DBJob.metrics.isnot(None))
+                .order_by(DBJob.finished_at.desc(), DBJob.id.desc())
+                .limit(window)
+                .all()
+            )
+        return {"window": window, "types": aggregate({"type": t, "metrics": m} for t, m in rows)}
+
+    def cancel(self, job_id: int, owner: Optional[str] = None) -> DBJob:
+        with self.session_factory() as db:
+            job = self._owned(db.get(DBJob, job_id), job_id, owner)
+            if job.status in TERMINAL_JOB_STATES:
+                raise ValidationError(f"Job {job_id} is already {job.status}")
+            now = datetime.datetime.utcnow()
+            job.status = JOB_CANCELLED
+            job.finished_at = now
+            if job.type == JOB_TYPE_ENSEMBLE:
+                db.execute(
+                    update(DBJob)
+                    .where(DBJob.parent_id == job_id, DBJob.status.notin_(TERMINAL_JOB_STATES))
+                    .values(status=JOB_CANCELLED, finished_at=now)
+                    .execution_options(synchronize_session=False)
+                )
+            db.commit()
+            if job.parent_id is not None:
+                self._complete_ensemble(db, job.parent_id)
+            db.refresh(job)
+        if job.type == JOB_TYPE_CALIBRATION:
+            self._remove_checkpoints([job_id])
+        return job
+
+    # ------------------------------------------------------------------ #
+    # Worker-side operations
+    # ------------------------------------------------------------------ #
+    def claim_next(
+        self,
+        worker_id: str,
+        capabilities: Optional[Dict[str, Any]] = None,
+        lease_seconds: Optional[float] = None,
+    ) -> Optional[int]:
+        """Atomically lease the pending job the fair-share scheduler picks next.
+
+        Only the oldest eligible job of each user in each priority class is a
+        candidate (see ``FairShareScheduler``). Ensemble members are skipped
+        while their parent already has ``parallelism`` members running.
+        ``capabilities`` may restrict the worker to some ``job_types`` and to
+        simulations of some ``domains``. The lease lasts ``lease_seconds`` and
+        is extended by ``heartbeat``.
+        """
+        scheduler = self.scheduler()
+        parent = aliased(DBJob)
+        sibling = aliased(DBJob)
+        running_siblings = (
+            select(func.count(sibling.id))
+            .where(sibling.parent_id == DBJob.parent_id, sibling.status == JOB_RUNNING)
+            .scalar_subquery()
+        )
+        parent_cap = select(parent.parallelism).where(parent.id == DBJob.parent_id).scalar_subquery()
+        within_cap = or_(DBJob.parent_id.is_(None), parent_cap.is_(None), running_siblings < parent_cap)
+        eligible = [DBJob.status == JOB_PENDING, within_cap]
+        capabilities = capabilities or {}
+        if capabilities.get("job_types"):
+            eligible.append(DBJob.type.in_(capabilities["job_types"]))
+        if capabilities.get("domains"):
+            watershed = DBJob.parameters["watershed"].as_string()
+            eligible.append(or_(DBJob.type != JOB_TYPE_SIMULATION, watershed.in_(capabilities["domains"])))
+        claimable = list(eligible)
+        if scheduler.max_running_per_user:
+            owner_running = aliased(DBJob)
+            claimable.append(
+                select(func.count(owner_running.id))
+                .where(
+                    owner_running.owner == DBJob.owner,
+                    owner_running.status == JOB_RUNNING,
+                    owner_running.type != JOB_TYPE_ENSEMBLE,
+                )
+                .scalar_subquery()
+                < scheduler.max_running_per_user
+            )
+        lease = datetime.timedelta(seconds=lease_seconds or get_settings().job_lease_seconds)
+
+        skipped: List[int] = []
+        with self.session_factory() as db:
+            while True:
+                heads = [
+                    ScheduledJob(job_id, owner, priority)
+                    for owner, priority, job_id in db.query(DBJob.owner, DBJob.priority, func.min(DBJob.id))
+                    .filter(*eligible, DBJob.id.notin_(skipped))
+                    .group_by(DBJob.owner, DBJob.priority)
+                ]
+                running = dict(
+                    db.query(DBJob.owner, func.count(DBJob.id))
+                    .filter(DBJob.status == JOB_RUNNING, DBJob.type != JOB_TYPE_ENSEMBLE)
+                    .group_by(DBJob.owner)
+                    .all()
+                )
+                chosen = scheduler.choose(heads, running, self._last_started(db))
+                if chosen is None:
+                    return None
+                if db.get_bind().dialect.name == "postgresql":
+                    # Concurrent nodes skip a row another claim is holding instead of colliding.
+                    locked = (
+                        db.query(DBJob.id).filter(DBJob.id == chosen.id).with_for_update(skip_locked=True).scalar()
+                    )
+                    if locked is None:
+                        skipped.append(chosen.id)
+                        db.rollback()
+                        continue
+                now = datetime.datetime.utcnow()
+                claimed = db.execute(
+                    update(DBJob)
+                    .where(DBJob.id == chosen.id, *claimable)
+                    .values(
+                        status=JOB_RUNNING,
+                        worker_id=worker_id,
+                        attempts=DBJob.attempts + 1,
+                        started_at=now,
+                        heartbeat_at=now,
+                        lease_expires_at=now + lease,
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+                db.commit()
+                if claimed.rowcount == 1:
+                    logger.info(
+                        "Worker %s claimed %s job %s of %s",
+                        worker_id, chosen.priority or DEFAULT_PRIORITY, chosen.id, chosen.owner,
+                    )
+                    return chosen.id
+                # Another worker won the race; choose again.
+                skipped.append(chosen.id)
+
+    @staticmethod
+    def _last_started(db: Session) -> Dict[Optional[str], float]:
+        """When each user last had a job started, for round-robin tie-breaking."""
+        return {
+            owner: _epoch(started)
+            for owner, started in db.query(DBJob.owner, func.max(DBJob.started_at))
+            .filter(DBJob.type != JOB_TYPE_ENSEMBLE, DBJob.started_at.isnot(None))
+            .group_by(DBJob.owner)
+        }
+
+    def heartbeat(self, job_id: int, worker_id: str, lease_seconds: Optional[float] = None) -> bool:
+        """Extend ``worker_id``'s lease on a running job; False once the lease is gone.
+
+        The lease is gone when the job was cancelled or finished, or when it
+        expired and another worker reclaimed it.
+        """
+        now = datetime.datetime.utcnow()
+        lease = datetime.timedelta(seconds=lease_seconds or get_settings().job_lease_seconds)
+        with self.session_factory() as db:
+            result = db.execute(
+                update(DBJob)
+                .where(DBJob.id == job_id, DBJob.worker_id == worker_id, DBJob.status == JOB_RUNNING)
+                .values(heartbeat_at=now, lease_expires_at=now + lease)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            return result.rowcount == 1
+
+    def finalize(
+        self,
+        job_id: int,
+        reason: Optional[str] = None,
+        metrics: Optional[Dict[str, Any]] = None,
+        worker_id: Optional[str] = None,
+    ) -> None:
+        """Record completion time and metrics; a job still RUNNING after execution failed silently.
+
+        With ``worker_id``, a job whose lease has passed to another worker is left alone.
+        """
+        with self.session_factory() as db:
+            job = db.get(DBJob, job_id)
+            if job is None:
+                return
+            if worker_id is not None and job.worker_id != worker_id and job.status not in TERMINAL_JOB_STATES:
+                logger.warning("Job %s is now leased by %s; not finalizing for %s", job_id, job.worker_id, worker_id)
+                return
+            if job.status == JOB_RUNNING:
+                job.status = JOB_FAILED
+                reason = reason or "Worker finished without reporting a final status."
+                job.logs = (job.logs or "") + f"ERROR: {reason}\n"
+            job.finished_at = job.finished_at or datetime.datetime.utcnow()
+            job.lease_expires_at = None
+            if metrics:
+                job.metrics = metrics
+            db.commit()
+            if job.parent_id is not None:
+                self._complete_ensemble(db, job.parent_id)
+
+    def _complete_ensemble(self, db: Session, parent_id: int) -> None:
+        """Aggregate an ensemble once none of its members can still run."""
+        unfinished = (
+            db.query(func.count(DBJob.id))
+            .filter(DBJob.parent_id == parent_id, DBJob.status.notin_(TERMINAL_JOB_STATES))
+            .scalar()
+        )
+        if unfinished:
+            return
+        members = db.query(DBJob).filter(DBJob.parent_id == parent_id).all()
+        summary = aggregate_members(members)
+        # Conditional on RUNNING so concurrent finishers (or a cancel) write it once.
+        db.execute(
+            update(DBJob)
+            .where(DBJob.id == parent_id, DBJob.status == JOB_RUNNING)
+            .values(
+                status=ensemble_status(summary),
+                result=summary,
+                finished_at=datetime.datetime.utcnow(),
+                logs=DBJob.logs + f"Ensemble finished: {summary['status_counts']}\n",
+            )
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+
+    def requeue(self, job_id: int, reason: str, worker_id: Optional[str] = None) -> bool:
+        """Return an interrupted RUNNING job to the queue; it resumes from its checkpoint."""
+        owned = [DBJob.id == job_id, DBJob.status == JOB_RUNNING]
+        if worker_id is not None:
+            owned.append(DBJob.worker_id == worker_id)
+        with self.session_factory() as db:
+            result = db.execute(
+                update(DBJob)
+                .where(*owned)
+                .values(
+                    status=JOB_PENDING,
+                    worker_id=None,
+                    lease_expires_at=None,
+                    logs=func.coalesce(DBJob.logs, "") + f"{reason}\n",
+                )
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            return result.rowcount == 1
+
+    def reclaim_expired(
+        self,
+        max_attempts: Optional[int] = None,
+        now: Optional[datetime.datetime] = None,
+    ) -> Dict[str, int]:
+        """Recover RUNNING jobs whose worker stopped renewing its lease.
+
+        Jobs with attempts left go back to the queue and resume from their
+        checkpoint; the rest are marked STALLED. Rows without a lease (from
+        before leases existed) count as expired. Safe to run from any node.
+        """
+        max_attempts = max_attempts or get_settings().job_max_attempts
+        now = now or datetime.datetime.utcnow()
+        lapsed = [
+            DBJob.status == JOB_RUNNING,
+            DBJob.type != JOB_TYPE_ENSEMBLE,
+            or_(DBJob.lease_expires_at.is_(None), DBJob.lease_expires_at < now),
+        ]
+        with self.session_factory() as db:
+            requeued = db.execute(
+                update(DBJob)
+                .where(*lapsed, DBJob.attempts < max_attempts)
+                .values(
+                    status=JOB_PENDING,
+                    worker_id=None,
+                    lease_expires_at=None,
+                    logs=func.coalesce(DBJob.logs, "")
+                    + "Worker lease expired; resuming from the last checkpoint.\n",
+                )
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            stalled_rows = db.query(DBJob.id, DBJob.type, DBJob.parent_id).filter(*lapsed).all()
+            stalled = db.execute(
+                update(DBJob)
+                .where(*lapsed)
+                .values(
+                    status=JOB_STALLED,
+                    lease_expires_at=None,
+                    finished_at=now,
+                    logs=func.coalesce(DBJob.logs, "")
+                    + f"ERROR: Worker lease expired after {max_attempts} attempt(s); job stalled.\n",
+                )
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            db.commit()
+            for parent_id in sorted({row.parent_id for row in stalled_rows if row.parent_id is not None}):
+                self._complete_ensemble(db, parent_id)
+        self._remove_checkpoints([row.id for row in stalled_rows if row.type == JOB_TYPE_CALIBRATION])
+        if requeued or stalled:
+            logger.warning("Reclaimed expired leases: %d requeued, %d stalled", requeued, stalled)
+        return {"requeued": requeued, "stalled": stalled}
+
+    @staticmethod
+    def _remove_checkpoints(job_ids: List[int]) -> None:
+        """Drop the search state of calibrations that can no longer resume."""
+        if not job_ids:
+            return
+        from modules.calibration import remove_checkpoint
+
+        checkpoint_dir = get_settings().calibration_checkpoint_dir
+        for job_id in job_ids:
+            remove_checkpoint(checkpoint_dir, job_id)
+
+
+_SERVICE: Optional[JobService] = None
+
+def get_job_service() -> JobService:
+    global _SERVICE
+    if _SERVICE is None:
+        _SERVICE = JobService()
+    return _SERVICE
@@ -1,17 +1,19 @@
 # backend/api/services/llm_service.py
 import logging
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Sequence, Union
 
 from utils.config import get_settings
 from utils.google_utils import get_credentials
 from utils.prompts import DELTA_SYSTEM_PROMPT, EDUCATIONAL_GUIDE_PROMPT
 from ..llm_providers import get_llm_provider
+from .answer_cache import CacheHit, SemanticAnswerCache, get_answer_cache
 
 logger = logging.getLogger(__name__)
 
 class LLMService:
-    def __init__(self) -> None:
+    def __init__(self, answer_cache: Optional[SemanticAnswerCache] = None) -> None:
         self._provider = None
+        self._answer_cache = answer_cache
 
     def init_vertex(self) -> bool:
         # No-op for streamlined stateless mode unless explicitly needed
@@ -23,57 +25,141 @@ class LLMService:
             self._provider = get_llm_provider(settings)
         return self._provider
 
+    @property
+    def answer_cache(self) -> SemanticAnswerCache:
+        if self._answer_cache is None:
+            self._answer_cache = get_answer_cache()
+        return self._answer_cache
+
+    def _cached_answer(
+        self, user_input: str, role: str, history: Optional[Sequence[Any]], user: Optional[str]
+    ) -> Optional[CacheHit]:
+        """A stored answer for a prompt that starts a conversation.
+
+        Answers depend on the conversation so far, so prompts with history
+        are neither looked up nor stored.
+        """
+        try:
+            if history:
+                self.answer_cache.bypass()
+                return None
+            return self.answer_cache.get(role, user_input, user)
+        except Exception as e:
+            logger.warning("Answer cache lookup failed: %s", e)
+            return None
+
+    def _cache_answer(
+        self,
+        user_input: str,
+        role: str,
+        history: Optional[Sequence[Any]],
+        user: Optional[str],
+        hit: Optional[CacheHit],
+        answer: str,
+    ) -> None:
+        """Store a fresh answer, or check it against the sampled hit it was generated for."""
+        if history:
+            return
+        try:
+            if hit is not None:
+                self.answer_cache.audit(hit, answer)
+            else:
+                self.answer_cache.put(role, user_input, answer, user)
+        except Exception as e:
+            logger.warning("Could not cache answer: %s", e)
+
+    def system_prompt(self, user_input: str, role: str = "DELTA") -> str:
+        """The role's prompt; educational questions also get knowledge base passages."""
+        from modules.educational import TOPIC_COMMANDS, get_educational_module
+
+        if role == "DELTA" and not user_input.lstrip().lower().startswith(TOPIC_COMMANDS):
+            return DELTA_SYSTEM_PROMPT
+        base = DELTA_SYSTEM_PROMPT if role == "DELTA" else EDUCATIONAL_GUIDE_PROMPT
+        try:
+            return base + get_educational_module().grounding(user_input)
+        except Exception as e:
+            logger.warning("Knowledge base lookup failed: %s", e)
+            return base
+
     async def generate_response(
         self,
         user_input: str,
         role: str = "DELTA",
-        history: Optional[List[Dict[str, Any]]] = None,
+        history: Optional[Sequence[Any]] = None,
+        user: Optional[str] = None,
     ) -> Union[str, Dict[str, Any]]:
-        system_prompt = (
-            DELTA_SYSTEM_PROMPT if role == "DELTA" else EDUCATIONAL_GUIDE_PROMPT
-        )
+        hit = self._cached_answer(user_input, role, history, user)
+        if hit is not None and not hit.audit:
+            return hit.answer
+        system_prompt = self.system_prompt(user_input, role)
         provider = self._get_provider()
 
         if hasattr(provider, "generate_response_with_history"):
-            return await provider.generate_response_with_history(
+            response = await provider.generate_response_with_history(
                 user_input,
                 system_prompt,
                 history or [],
                 tools=None,
             )
-        return await provider.generate_response(user_input, system_prompt)
+        else:
+            response = await provider.generate_response(user_input, system_prompt)
+        # Tool calls come back as dicts and are never reused.
+        if isinstance(response, str):
+            self._cache_answer(user_input, role, history, user, hit, response)
+        return response
 
     async def generate_stream(
         self,
         user_input: str,
         role: str = "DELTA",
-        history: Optional[List[Dict[str, Any]]] = None,
+        history: Optional[Sequence[Any]] = None,
+        user: Optional[str] = None,
     ):
-        system_prompt = (
-            DELTA_SYSTEM_PROMPT if role == "DELTA" else EDUCATIONAL_GUIDE_PROMPT
-        )
+        hit = self._cached_answer(user_input, role, history, user)
+        if hit is not None and not hit.audit:
+            yield hit.answer
+            return
+        system_prompt = self.system_prompt(user_input, role)
         provider = self._get_provider()
 
         if hasattr(provider, "generate_response_stream_with_history"):
-            async for chunk in provider.generate_response_stream_with_history(
-                user_input, system_prompt, history or []
-            ):
-                yield chunk
+            stream = provider.generate_response_stream_with_history(user_input, system_prompt, history or [])
         else:
-            async for chunk in provider.generate_response_stream(user_input, system_prompt):
-                yield chunk
+            stream = provider.generate_response_stream(user_input, system_prompt)
+        chunks: List[str] = []
+        async for chunk in stream:
+            if chunk:
+                chunks.append(chunk)
+            yield chunk
+        self._cache_answer(user_input, role, history, user, hit, "".join(chunks))
 
     async def generate_summary_from_messages(
-        self, messages: List[Dict[str, str]]
+        self, messages: Sequence[Any]
+    ) -> str:
+        return await self.generate_incremental_summary(None, messages)
+
+    async def generate_incremental_summary(
+        self, previous_summary: Optional[str], messages: Sequence[Any]
     ) -> str:
+        """Fold ``messages`` into ``previous_summary`` (or summarize from scratch)."""
         formatted_messages = "\n".join(
-            [f"{msg['sender']}: {msg['content']}" for msg in messages]
-        )
-        prompt = (
-            "Please provide a concise scientific summary of the following conversation, "
-            "highlighting key hydrological insights and action items:\n\n"
-            f"{formatted_messages}\n\nSummary:"
+            f"{msg['sender']}: {msg['content']}" for msg in messages
         )
+        if previous_summary:
+            prompt = (
+                "Below is the running summary of a conversation followed by the new messages "
+                "exchanged since it was written. Update the summary so it also covers the new "
+                "messages, keeping it concise and highlighting key hydrological insights and "
+                "action items:\n\n"
+                f"Current summary:\n{previous_summary}\n\n"
+                f"New messages:\n{formatted_messages}\n\nUpdated summary:"
+            )
+        else:
+            prompt = (
+                "Please provide a concise scientific summary of the following conversation, "
+                "highlighting key hydrological insights and action items:\n\n"
+                f"{formatted_messages}\n\nSummary:"
+            )
         provider = self._get_provider()
         return await provider.generate_response(
             prompt, "You are a professional hydrological research summarizer."
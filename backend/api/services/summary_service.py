@@ -0,0 +1,116 @@
+# backend/api/services/summary_service.py
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Optional
+
+from .conversation_store import ConversationKey, ConversationStore, get_conversation_store
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class StoredSummary:
+    text: str
+    message_count: int
+    updated_at: datetime
+
+
+class SummaryService:
+    """Maintains a rolling summary per conversation.
+
+    Reads are served from the stored summary. Whenever new messages arrive a
+    background task folds only the unsummarised tail into the previous summary,
+    so each message is sent to the LLM once instead of on every request.
+
+    Summaries live only as long as their conversation's buffer: when the
+    store evicts a conversation its summary goes too, which also bounds
+    ``_summaries`` by the store's ``max_conversations``.
+    """
+
+    def __init__(
+        self,
+        store: Optional[ConversationStore] = None,
+        llm_service=None,
+        min_batch: int = 2,
+    ):
+        from .llm_service import get_llm_service
+        self.store = store or get_conversation_store()
+        self.llm_service = llm_service or get_llm_service()
+        self.min_batch = min_batch
+        self._summaries: Dict[ConversationKey, StoredSummary] = {}
+        self._tasks: Dict[ConversationKey, asyncio.Task] = {}
+        self.store.on_evict(self.forget)
+
+    def forget(self, key: ConversationKey) -> None:
+        """Drop the summary of a conversation whose messages are gone."""
+        self._summaries.pop(key, None)
+        task = self._tasks.pop(key, None)
+        if task is not None:
+            task.cancel()
+
+    def get(self, key: ConversationKey) -> Optional[StoredSummary]:
+        return self._summaries.get(key)
+
+    def pending_messages(self, key: ConversationKey) -> int:
+        summary = self._summaries.get(key)
+        count = self.store.count(key)
+        if summary is None or summary.message_count > count:
+            return count
+        return count - summary.message_count
+
+    def is_updating(self, key: ConversationKey) -> bool:
+        task = self._tasks.get(key)
+        return task is not None and not task.done()
+
+    def schedule_update(self, key: ConversationKey, force: bool = False) -> Optional[asyncio.Task]:
+        """Start a background fold if enough new messages have accumulated."""
+        if self.is_updating(key):
+            return self._tasks[key]
+        pending = self.pending_messages(key)
+        if pending <= 0 or (pending < self.min_batch and not force):
+            return None
+        task = asyncio.create_task(self._update(key))
+        self._tasks[key] = task
+        task.add_done_callback(lambda t, k=key: self._tasks.pop(k, None) if self._tasks.get(k) is t else None)
+        return task
+
+    async def _update(self, key: ConversationKey) -> None:
+        # Loop until caught up so messages appended mid-update are folded too.
+        while True:
+            previous = self._summaries.get(key)
+            start = previous.message_count if previous else 0
+            stop = self.store.count(key)
+            if stop < start:
+                # The buffer was evicted and restarted; the old summary no longer matches it.
+                self._summaries.pop(key, None)
+                continue
+            if stop == start:
+                return
+            batch = self.store.messages(key, start, stop)
+            try:
+                text = await self.llm_service.generate_incremental_summary(
+                    previous.text if previous else None, batch
+                )
+            except Exception as e:
+                logger.error("Summary update failed for conversation %s: %s", key, e)
+                return
+            if not isinstance(text, str) or not text.strip() or text.startswith("Error"):
+                logger.warning("Summary update for conversation %s returned no usable text.", key)
+                return
+            if not self.store.exists(key):
+                return
+            self._summaries[key] = StoredSummary(
+                text=text.strip(), message_count=stop, updated_at=datetime.now()
+            )
+            logger.info("Folded messages %d-%d into summary for conversation %s", start, stop, key)
+
+
+_SERVICE: Optional[SummaryService] = None
+
+def get_summary_service() -> SummaryService:
+    global _SERVICE
+    if _SERVICE is None:
+        _SERVICE = SummaryService()
+    return _SERVICE
@@ -0,0 +1,91 @@
+# backend/api/services/worker_registry.py
+import datetime
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from ..models import WORKER_ACTIVE, WORKER_STOPPED, Worker
+from utils.config import get_settings
+from utils.db import get_session_local
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerRegistry:
+    """Workers on every node announce themselves in the shared ``workers`` table.
+
+    A worker counts as alive while its heartbeat is younger than one job
+    lease; past that, the jobs it held are reclaimed by whichever node runs
+    ``JobService.reclaim_expired`` next.
+    """
+
+    def __init__(self, session_factory: Optional[Callable[[], Session]] = None):
+        self.session_factory = session_factory or get_session_local()
+
+    def register(self, worker_id: str, hostname: str, pid: int, capabilities: Dict[str, Any]) -> None:
+        now = datetime.datetime.utcnow()
+        with self.session_factory() as db:
+            worker = db.get(Worker, worker_id) or Worker(id=worker_id)
+            worker.hostname = hostname
+            worker.pid = pid
+            worker.status = WORKER_ACTIVE
+            worker.capabilities = capabilities
+            worker.current_job_id = None
+            worker.jobs_run = 0
+            worker.started_at = now
+            worker.heartbeat_at = now
+            db.add(worker)
+            db.commit()
+
+    def heartbeat(self, worker_id: str, current_job_id: Optional[int] = None, jobs_run: Optional[int] = None) -> None:
+        with self.session_factory() as db:
+            worker = db.get(Worker, worker_id)
+            if worker is None:
+                return
+            worker.heartbeat_at = datetime.datetime.utcnow()
+            worker.current_job_id = current_job_id
+            if jobs_run is not None:
+                worker.jobs_run = jobs_run
+            db.commit()
+
+    def deregister(self, worker_id: str) -> None:
+        with self.session_factory() as db:
+            worker = db.get(Worker, worker_id)
+            if worker is None:
+                return
+            worker.status = WORKER_STOPPED
+            worker.current_job_id = None
+            db.commit()
+
+    def list_workers(self, include_stopped: bool = False) -> List[Dict[str, Any]]:
+        cutoff = datetime.datetime.utcnow() - datetime.timedelta(seconds=get_settings().job_lease_seconds)
+        with self.session_factory() as db:
+            query = db.query(Worker)
+            if not include_stopped:
+                query = query.filter(Worker.status == WORKER_ACTIVE)
+            workers = query.order_by(Worker.hostname, Worker.id).all()
+            return [
+                {
+                    "id": w.id,
+                    "hostname": w.hostname,
+                    "pid": w.pid,
+                    "status": w.status,
+                    "alive": w.status == WORKER_ACTIVE and w.heartbeat_at is not None and w.heartbeat_at >= cutoff,
+                    "capabilities": w.capabilities,
+                    "current_job_id": w.current_job_id,
+                    "jobs_run": w.jobs_run,
+                    "started_at": w.started_at,
+                    "heartbeat_at": w.heartbeat_at,
+                }
+                for w in workers
+            ]
+
+
+_REGISTRY: Optional[WorkerRegistry] = None
+
+def get_worker_registry() -> WorkerRegistry:
+    global _REGISTRY
+    if _REGISTRY is None:
+        _REGISTRY = WorkerRegistry()
+    return _REGISTRY
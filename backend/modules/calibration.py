@@ -0,0 +1,438 @@
+# backend/modules/calibration.py
+import concurrent.futures as cf
+import functools
+import hashlib
+import json
+import logging
+import math
+import multiprocessing
+import os
+import random
+import time
+import traceback
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from api.models import Job as DBJob, JOB_CANCELLED, JOB_COMPLETED, JOB_FAILED, JOB_PENDING, JOB_RUNNING
+from modules.config_templates import get_template_cache, resolve_template_path
+from modules.job_runner import JobProgress
+from modules.modeling import JobCancelledError, JobLogger, transition_job
+from utils.config import Settings, get_settings
+from utils.error_handlers import ValidationError
+
+logger = logging.getLogger(__name__)
+
+Bounds = Dict[str, Tuple[float, float]]
+
+
+# ---------------------------------------------------------------------- #
+# Built-in objective
+# ---------------------------------------------------------------------- #
+def simulate_reservoir_cascade(recessions: Sequence[float], forcing: Sequence[float]) -> List[float]:
+    """Route precipitation through a chain of linear reservoirs."""
+    storages = [0.0] * len(recessions)
+    flows = []
+    for inflow in forcing:
+        for i, k in enumerate(recessions):
+            storage = storages[i] + inflow
+            inflow = k * storage
+            storages[i] = storage - inflow
+        flows.append(inflow)
+    return flows
+
+
+def nash_sutcliffe(simulated: Sequence[float], observed: Sequence[float]) -> float:
+    mean = sum(observed) / len(observed)
+    denominator = sum((o - mean) ** 2 for o in observed)
+    numerator = sum((s - o) ** 2 for s, o in zip(simulated, observed))
+    return 1.0 - numerator / denominator
+
+
+@functools.lru_cache(maxsize=8)
+def _synthetic_case(names: Tuple[str, ...], n_steps: int = 730) -> Tuple[Tuple[float, ...], Tuple[float, ...]]:
+    # Deterministic storm series and a hidden "true" parameter set per name.
+    rng = random.Random(7)
+    forcing = tuple(rng.expovariate(1 / 8.0) if rng.random() < 0.3 else 0.0 for _ in range(n_steps))
+    truth = [0.1 + 0.8 * int(hashlib.sha256(n.encode()).hexdigest()[:8], 16) / 0xFFFFFFFF for n in names]
+    observed = simulate_reservoir_cascade([0.05 + 0.9 * u for u in truth], forcing)
+    return forcing, tuple(observed)
+
+
+def synthetic_reservoir_objective(params: Mapping[str, float], bounds: Bounds) -> float:
+    """``1 - NSE`` of a reservoir cascade against a synthetic truth; cheap and identifiable."""
+    names = tuple(sorted(bounds))
+    forcing, observed = _synthetic_case(names)
+    normalised = [(params[n] - bounds[n][0]) / ((bounds[n][1] - bounds[n][0]) or 1.0) for n in names]
+    simulated = simulate_reservoir_cascade([0.05 + 0.9 * u for u in normalised], forcing)
+    return 1.0 - nash_sutcliffe(simulated, observed)
+
+
+# The only objective so far is the synthetic benchmark. The modeling path
+# prepares a workspace but does not run the basin model yet, so there is no
+# simulation to score over CALIBRATION_PERIOD; a SYMFLUENCE objective belongs
+# here once it does.
+OBJECTIVES: Dict[str, Callable[[Mapping[str, float], Bounds], float]] = {
+    "synthetic_reservoir": synthetic_reservoir_objective,
+}
+
+
+def evaluate_candidate(objective: str, params: Dict[str, float], bounds: Bounds) -> float:
+    """Process-pool entry point; resolves the objective by name so it pickles cheaply."""
+    return OBJECTIVES[objective](params, bounds)
+
+
+# ---------------------------------------------------------------------- #
+# Dynamically Dimensioned Search
+# ---------------------------------------------------------------------- #
+class DDS:
+    """Dynamically Dimensioned Search (Tolson & Shoemaker, 2007), minimising.
+
+    ``ask``/``tell`` are decoupled so several candidates can be evaluated at
+    once: each new candidate perturbs the best solution known when it is
+    asked for, and results are folded in as they arrive in any order.
+    """
+
+    def __init__(
+        self,
+        bounds: Bounds,
+        max_evaluations: int,
+        r: float = 0.2,
+        seed: Optional[int] = None,
+        initial: Optional[Mapping[str, float]] = None,
+    ):
+        if not bounds:
+            raise ValidationError("Calibration needs at least one parameter")
+        self.names = sorted(bounds)
+        self.bounds = {n: (float(bounds[n][0]), float(bounds[n][1])) for n in self.names}
+        self.max_evaluations = max_evaluations
+        self.r = r
+        self.rng = random.Random(seed)
+        self.initial = dict(initial) if initial else None
+        self.submitted = 0
+        self.completed = 0
+        self.best_x: Optional[Dict[str, float]] = None
+        self.best_f = math.inf
+        self.history: List[Tuple[int, float]] = []  # (evaluation, best objective) at each improvement
+
+    @property
+    def finished(self) -> bool:
+        return self.completed >= self.max_evaluations
+
+    @property
+    def can_ask(self) -> bool:
+        return self.submitted < self.max_evaluations
+
+    def ask(self) -> Dict[str, float]:
+        self.submitted += 1
+        if self.best_x is None:
+            if self.submitted == 1 and self.initial:
+                return dict(self.initial)
+            return {n: self.rng.uniform(lo, hi) for n, (lo, hi) in self.bounds.items()}
+
+        # Perturb each dimension with a probability that shrinks as the search matures.
+        p = 1.0 - math.log(self.submitted) / math.log(max(self.max_evaluations, 2))
+        chosen = [n for n in self.names if self.rng.random() < p] or [self.rng.choice(self.names)]
+        candidate = dict(self.best_x)
+        for name in chosen:
+            lo, hi = self.bounds[name]
+            value = candidate[name] + self.r * (hi - lo) * self.rng.gauss(0.0, 1.0)
+            if value < lo:
+                value = lo + (lo - value)
+                if value > hi:
+                    value = lo
+            elif value > hi:
+                value = hi - (value - hi)
+                if value < lo:
+                    value = hi
+            candidate[name] = value
+        return candidate
+
+    def tell(self, candidate: Mapping[str, float], value: float) -> bool:
+        """Record an evaluation; returns True when it improved on the best."""
+        self.completed += 1
+        if value < self.best_f:
+            self.best_f = value
+            self.best_x = dict(candidate)
+            self.history.append((self.completed, value))
+            return True
+        return False
+
+    def to_state(self) -> Dict[str, Any]:
+        version, internal, gauss_next = self.rng.getstate()
+        return {
+            "bounds": self.bounds,
+            "max_evaluations": self.max_evaluations,
+            "r": self.r,
+            "completed": self.completed,
+            "best_x": self.best_x,
+            "best_f": None if math.isinf(self.best_f) else self.best_f,
+            "history": self.history,
+            "rng": [version, list(internal), gauss_next],
+        }
+
+    @classmethod
+    def from_state(cls, state: Mapping[str, Any]) -> "DDS":
+        dds = cls(state["bounds"], state["max_evaluations"], state["r"])
+        # Candidates that were in flight when the checkpoint was taken are re-asked.
+        dds.completed = dds.submitted = state["completed"]
+        dds.best_x = state["best_x"]
+        dds.best_f = math.inf if state["best_f"] is None else state["best_f"]
+        dds.history = [tuple(h) for h in state["history"]]
+        version, internal, gauss_next = state["rng"]
+        dds.rng.setstate((version, tuple(internal), gauss_next))
+        return dds
+
+
+class CalibrationCheckpoint:
+    """Search state persisted as JSON, replaced atomically on every save."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    def load(self) -> Optional[DDS]:
+        if not self.path.exists():
+            return None
+        with open(self.path) as f:
+            return DDS.from_state(json.load(f))
+
+    def save(self, dds: DDS) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(dds.to_state(), f)
+        os.replace(tmp, self.path)
+
+    def delete(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+
+def checkpoint_path(checkpoint_dir: str, job_id: int) -> Path:
+    return Path(checkpoint_dir) / f"job_{job_id}.json"
+
+
+def remove_checkpoint(checkpoint_dir: Optional[str], job_id: int) -> None:
+    """Delete a finished job's search state; only interrupted jobs resume from it."""
+    if checkpoint_dir:
+        CalibrationCheckpoint(checkpoint_path(checkpoint_dir, job_id)).delete()
+
+
+@dataclass(frozen=True)
+class CalibrationSpec:
+    objective: str
+    bounds: Bounds
+    max_evaluations: int
+    r: float
+    parallelism: int
+    seed: Optional[int]
+    metric: str
+
+
+def run_parallel_dds(
+    dds: DDS,
+    spec: CalibrationSpec,
+    executor: cf.Executor,
+    on_improvement: Callable[[DDS], None] = lambda dds: None,
+    on_tick: Callable[[DDS], None] = lambda dds: None,
+    tick_interval: float = 5.0,
+    clock: Callable[[], float] = time.monotonic,
+) -> DDS:
+    """Keep ``spec.parallelism`` evaluations in flight until the budget is spent.
+
+    ``on_tick`` runs at most every ``tick_interval`` seconds (checkpointing,
+    progress, cancellation) and once more at the end; exceptions it raises stop
+    the search and cancel outstanding evaluations.
+    """
+    in_flight: Dict[cf.Future, Dict[str, float]] = {}
+    last_tick = clock()
+    try:
+        while not dds.finished:
+            while len(in_flight) < spec.parallelism and dds.can_ask:
+                candidate = dds.ask()
+                in_flight[executor.submit(evaluate_candidate, spec.objective, candidate, spec.bounds)] = candidate
+            if not in_flight:
+                break
+            done, _ = cf.wait(in_flight, return_when=cf.FIRST_COMPLETED)
+            for future in done:
+                candidate = in_flight.pop(future)
+                try:
+                    value = future.result()
+                except Exception as e:
+                    logger.warning("Calibration evaluation failed: %s", e)
+                    value = math.inf
+                if dds.tell(candidate, value):
+                    on_improvement(dds)
+            if clock() - last_tick >= tick_interval:
+                on_tick(dds)
+                last_tick = clock()
+        on_tick(dds)
+    finally:
+        for future in in_flight:
+            future.cancel()
+    return dds
+
+
+class CalibrationModule:
+    def __init__(self, settings: Settings):
+        self.settings = settings
+
+    def build_spec(self, parameters: Mapping[str, Any]) -> CalibrationSpec:
+        """Job parameters, with defaults taken from the config template.
+
+        Raises ValidationError for anything the search could not run with, so
+        ``JobService`` can reject a bad submission before it is queued.
+        """
+        template = get_template_cache().get(resolve_template_path(self.settings.symfluence_code_dir)).base
+        objective = parameters.get("objective", "synthetic_reservoir")
+        if objective not in OBJECTIVES:
+            raise ValidationError(
+                f"Unknown calibration objective '{objective}'; available: {', '.join(sorted(OBJECTIVES))}"
+            )
+
+        bounds = parameters.get("param_bounds")
+        if not bounds:
+            # Without explicit ranges calibrate the template's parameters in normalised space.
+            names = []
+            for key in ("PARAMS_TO_CALIBRATE", "BASIN_PARAMS_TO_CALIBRATE"):
+                names += [n.strip() for n in str(template.get(key) or "").split(",") if n.strip()]
+            bounds = {name: (0.0, 1.0) for name in names}
+        if not isinstance(bounds, Mapping) or not bounds:
+            raise ValidationError("param_bounds must map at least one parameter to [low, high]")
+        parsed: Bounds = {}
+        for name, pair in bounds.items():
+            try:
+                low, high = (float(v) for v in pair)
+            except (TypeError, ValueError):
+                low = high = math.nan
+            if not low < high:
+                raise ValidationError(f"Bounds for '{name}' must be [low, high] with low < high")
+            parsed[name] = (low, high)
+
+        try:
+            max_evaluations = int(parameters.get("max_evaluations") or template.get("NUMBER_OF_ITERATIONS") or 1000)
+            r = float(parameters.get("dds_r") or template.get("DDS_R") or 0.2)
+            parallelism = int(
+                parameters.get("parallelism") or self.settings.calibration_workers or os.cpu_count() or 1
+            )
+        except (TypeError, ValueError):
+            raise ValidationError("max_evaluations, dds_r and parallelism must be numbers")
+        if not 1 <= max_evaluations <= self.settings.calibration_max_evaluations:
+            raise ValidationError(
+                f"max_evaluations must be between 1 and {self.settings.calibration_max_evaluations}"
+            )
+        if not 0 < r <= 1:
+            raise ValidationError("dds_r must be in (0, 1]")
+        return CalibrationSpec(
+            objective=objective,
+            bounds=parsed,
+            max_evaluations=max_evaluations,
+            r=r,
+            parallelism=max(1, parallelism),
+            seed=parameters.get("seed"),
+            metric=str(template.get("OPTIMIZATION_METRIC") or "NSE"),
+        )
+
+    def checkpoint_for(self, job_id: int) -> CalibrationCheckpoint:
+        return CalibrationCheckpoint(checkpoint_path(self.settings.calibration_checkpoint_dir, job_id))
+
+    @staticmethod
+    def progress(dds: DDS, spec: CalibrationSpec) -> Dict[str, Any]:
+        return {
+            "objective": spec.objective,
+            "metric": spec.metric,
+            "evaluations": dds.completed,
+            "max_evaluations": dds.max_evaluations,
+            "best_objective": None if math.isinf(dds.best_f) else dds.best_f,
+            "best_parameters": dds.best_x,
+            "history": dds.history[-50:],
+        }
+
+    def execute(self, job_id: int, db: Session, progress: Optional[JobProgress] = None):
+        progress = progress or JobProgress()
+        job = db.query(DBJob).filter(DBJob.id == job_id).first()
+        if not job:
+            logger.error(f"Job {job_id} not found in database.")
+            return
+        checkpoint = self.checkpoint_for(job_id)
+        if job.status == JOB_CANCELLED:
+            logger.info(f"Job {job_id} was cancelled before execution.")
+            checkpoint.delete()
+            return
+
+        job_log = JobLogger(
+            db,
+            job,
+            flush_lines=self.settings.job_log_flush_lines,
+            flush_interval=self.settings.job_log_flush_interval,
+            cancel_check_interval=self.settings.job_cancel_check_interval,
+        )
+
+        with job_log:
+            try:
+                if not transition_job(db, job_id, JOB_RUNNING, (JOB_PENDING, JOB_RUNNING)):
+                    raise JobCancelledError(f"Job {job_id} was cancelled")
+
+                progress.phase("calibrate")
+                spec = self.build_spec(job.parameters)
+                dds = checkpoint.load()
+                if dds is None:
+                    dds = DDS(spec.bounds, spec.max_evaluations, spec.r, spec.seed, job.parameters.get("initial"))
+                    job_log.append(
+                        f"DDS calibration of {len(spec.bounds)} parameters against the "
+                        f"'{spec.objective}' objective, {spec.max_evaluations} evaluations, "
+                        f"{spec.parallelism} in parallel."
+                    )
+                else:
+                    job_log.append(f"Resuming DDS calibration from checkpoint at evaluation {dds.completed}.")
+
+                def on_improvement(state: DDS):
+                    job_log.append(f"Evaluation {state.completed}/{state.max_evaluations}: best objective {state.best_f:.6g}")
+
+                def on_tick(state: DDS):
+                    checkpoint.save(state)
+                    progress.update(evaluations=state.completed, best_objective=state.best_f)
+                    db.execute(
+                        update(DBJob)
+                        .where(DBJob.id == job_id)
+                        .values(result=self.progress(state, spec))
+                        .execution_options(synchronize_session=False)
+                    )
+                    db.commit()
+                    job_log.raise_if_cancelled()
+
+                ctx = multiprocessing.get_context("spawn")
+                with cf.ProcessPoolExecutor(max_workers=spec.parallelism, mp_context=ctx) as executor:
+                    run_parallel_dds(
+                        dds, spec, executor, on_improvement, on_tick,
+                        tick_interval=self.settings.calibration_checkpoint_interval,
+                    )
+
+                if not transition_job(db, job_id, JOB_COMPLETED, result=self.progress(dds, spec)):
+                    raise JobCancelledError(f"Job {job_id} was cancelled")
+                checkpoint.delete()
+                job_log.append(f"Calibration complete. Best objective {dds.best_f:.6g}.")
+
+            except JobCancelledError:
+                logger.info(f"Calibration job {job_id} cancelled; checkpoint removed.")
+                db.rollback()
+                checkpoint.delete()
+
+            except Exception as e:
+                error_trace = traceback.format_exc()
+                logger.error(f"Calibration job {job_id} failed: {e}")
+                db.rollback()
+                job_log.append(f"\nERROR: {str(e)}\n{error_trace}", check_cancel=False)
+                job_log.flush()
+                transition_job(db, job_id, JOB_FAILED)
+                checkpoint.delete()
+
+
+def execute_calibration_job(job_id: int, db_session_factory, progress: Optional[JobProgress] = None):
+    db: Session = db_session_factory()
+    try:
+        CalibrationModule(get_settings()).execute(job_id, db, progress)
+    finally:
+        db.close()
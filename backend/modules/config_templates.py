@@ -0,0 +1,158 @@
+# backend/modules/config_templates.py
+import hashlib
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, Iterator, Mapping, Optional, Union
+
+import yaml
+
+try:
+    from yaml import CSafeDumper as _Dumper, CSafeLoader as _Loader
+except ImportError:  # pragma: no cover - PyYAML built without libyaml
+    from yaml import SafeDumper as _Dumper, SafeLoader as _Loader
+
+logger = logging.getLogger(__name__)
+
+_EXAMPLE_TEMPLATE = Path(__file__).parent.parent / "examples" / "config_Bow.yaml"
+
+
+def resolve_template_path(symfluence_code_dir: Optional[str]) -> Path:
+    """SYMFLUENCE's own config template if installed, else the bundled example."""
+    if symfluence_code_dir:
+        template_path = Path(symfluence_code_dir) / "0_config_files" / "config_template.yaml"
+        if template_path.exists():
+            return template_path
+    return _EXAMPLE_TEMPLATE
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return {k: _thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(v) for v in value]
+    return value
+
+
+def _dump(mapping: Mapping[str, Any]) -> str:
+    return yaml.dump(_thaw(mapping), Dumper=_Dumper, default_flow_style=False, sort_keys=True)
+
+
+@dataclass(frozen=True)
+class ConfigTemplate:
+    """An immutable, parsed config template.
+
+    Besides the frozen ``base`` mapping, each top-level key is pre-serialised
+    once, so rendering a job config only dumps the keys the job overrides.
+    """
+    path: str
+    version: str
+    mtime_ns: int
+    size: int
+    base: Mapping[str, Any]
+    _fragments: Mapping[str, str] = field(repr=False)
+
+    @classmethod
+    def parse(cls, path: Path, raw: bytes, st: os.stat_result) -> "ConfigTemplate":
+        data = yaml.load(raw, Loader=_Loader) or {}
+        return cls(
+            path=str(path),
+            version=hashlib.sha256(raw).hexdigest()[:16],
+            mtime_ns=st.st_mtime_ns,
+            size=st.st_size,
+            base=_freeze(data),
+            _fragments=MappingProxyType({k: _dump({k: v}) for k, v in data.items()}),
+        )
+
+    def overlay(self, overrides: Mapping[str, Any]) -> "ConfigOverlay":
+        return ConfigOverlay(self, dict(overrides))
+
+
+class ConfigOverlay(Mapping):
+    """Per-job view: job overrides layered over the shared template base."""
+
+    def __init__(self, template: ConfigTemplate, overrides: Dict[str, Any]):
+        self.template = template
+        self.overrides = overrides
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self.overrides:
+            return self.overrides[key]
+        return self.template.base[key]
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.overrides
+        for key in self.template.base:
+            if key not in self.overrides:
+                yield key
+
+    def __len__(self) -> int:
+        return len(self.template.base) + sum(1 for k in self.overrides if k not in self.template.base)
+
+    def with_overrides(self, extra: Mapping[str, Any]) -> "ConfigOverlay":
+        return ConfigOverlay(self.template, {**self.overrides, **extra})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: _thaw(self[key]) for key in self}
+
+    def render(self, extra: Optional[Mapping[str, Any]] = None) -> str:
+        """YAML text for this config, identical to dumping the merged dict."""
+        overrides = {**self.overrides, **(extra or {})}
+        fragments = self.template._fragments
+        parts = []
+        for key in sorted(set(fragments) | set(overrides)):
+            parts.append(_dump({key: overrides[key]}) if key in overrides else fragments[key])
+        return "".join(parts)
+
+
+class TemplateCache:
+    """Parses each config template once and reuses it until the file changes."""
+
+    def __init__(self) -> None:
+        self._templates: Dict[str, ConfigTemplate] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path: Union[str, Path]) -> ConfigTemplate:
+        path = Path(path)
+        st = path.stat()
+        key = str(path.resolve())
+        cached = self._templates.get(key)
+        if cached is not None and (cached.mtime_ns, cached.size) == (st.st_mtime_ns, st.st_size):
+            self.hits += 1
+            return cached
+        with self._lock:
+            cached = self._templates.get(key)
+            if cached is not None and (cached.mtime_ns, cached.size) == (st.st_mtime_ns, st.st_size):
+                self.hits += 1
+                return cached
+            self.misses += 1
+            raw = path.read_bytes()
+            template = ConfigTemplate.parse(path, raw, st)
+            self._templates[key] = template
+            logger.info("Parsed config template %s (version %s)", path, template.version)
+            return template
+
+    def stats(self) -> Dict[str, Any]:
+        return {"templates": len(self._templates), "hits": self.hits, "misses": self.misses}
+
+
+_CACHE: Optional[TemplateCache] = None
+
+def get_template_cache() -> TemplateCache:
+    global _CACHE
+    if _CACHE is None:
+        _CACHE = TemplateCache()
+    return _CACHE
@@ -0,0 +1,144 @@
+# backend/modules/downsample.py
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+from utils.error_handlers import ValidationError
+
+Series = Tuple[np.ndarray, np.ndarray]
+
+
+def minmax(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indices of the minimum and maximum of each of ``n_out // 2`` equal buckets.
+
+    Keeps every peak and trough, which matters for hydrographs, and is fully
+    vectorised: the series is padded with NaN to a ``(buckets, size)`` matrix.
+    """
+    n = len(y)
+    buckets = max(1, n_out // 2)
+    size = -(-n // buckets)
+    buckets = -(-n // size)
+    padded = np.full(buckets * size, np.nan, dtype=np.float64)
+    padded[:n] = y
+    matrix = padded.reshape(buckets, size)
+    offsets = np.arange(buckets) * size
+    lows = offsets + np.nanargmin(matrix, axis=1)
+    highs = offsets + np.nanargmax(matrix, axis=1)
+    return np.unique(np.concatenate(([0, n - 1], lows, highs)))
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indices chosen by Largest-Triangle-Three-Buckets (Steinarsson, 2013).
+
+    Bucket edges and the next-bucket averages are computed in one vectorised
+    pass; only the choice within each bucket, which depends on the point
+    picked in the previous one, loops over buckets.
+    """
+    n = len(y)
+    if n_out < 3:
+        raise ValidationError("LTTB needs a width of at least 3 points")
+    x = x.astype(np.float64)
+    y = y.astype(np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    starts, stops = edges[:-1], edges[1:]
+    counts = stops - starts
+    x_means = np.add.reduceat(x[:-1], starts) / counts
+    y_means = np.add.reduceat(y[:-1], starts) / counts
+    # Anchor after the final bucket is the last point itself.
+    next_x = np.append(x_means[1:], x[-1])
+    next_y = np.append(y_means[1:], y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for i, (start, stop) in enumerate(zip(starts, stops)):
+        bx, by = x[start:stop], y[start:stop]
+        areas = np.abs((x[previous] - next_x[i]) * (by - y[previous]) - (x[previous] - bx) * (next_y[i] - y[previous]))
+        previous = start + int(np.argmax(areas))
+        selected[i + 1] = previous
+    return selected
+
+
+METHODS: Dict[str, Callable[[np.ndarray, np.ndarray, int], np.ndarray]] = {
+    "minmax": minmax,
+    "lttb": lttb,
+}
+
+
+def downsample(x: np.ndarray, y: np.ndarray, width: int, method: str = "minmax") -> Series:
+    """Reduce a series to about ``width`` points, dropping missing values first."""
+    if method not in METHODS:
+        raise ValidationError(f"Unknown downsampling method '{method}'")
+    if width < 2:
+        raise ValidationError("Width must be at least 2")
+    valid = np.isfinite(y)
+    if not valid.all():
+        x, y = x[valid], y[valid]
+    if len(y) <= width:
+        return x, y
+    numeric_x = x.astype(np.int64) if np.issubdtype(x.dtype, np.datetime64) else x
+    index = METHODS[method](numeric_x, y, width)
+    return x[index], y[index]
+
+
+def pack_series(times: np.ndarray, values: np.ndarray) -> bytes:
+    """Little-endian float64 epoch milliseconds followed by float32 values."""
+    millis = times.astype("datetime64[ms]").astype(np.int64).astype("<f8")
+    return millis.tobytes() + values.astype("<f4").tobytes()
+
+
+def arrow_series(times: np.ndarray, values: np.ndarray) -> Optional[bytes]:
+    """Arrow IPC stream with ``time`` and ``value`` columns, or None without pyarrow."""
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return None
+    table = pa.table({
+        "time": pa.array(times.astype("datetime64[ms]")),
+        "value": pa.array(values.astype(np.float32)),
+    })
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+class SeriesCache:
+    """Small thread-safe LRU of downsampled series keyed by query parameters."""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Series]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Series]) -> Series:
+        with self._lock:
+            series = self._entries.get(key)
+            if series is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return series
+            self.misses += 1
+        series = compute()
+        with self._lock:
+            self._entries[key] = series
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return series
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+_CACHE: Optional[SeriesCache] = None
+
+def get_series_cache() -> SeriesCache:
+    global _CACHE
+    if _CACHE is None:
+        _CACHE = SeriesCache()
+    return _CACHE
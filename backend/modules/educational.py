@@ -1,42 +1,150 @@
 # backend/modules/educational.py
+import hashlib
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from modules.embeddings import EmbeddingIndex, get_embedding_index
+from modules.knowledge_base import KnowledgeBase, Passage, get_knowledge_base
+from utils.config import get_settings
+from utils.prompts import EDUCATIONAL_GROUNDING_TEMPLATE, is_failed_reply
+
+logger = logging.getLogger(__name__)
+
+# Chat commands that ask for an explanation of a topic.
+TOPIC_COMMANDS = ("/learn", "/explain")
+# Reciprocal rank fusion constant for merging keyword and embedding rankings.
+_RRF_K = 60
+# Semantic matches weaker than this are noise rather than related passages.
+MIN_PASSAGE_SIMILARITY = 0.2
+# Earlier answers are only offered as references for closely related questions.
+MIN_ANSWER_SIMILARITY = 0.75
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha1(text.encode()).hexdigest()[:16]
+
 
 class EducationalModule:
+    """Hydrology explanations from the indexed knowledge base.
+
+    Grounding combines BM25 keyword hits with embedding neighbours of the
+    same passages (``passage_index``) and of earlier answers
+    (``answer_index``), so a question phrased without the documents'
+    vocabulary still finds them.
+    """
+
+    def __init__(
+        self,
+        knowledge_base: Optional[KnowledgeBase] = None,
+        passage_index: Optional[EmbeddingIndex] = None,
+        answer_index: Optional[EmbeddingIndex] = None,
+    ):
+        self.knowledge_base = knowledge_base or get_knowledge_base()
+        self.passage_index = passage_index
+        self.answer_index = answer_index
+
+    def sync_embeddings(self) -> Dict[str, int]:
+        """Embed new or edited passages and drop those no longer in the knowledge base."""
+        if self.passage_index is None:
+            return {"added": 0, "removed": 0}
+        current = {f"{p.doc_id}#{_digest(p.text)}": p for p in self.knowledge_base.passages()}
+        stale = [key for key in self.passage_index.keys() if key not in current]
+        removed = self.passage_index.remove(stale)
+        missing = [key for key in current if key not in self.passage_index]
+        added = self.passage_index.add(
+            missing,
+            [current[key].text for key in missing],
+            [{"doc_id": current[key].doc_id, "title": current[key].title} for key in missing],
+        )
+        return {"added": added, "removed": removed}
+
+    def _best_document(self, topic: str) -> Optional[dict]:
+        hits = self.knowledge_base.search(topic, k=1)
+        if not hits or not self.knowledge_base.covers(hits[0].passage.doc_id, topic):
+            return None
+        return self.knowledge_base.document(hits[0].passage.doc_id)
+
     def get_educational_content(self, topic: str) -> str:
-        """Provides educational content on the given topic.
+        """The knowledge base document that best covers ``topic``."""
+        document = self._best_document(topic)
+        if document is None:
+            topics = ", ".join(f"'{t.lower()}'" for t in self.knowledge_base.topics())
+            return f"Sorry, I don't have information on '{topic}' yet. I can provide information on {topics}."
+        return f"{document['title']}\n\n{document['text']}"
+
+    def answer_command(self, user_input: str) -> Optional[str]:
+        """Answer ``/learn <topic>`` or ``/explain <concept>`` directly when a document covers it.
+
+        Returns None for anything else, which then goes to the LLM.
+        """
+        command, _, topic = user_input.strip().partition(" ")
+        if command.lower() not in TOPIC_COMMANDS or not topic.strip():
+            return None
+        document = self._best_document(topic)
+        if document is None:
+            return None
+        return f"**{document['title']}**\n\n{document['text']}"
+
+    def record_answer(self, question: str, answer: str) -> bool:
+        """Keep an explanation as a reference for similar questions.
 
-        For now, this is a simplified example. In a full implementation,
-        this would likely involve querying a knowledge base or generating
-        content dynamically using the LLM.
+        Only ``/learn`` and ``/explain`` answers are kept, since these are
+        general hydrology explanations rather than replies about one user's
+        work; callers must not pass answers that depended on conversation
+        history. Failed provider replies are skipped.
         """
-        topic_lower = topic.lower()
-        if topic_lower == "hydrological cycle":
-            return """
-            The hydrological cycle, also known as the water cycle, is the continuous movement of water on, above, and below the surface of the Earth.
-
-            Key processes include:
-            * Evaporation: Water changes from liquid to vapor, primarily from oceans and other water bodies.
-            * Condensation: Water vapor cools and changes back into liquid, forming clouds.
-            * Precipitation: Water falls back to Earth as rain, snow, sleet, or hail.
-            * Infiltration: Water soaks into the ground, replenishing groundwater.
-            * Runoff: Water flows over the land surface, eventually reaching rivers, lakes, and oceans.
-            * Transpiration: Water is released into the atmosphere by plants.
-
-            Understanding the hydrological cycle is fundamental to hydrological modeling.
-            """
-        elif topic_lower == "watershed":
-            return """
-            A watershed, also called a drainage basin or catchment, is an area of land where all surface water converges to a single point, typically a river, lake, or ocean.
-
-            Key characteristics of a watershed include:
-            * Area: The total land area draining to a common outlet.
-            * Slope: The steepness of the terrain, which influences runoff velocity.
-            * Land Cover: The type of vegetation and land use, which affects infiltration and evapotranspiration.
-            * Soil Type: The characteristics of the soil, which determine infiltration capacity and water storage.
-
-            Watersheds are important units for hydrological analysis and management.
-            """
-        else:
-            return f"Sorry, I don't have information on '{topic}' yet. I can provide information on 'hydrological cycle' or 'watershed'."
+        if self.answer_index is None or is_failed_reply(answer):
+            return False
+        if not question.lstrip().lower().startswith(TOPIC_COMMANDS):
+            return False
+        self.answer_index.add([_digest(question)], [question], [{"answer": answer}])
+        return True
+
+    def passages(self, query: str, k: int = 3) -> List[Passage]:
+        """Top passages by reciprocal rank fusion of BM25 and embedding similarity."""
+        scores: Dict[Tuple[str, str], float] = {}
+        found: Dict[Tuple[str, str], Passage] = {}
+        rankings = [[hit.passage for hit in self.knowledge_base.search(query, 2 * k)]]
+        if self.passage_index is not None:
+            [neighbors] = self.passage_index.search([query], 2 * k, MIN_PASSAGE_SIMILARITY)
+            rankings.append([Passage(n.metadata["doc_id"], n.metadata["title"], n.text) for n in neighbors])
+        for ranking in rankings:
+            for rank, passage in enumerate(ranking):
+                key = (passage.doc_id, passage.text)
+                found[key] = passage
+                scores[key] = scores.get(key, 0.0) + 1.0 / (_RRF_K + rank)
+        return [found[key] for key in sorted(scores, key=scores.get, reverse=True)[:k]]
+
+    def similar_answers(self, query: str, k: int = 2) -> List[Tuple[str, str]]:
+        if self.answer_index is None:
+            return []
+        [neighbors] = self.answer_index.search([query], k, MIN_ANSWER_SIMILARITY)
+        return [(n.text, n.metadata["answer"]) for n in neighbors]
+
+    def grounding(self, query: str, k: int = 3) -> str:
+        """Reference passages for ``query`` to append to the system prompt, or ``""``."""
+        references = [f"{p.title}: {p.text}" for p in self.passages(query, k)]
+        references += [
+            f'Earlier DELTA answer to "{question}": {answer}' for question, answer in self.similar_answers(query)
+        ]
+        if not references:
+            return ""
+        passages = "\n\n".join(f"[{i}] {reference}" for i, reference in enumerate(references, 1))
+        return EDUCATIONAL_GROUNDING_TEMPLATE.format(passages=passages)
+
+
+_MODULE: Optional[EducationalModule] = None
 
 def get_educational_module() -> EducationalModule:
-    return EducationalModule()
+    global _MODULE
+    if _MODULE is None:
+        module = EducationalModule(
+            passage_index=get_embedding_index("knowledge"),
+            answer_index=get_embedding_index("answers", get_settings().embedding_answers_max),
+        )
+        try:
+            logger.info("Knowledge embeddings synced: %s", module.sync_embeddings())
+        except Exception as e:
+            logger.warning("Could not embed knowledge base passages: %s", e)
+        _MODULE = module
+    return _MODULE
@@ -0,0 +1,471 @@
+# backend/modules/embeddings.py
+import importlib
+import json
+import logging
+import math
+import os
+import threading
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Protocol, Sequence, Tuple, Union
+
+import numpy as np
+
+from modules.knowledge_base import tokenize
+from utils.config import get_settings
+from utils.file_lock import file_lock
+
+logger = logging.getLogger(__name__)
+
+# Data files carry the generation that ``compact`` bumps; header.json names
+# the current one.
+_VECTORS = "vectors.{}.f32"
+_ROWS = "rows.{}.jsonl"
+_HEADER = "header.json"
+# Compact once deleted or superseded rows outnumber live ones and reach this.
+_COMPACT_MIN_GARBAGE = 1024
+# Rows scored per matrix product; bounds the temporary score matrix.
+_SEARCH_BLOCK = 65536
+
+
+class Embedder(Protocol):
+    name: str
+    dim: int
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """``(len(texts), dim)`` float32 rows with unit L2 norm (or all zeros)."""
+        ...
+
+
+@lru_cache(maxsize=65536)
+def _bucket(feature: str, dim: int) -> Tuple[int, float]:
+    h = zlib.crc32(feature.encode())
+    return h % dim, 1.0 if h & 0x80000000 else -1.0
+
+
+class HashingEmbedder:
+    """Offline embedder: signed feature hashing of stemmed words and word pairs.
+
+    Needs no model or network, and is deterministic across processes. It
+    captures vocabulary overlap rather than meaning, so configure a model
+    based embedder (``EMBEDDER``) where paraphrases matter.
+    """
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = tokenize(text)
+            features = Counter(tokens)
+            features.update(f"{a}_{b}" for a, b in zip(tokens, tokens[1:]))
+            for feature, count in features.items():
+                index, sign = _bucket(feature, self.dim)
+                out[row, index] += sign * (1.0 + math.log(count)) * (0.5 if "_" in feature else 1.0)
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        np.divide(out, norms, out=out, where=norms > 0)
+        return out
+
+
+def load_embedder(spec: str = "hashing", dim: int = 512) -> Embedder:
+    """``"hashing"`` or ``"module:factory"``, a callable returning an ``Embedder``."""
+    if spec == "hashing":
+        return HashingEmbedder(dim)
+    module_name, _, attr = spec.partition(":")
+    return getattr(importlib.import_module(module_name), attr)()
+
+
+@dataclass(frozen=True)
+class Neighbor:
+    key: str
+    score: float
+    text: str
+    metadata: Dict[str, Any]
+
+
+class HyperplaneLSH:
+    """Random-hyperplane buckets for approximate cosine search.
+
+    Each of ``tables`` hash tables maps the sign pattern of ``bits`` random
+    projections to the rows that share it; a query is scored exactly against
+    the union of its buckets only.
+    """
+
+    def __init__(self, dim: int, bits: int = 12, tables: int = 8, seed: int = 0):
+        self.bits = bits
+        self.tables = tables
+        self._planes = np.random.default_rng(seed).standard_normal((dim, tables * bits)).astype(np.float32)
+        self._weights = (1 << np.arange(bits)).astype(np.int64)
+        self._buckets: List[Dict[int, List[int]]] = [{} for _ in range(tables)]
+        self.rows = 0
+
+    def codes(self, vectors: np.ndarray) -> np.ndarray:
+        signs = (vectors @ self._planes > 0).reshape(len(vectors), self.tables, self.bits)
+        return signs @ self._weights
+
+    def extend(self, vectors: np.ndarray, upto: int) -> None:
+        for start in range(self.rows, upto, _SEARCH_BLOCK):
+            end = min(start + _SEARCH_BLOCK, upto)
+            for offset, row_codes in enumerate(self.codes(np.asarray(vectors[start:end]))):
+                for table, code in enumerate(row_codes):
+                    self._buckets[table].setdefault(int(code), []).append(start + offset)
+        self.rows = max(self.rows, upto)
+
+    def candidates(self, query: np.ndarray) -> np.ndarray:
+        rows = set()
+        for table, code in enumerate(self.codes(query[None, :])[0]):
+            rows.update(self._buckets[table].get(int(code), ()))
+        return np.fromiter(rows, dtype=np.int64, count=len(rows))
+
+
+class EmbeddingIndex:
+    """Append-only embedding matrix in a memory-mapped float32 file.
+
+    ``vectors.f32`` holds one unit-norm row per entry and ``rows.jsonl`` the
+    key, text and metadata of each row (and deletions). Every process maps the
+    same file read-only, so all API and worker processes share one copy
+    through the page cache; writers append under a file lock and readers pick
+    up new rows on their next search. Top-k cosine similarity is a batched
+    matrix product over blocks of the mapped rows. Past
+    ``ann_min_rows`` rows (or with ``approximate=True``) searches use
+    ``HyperplaneLSH`` candidates instead of a full scan.
+
+    Deleted and superseded rows stay in the files until ``compact`` rewrites
+    them as a new generation, which happens automatically once they
+    outnumber the live rows, or when more than ``max_rows`` rows are live
+    (the oldest are then dropped). Readers switch to the new generation on
+    their next search.
+    """
+
+    def __init__(
+        self, path: Union[str, Path], embedder: Embedder, ann_min_rows: int = 0, max_rows: int = 0
+    ):
+        self.path = Path(path)
+        self.embedder = embedder
+        self.dim = embedder.dim
+        self.ann_min_rows = ann_min_rows
+        self.max_rows = max_rows
+        self._lock = threading.RLock()
+        self._generation = -1
+        self._reset(0)
+        self.path.mkdir(parents=True, exist_ok=True)
+        with file_lock(self.path / ".lock"):
+            self._check_header()
+        self._refresh()
+
+    def _reset(self, generation: int) -> None:
+        self._generation = generation
+        self._keys: List[str] = []
+        self._texts: List[str] = []
+        self._metadata: List[Dict[str, Any]] = []
+        self._rows_by_key: Dict[str, int] = {}
+        self._alive = np.zeros(0, dtype=bool)
+        self._offset = 0
+        self._vectors: Optional[np.memmap] = None
+        self._lsh: Optional[HyperplaneLSH] = None
+
+    def _header(self) -> Dict[str, Any]:
+        return {"embedder": self.embedder.name, "dim": self.dim}
+
+    def _write_header(self, generation: int) -> None:
+        header_path = self.path / _HEADER
+        tmp = header_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({**self._header(), "generation": generation}))
+        os.replace(tmp, header_path)
+
+    def _read_generation(self) -> int:
+        try:
+            return int(json.loads((self.path / _HEADER).read_text()).get("generation", 0))
+        except (FileNotFoundError, ValueError):
+            return self._generation
+
+    def _remove_generations(self, keep: int) -> None:
+        for pattern in ("vectors.*.f32", "rows.*.jsonl"):
+            for file in self.path.glob(pattern):
+                if file.name not in (_VECTORS.format(keep), _ROWS.format(keep)):
+                    file.unlink(missing_ok=True)
+
+    def _check_header(self) -> None:
+        """Start afresh when the stored vectors came from a different embedder."""
+        header_path = self.path / _HEADER
+        if header_path.exists():
+            stored = json.loads(header_path.read_text())
+            if "generation" in stored and {k: stored.get(k) for k in ("embedder", "dim")} == self._header():
+                return
+        self._write_header(0)
+        self._remove_generations(keep=0)
+        for name in (_VECTORS.format(0), _ROWS.format(0)):
+            (self.path / name).unlink(missing_ok=True)
+
+    def __len__(self) -> int:
+        self._refresh()
+        return int(self._alive.sum())
+
+    def __contains__(self, key: str) -> bool:
+        self._refresh()
+        return key in self._rows_by_key
+
+    def _refresh(self) -> None:
+        """Pick up rows and deletions appended since the last call, by any process."""
+        generation = self._read_generation()
+        with self._lock:
+            if generation != self._generation:
+                self._reset(generation)
+            try:
+                with open(self.path / _ROWS.format(generation), "rb") as f:
+                    f.seek(self._offset)
+                    data = f.read()
+            except FileNotFoundError:
+                # Empty, or compacted away since the header was read.
+                return
+            # A writer may be mid-line; only consume complete records.
+            end = data.rfind(b"\n") + 1
+            if not end:
+                return
+            self._offset += end
+            for line in data[:end].splitlines():
+                record = json.loads(line)
+                if "delete" in record:
+                    row = self._rows_by_key.pop(record["delete"], None)
+                    if row is not None:
+                        self._alive[row] = False
+                    continue
+                row = len(self._keys)
+                previous = self._rows_by_key.get(record["key"])
+                if previous is not None:
+                    self._alive[previous] = False
+                self._keys.append(record["key"])
+                self._texts.append(record["text"])
+                self._metadata.append(record.get("meta") or {})
+                self._rows_by_key[record["key"]] = row
+                if row >= len(self._alive):
+                    grown = np.zeros(max(64, 2 * len(self._alive)), dtype=bool)
+                    grown[: len(self._alive)] = self._alive
+                    self._alive = grown
+                self._alive[row] = True
+            rows = len(self._keys)
+            if rows and (self._vectors is None or len(self._vectors) < rows):
+                vectors_path = self.path / _VECTORS.format(generation)
+                try:
+                    capacity = vectors_path.stat().st_size // (4 * self.dim)
+                except FileNotFoundError:
+                    # Compacted meanwhile; the next refresh loads the new generation.
+                    return
+                self._vectors = np.memmap(vectors_path, dtype=np.float32, mode="r", shape=(capacity, self.dim))
+
+    def add(
+        self,
+        keys: Sequence[str],
+        texts: Sequence[str],
+        metadata: Optional[Sequence[Dict[str, Any]]] = None,
+    ) -> int:
+        """Embed and append entries; a key already stored with the same text is skipped.
+
+        Returns the number of rows written.
+        """
+        metadata = metadata or [{} for _ in keys]
+        with file_lock(self.path / ".lock"), self._lock:
+            self._refresh()
+            fresh = [
+                (key, text, meta)
+                for key, text, meta in zip(keys, texts, metadata)
+                if key not in self._rows_by_key or self._texts[self._rows_by_key[key]] != text
+            ]
+            if not fresh:
+                return 0
+            vectors = self.embedder.embed([text for _, text, _ in fresh]).astype(np.float32, copy=False)
+            start = len(self._keys)
+            needed = (start + len(fresh)) * self.dim * 4
+            vectors_path = self.path / _VECTORS.format(self._generation)
+            size = vectors_path.stat().st_size if vectors_path.exists() else 0
+            if size < needed:
+                with open(vectors_path, "ab") as f:
+                    f.truncate(max(needed, 2 * size))
+            block = np.memmap(
+                vectors_path, dtype=np.float32, mode="r+", offset=start * self.dim * 4, shape=(len(fresh), self.dim)
+            )
+            block[:] = vectors
+            block.flush()
+            del block
+            with open(self.path / _ROWS.format(self._generation), "a", encoding="utf-8") as f:
+                f.write("".join(
+                    json.dumps({"key": key, "text": text, "meta": meta}) + "\n" for key, text, meta in fresh
+                ))
+            self._refresh()
+            self._maybe_compact()
+            return len(fresh)
+
+    def remove(self, keys: Sequence[str]) -> int:
+        with file_lock(self.path / ".lock"), self._lock:
+            self._refresh()
+            present = [key for key in keys if key in self._rows_by_key]
+            if present:
+                with open(self.path / _ROWS.format(self._generation), "a", encoding="utf-8") as f:
+                    f.write("".join(json.dumps({"delete": key}) + "\n" for key in present))
+                self._refresh()
+                self._maybe_compact()
+            return len(present)
+
+    def _maybe_compact(self) -> None:
+        live = int(self._alive.sum())
+        garbage = len(self._keys) - live
+        # Trimming to max_rows allows 10% slack so it is not a rewrite per add.
+        if (garbage >= _COMPACT_MIN_GARBAGE and garbage > live) or (
+            self.max_rows and live > self.max_rows * 1.1
+        ):
+            self._compact()
+
+    def compact(self) -> int:
+        """Rewrite the files with only the live rows (the newest ``max_rows``); returns rows dropped."""
+        with file_lock(self.path / ".lock"), self._lock:
+            self._refresh()
+            return self._compact()
+
+    def _compact(self) -> int:
+        # Caller holds the file lock (flock is not reentrant) and has refreshed.
+        with self._lock:
+            live = np.flatnonzero(self._alive[: len(self._keys)])
+            if self.max_rows and len(live) > self.max_rows:
+                live = live[-self.max_rows:]
+            dropped = len(self._keys) - len(live)
+            if not dropped:
+                return 0
+            generation = self._generation + 1
+            if len(live):
+                vectors = np.memmap(
+                    self.path / _VECTORS.format(generation), dtype=np.float32, mode="w+", shape=(len(live), self.dim)
+                )
+                for start in range(0, len(live), _SEARCH_BLOCK):
+                    block = live[start:start + _SEARCH_BLOCK]
+                    vectors[start:start + len(block)] = self._vectors[block]
+                vectors.flush()
+                del vectors
+            with open(self.path / _ROWS.format(generation), "w", encoding="utf-8") as f:
+                f.write("".join(
+                    json.dumps({"key": self._keys[row], "text": self._texts[row], "meta": self._metadata[row]}) + "\n"
+                    for row in live
+                ))
+            self._write_header(generation)
+            self._remove_generations(keep=generation)
+            self._refresh()
+            logger.info("Compacted %s: dropped %d rows, %d remain", self.path, dropped, len(live))
+            return dropped
+
+    def keys(self) -> List[str]:
+        self._refresh()
+        return list(self._rows_by_key)
+
+    def search(
+        self,
+        queries: Sequence[str],
+        k: int = 5,
+        min_score: float = -1.0,
+        approximate: Optional[bool] = None,
+    ) -> List[List[Neighbor]]:
+        """The ``k`` most similar entries to each query, most similar first."""
+        return self.search_vectors(self.embedder.embed(queries), k, min_score, approximate)
+
+    def search_vectors(
+        self,
+        queries: np.ndarray,
+        k: int = 5,
+        min_score: float = -1.0,
+        approximate: Optional[bool] = None,
+    ) -> List[List[Neighbor]]:
+        self._refresh()
+        with self._lock:
+            rows = len(self._keys)
+            if not rows or k < 1 or self._vectors is None:
+                return [[] for _ in range(len(queries))]
+            if approximate is None:
+                approximate = bool(self.ann_min_rows) and rows >= self.ann_min_rows
+            if approximate:
+                results = [self._approximate(query, k, rows) for query in queries]
+            else:
+                results = self._exact(queries, k, rows)
+            return [
+                [
+                    Neighbor(self._keys[row], round(float(score), 6), self._texts[row], self._metadata[row])
+                    for row, score in pairs
+                    if score >= min_score
+                ]
+                for pairs in results
+            ]
+
+    def _exact(self, queries: np.ndarray, k: int, rows: int) -> List[List[Tuple[int, float]]]:
+        best_scores = np.empty((len(queries), 0), dtype=np.float32)
+        best_rows = np.empty((len(queries), 0), dtype=np.int64)
+        for start in range(0, rows, _SEARCH_BLOCK):
+            end = min(start + _SEARCH_BLOCK, rows)
+            scores = queries @ self._vectors[start:end].T
+            scores[:, ~self._alive[start:end]] = -np.inf
+            take = min(k, end - start)
+            top = np.argpartition(-scores, take - 1, axis=1)[:, :take]
+            best_scores = np.concatenate([best_scores, np.take_along_axis(scores, top, axis=1)], axis=1)
+            best_rows = np.concatenate([best_rows, top + start], axis=1)
+            if best_scores.shape[1] > k:
+                keep = np.argpartition(-best_scores, k - 1, axis=1)[:, :k]
+                best_scores = np.take_along_axis(best_scores, keep, axis=1)
+                best_rows = np.take_along_axis(best_rows, keep, axis=1)
+        order = np.argsort(-best_scores, axis=1, kind="stable")
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        best_rows = np.take_along_axis(best_rows, order, axis=1)
+        return [
+            [(int(r), float(s)) for r, s in zip(row_ids, scores) if np.isfinite(s)]
+            for row_ids, scores in zip(best_rows, best_scores)
+        ]
+
+    def _approximate(self, query: np.ndarray, k: int, rows: int) -> List[Tuple[int, float]]:
+        if self._lsh is None:
+            self._lsh = HyperplaneLSH(self.dim)
+        self._lsh.extend(self._vectors, rows)
+        candidates = self._lsh.candidates(query)
+        candidates = candidates[self._alive[candidates]] if len(candidates) else candidates
+        if len(candidates) < k:
+            return self._exact(query[None, :], k, rows)[0]
+        candidates = np.sort(candidates)
+        scores = self._vectors[candidates] @ query
+        top = np.argsort(-scores, kind="stable")[:k]
+        return [(int(candidates[i]), float(scores[i])) for i in top]
+
+    def stats(self) -> Dict[str, Any]:
+        self._refresh()
+        return {
+            "embedder": self.embedder.name,
+            "dim": self.dim,
+            "rows": len(self._keys),
+            "live": int(self._alive.sum()),
+            "generation": self._generation,
+            "mapped_bytes": 0 if self._vectors is None else int(self._vectors.nbytes),
+        }
+
+
+_EMBEDDER: Optional[Embedder] = None
+_INDEXES: Dict[str, EmbeddingIndex] = {}
+_INDEXES_LOCK = threading.Lock()
+
+def get_embedder() -> Embedder:
+    global _EMBEDDER
+    if _EMBEDDER is None:
+        settings = get_settings()
+        _EMBEDDER = load_embedder(settings.embedder, settings.embedding_dim)
+    return _EMBEDDER
+
+
+def get_embedding_index(name: str, max_rows: int = 0) -> EmbeddingIndex:
+    """The shared index ``name`` under ``EMBEDDING_INDEX_DIR``, keeping at most ``max_rows`` rows (0: no limit)."""
+    with _INDEXES_LOCK:
+        if name not in _INDEXES:
+            settings = get_settings()
+            _INDEXES[name] = EmbeddingIndex(
+                Path(settings.embedding_index_dir) / name,
+                get_embedder(),
+                settings.embedding_ann_min_rows,
+                max_rows,
+            )
+        return _INDEXES[name]
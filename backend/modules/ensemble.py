@@ -0,0 +1,89 @@
+# backend/modules/ensemble.py
+import itertools
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Mapping, Sequence
+
+from api.models import JOB_COMPLETED, JOB_FAILED
+from utils.error_handlers import ValidationError
+
+SWEEP_DECISIONS = "decisions"
+SWEEP_PARAMETERS = "parameters"
+
+
+def decision_grid(options: Mapping[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """Cartesian product of model decision options, one pinned choice per member."""
+    if not options:
+        raise ValidationError("Ensemble requires at least one decision option to sweep")
+    keys = sorted(options)
+    choices = []
+    for key in keys:
+        values = options[key]
+        if isinstance(values, (str, bytes)) or not values:
+            raise ValidationError(f"Decision option '{key}' must be a non-empty list")
+        choices.append(list(values))
+    return [
+        {"DECISION_OPTIONS": {key: [value] for key, value in zip(keys, combo)}}
+        for combo in itertools.product(*choices)
+    ]
+
+
+def expand_ensemble(
+    parameters: Mapping[str, Any],
+    template_base: Mapping[str, Any],
+    max_members: int,
+) -> List[Dict[str, Any]]:
+    """Expand an ENSEMBLE submission into the parameters of its member jobs.
+
+    ``sweep="decisions"`` (default) runs every combination of
+    ``decision_options``, falling back to the template's ``DECISION_OPTIONS``.
+    ``sweep="parameters"`` is rejected: member runs have no way to set
+    parameter values, so every member would be the same run. Use a
+    CALIBRATION job to search parameter space instead.
+    """
+    sweep = parameters.get("sweep", SWEEP_DECISIONS)
+    if sweep == SWEEP_DECISIONS:
+        options = parameters.get("decision_options") or template_base.get("DECISION_OPTIONS") or {}
+        overrides = decision_grid(options)
+    elif sweep == SWEEP_PARAMETERS:
+        raise ValidationError(
+            "Parameter sweeps are not supported: model runs cannot take parameter values yet. "
+            "Submit a CALIBRATION job to search parameter ranges."
+        )
+    else:
+        raise ValidationError(f"Unknown ensemble sweep '{sweep}'")
+
+    if len(overrides) > max_members:
+        raise ValidationError(f"Ensemble would create {len(overrides)} members; the limit is {max_members}")
+
+    shared = {k: v for k, v in parameters.items() if k in ("model", "watershed")}
+    return [
+        {**shared, "member_index": index, "config_overrides": member_overrides}
+        for index, member_overrides in enumerate(overrides)
+    ]
+
+
+def aggregate_members(members: Iterable[Any]) -> Dict[str, Any]:
+    """Summarise finished member jobs (rows with id, status, parameters, result)."""
+    rows = []
+    counts: Counter = Counter()
+    for member in members:
+        counts[member.status] += 1
+        rows.append({
+            "job_id": member.id,
+            "member_index": member.parameters.get("member_index"),
+            "status": member.status,
+            "config_overrides": member.parameters.get("config_overrides"),
+            "result": member.result,
+        })
+    rows.sort(key=lambda r: (r["member_index"] is None, r["member_index"]))
+    return {
+        "members": len(rows),
+        "status_counts": dict(counts),
+        "completed": counts.get(JOB_COMPLETED, 0),
+        "results": rows,
+    }
+
+
+def ensemble_status(summary: Mapping[str, Any]) -> str:
+    """An ensemble succeeds if any member produced a result."""
+    return JOB_COMPLETED if summary["completed"] else JOB_FAILED
@@ -0,0 +1,303 @@
+# backend/modules/forcing_cache.py
+import hashlib
+import itertools
+import json
+import logging
+import os
+import shutil
+import stat
+import time
+import uuid
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from typing import Any, Callable, ContextManager, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from utils.config import get_settings
+from utils.error_handlers import NotFoundError
+from utils.file_lock import LockUnavailable, file_lock
+
+logger = logging.getLogger(__name__)
+
+_INDEX = "index.json"
+FORCING_SUFFIXES = (".nc", ".nc4", ".netcdf")
+
+# A loaded source: coordinates by name, and variables as (dims, sliceable array).
+ForcingSource = Tuple[Dict[str, np.ndarray], Dict[str, Tuple[Sequence[str], Any]]]
+
+
+def forcing_files(source_dir: Path) -> List[Path]:
+    return sorted(p for p in Path(source_dir).rglob("*") if p.suffix in FORCING_SUFFIXES and p.is_file())
+
+
+def source_fingerprint(source_dir: Path) -> str:
+    """Hash of the forcing files' names, sizes and modification times."""
+    digest = hashlib.sha256()
+    for path in forcing_files(source_dir):
+        st = path.stat()
+        digest.update(f"{path.relative_to(source_dir)}\0{st.st_size}\0{st.st_mtime_ns}\n".encode())
+    return digest.hexdigest()[:24]
+
+
+@contextmanager
+def load_netcdf_forcing(files: Sequence[Path], time_chunk: int) -> Iterator[ForcingSource]:
+    """Open forcing NetCDF files as one dask-backed dataset ordered by time.
+
+    Variables are read lazily in ``time_chunk`` slabs, so conversion never
+    holds a whole source in memory; the files are closed on exit.
+    """
+    try:
+        import xarray as xr
+    except ImportError as e:
+        raise RuntimeError("xarray is required to convert NetCDF forcing") from e
+
+    with xr.open_mfdataset(
+        [str(path) for path in files],
+        combine="by_coords",
+        chunks={"time": time_chunk},
+        data_vars="minimal",
+        coords="minimal",
+        compat="override",
+    ) as ds:
+        ds = ds.sortby("time")
+        coords = {name: np.asarray(ds[name].values) for name in ds.coords if ds[name].ndim == 1}
+        variables = {}
+        for name, da in ds.data_vars.items():
+            if da.dims and da.dims[0] == "time":
+                variables[name] = (list(da.dims), da.variable)
+            elif da.ndim == 1:
+                coords[name] = np.asarray(da.values)
+        yield coords, variables
+
+
+def chunk_grid(shape: Sequence[int], chunks: Sequence[int]) -> List[int]:
+    return [-(-size // chunk) for size, chunk in zip(shape, chunks)]
+
+
+def chunk_name(index: Sequence[int]) -> str:
+    return "c." + ".".join(str(i) for i in index) + ".npy"
+
+
+class ForcingDataset:
+    """Read-only view of one converted forcing entry.
+
+    Each variable is split into ``(time, *space)`` chunks saved as raw ``.npy``
+    files and opened as memory maps, so concurrent jobs share decoded forcing
+    through the page cache and a read touches only the chunks it overlaps.
+    While open it holds a shared lock that stops the cache from pruning it;
+    use it as a context manager or call ``close``.
+    """
+
+    def __init__(self, path: Path, lock_path: Optional[Path] = None):
+        self.path = Path(path)
+        self._stack = ExitStack()
+        if lock_path is not None:
+            self._stack.enter_context(file_lock(lock_path, shared=True))
+        with open(self.path / _INDEX) as f:
+            self.index: Dict[str, Any] = json.load(f)
+        self._coords: Dict[str, np.ndarray] = {}
+
+    def __enter__(self) -> "ForcingDataset":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+    def close(self) -> None:
+        self._stack.close()
+
+    @property
+    def fingerprint(self) -> str:
+        return self.index["fingerprint"]
+
+    @property
+    def variables(self) -> Dict[str, Dict[str, Any]]:
+        return self.index["variables"]
+
+    def coord(self, name: str) -> np.ndarray:
+        array = self._coords.get(name)
+        if array is None:
+            if name not in self.index["coords"]:
+                raise NotFoundError(f"Coordinate '{name}' not found in forcing")
+            array = self._coords[name] = np.load(self.path / "coords" / f"{name}.npy", mmap_mode="r")
+        return array
+
+    def variable(self, name: str) -> Dict[str, Any]:
+        meta = self.variables.get(name)
+        if meta is None:
+            raise NotFoundError(f"Forcing variable '{name}' not found")
+        return meta
+
+    def chunk(self, name: str, index: Sequence[int]) -> np.ndarray:
+        return np.load(self.path / name / chunk_name(index), mmap_mode="r")
+
+    def read(self, name: str, selection: Sequence[slice]) -> np.ndarray:
+        """Assemble ``variable[selection]`` from the chunks it overlaps (step-1 slices)."""
+        meta = self.variable(name)
+        shape, chunks = meta["shape"], meta["chunks"]
+        bounds = [sel.indices(size)[:2] for sel, size in zip(list(selection) + [slice(None)] * len(shape), shape)]
+        out = np.empty([max(0, hi - lo) for lo, hi in bounds], dtype=meta["dtype"])
+        if out.size == 0:
+            return out
+        ranges = [range(lo // c, (hi - 1) // c + 1) for (lo, hi), c in zip(bounds, chunks)]
+        for index in itertools.product(*ranges):
+            data = self.chunk(name, index)
+            src, dst = [], []
+            for axis, i in enumerate(index):
+                origin = i * chunks[axis]
+                lo = max(bounds[axis][0], origin)
+                hi = min(bounds[axis][1], origin + data.shape[axis])
+                src.append(slice(lo - origin, hi - origin))
+                dst.append(slice(lo - bounds[axis][0], hi - bounds[axis][0]))
+            out[tuple(dst)] = data[tuple(src)]
+        return out
+
+
+class ForcingCache:
+    """Converts each domain's forcing once and shares the result across jobs.
+
+    Entries live under ``<root>/<domain>/<fingerprint>``; the fingerprint covers
+    every source file's size and mtime, so edited forcing produces a new entry
+    and older ones are removed once no reader holds them. Builds are
+    serialised per domain with a file lock and published by atomic rename.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        time_chunk: int = 720,
+        space_chunk: int = 64,
+        loader: Callable[[Sequence[Path], int], ContextManager[ForcingSource]] = load_netcdf_forcing,
+    ):
+        self.root = Path(root)
+        self.time_chunk = time_chunk
+        self.space_chunk = space_chunk
+        self.loader = loader
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.builds = 0
+
+    def _entry(self, domain: str, fingerprint: str) -> Path:
+        return self.root / domain / fingerprint
+
+    def _lock_path(self, domain: str) -> Path:
+        return self.root / f".{domain}.lock"
+
+    def _entry_lock_path(self, domain: str, fingerprint: str) -> Path:
+        return self.root / domain / f".{fingerprint}.lock"
+
+    def _open(self, domain: str, fingerprint: str) -> ForcingDataset:
+        return ForcingDataset(self._entry(domain, fingerprint), self._entry_lock_path(domain, fingerprint))
+
+    def get(self, domain: str, source_dir: Path) -> ForcingDataset:
+        """The converted forcing for ``source_dir``, building it on first use.
+
+        The caller owns the returned dataset and should close it when done.
+        """
+        source_dir = Path(source_dir)
+        if not source_dir.exists():
+            raise NotFoundError(f"Forcing directory {source_dir} not found")
+        fingerprint = source_fingerprint(source_dir)
+        if (self._entry(domain, fingerprint) / _INDEX).exists():
+            return self._open(domain, fingerprint)
+
+        with file_lock(self._lock_path(domain)):
+            if not (self._entry(domain, fingerprint) / _INDEX).exists():
+                self._build(domain, source_dir, fingerprint)
+            dataset = self._open(domain, fingerprint)
+        self._prune(domain, keep=fingerprint)
+        return dataset
+
+    def _build(self, domain: str, source_dir: Path, fingerprint: str) -> None:
+        files = forcing_files(source_dir)
+        if not files:
+            raise NotFoundError(f"No forcing files found in {source_dir}")
+        started = time.monotonic()
+        staging = self.root / domain / f".staging-{uuid.uuid4().hex}"
+        (staging / "coords").mkdir(parents=True)
+        try:
+            with self.loader(files, self.time_chunk) as (coords, variables):
+                index = self._write_entry(staging, source_dir, files, fingerprint, coords, variables)
+            for dirpath, _dirnames, filenames in os.walk(staging):
+                for filename in filenames:
+                    path = os.path.join(dirpath, filename)
+                    os.chmod(path, stat.S_IMODE(os.stat(path).st_mode) & ~0o222)
+            os.rename(staging, self._entry(domain, fingerprint))
+        finally:
+            if staging.exists():
+                shutil.rmtree(staging, ignore_errors=True)
+        self.builds += 1
+        logger.info(
+            "Converted forcing for %s (%d file(s), %d variable(s)) in %.1fs",
+            domain, len(files), len(index["variables"]), time.monotonic() - started,
+        )
+
+    def _write_entry(
+        self,
+        staging: Path,
+        source_dir: Path,
+        files: Sequence[Path],
+        fingerprint: str,
+        coords: Dict[str, np.ndarray],
+        variables: Dict[str, Tuple[Sequence[str], Any]],
+    ) -> Dict[str, Any]:
+        for name, values in coords.items():
+            np.save(staging / "coords" / f"{name}.npy", np.asarray(values))
+        index = {
+            "fingerprint": fingerprint,
+            "sources": [str(p.relative_to(source_dir)) for p in files],
+            "coords": sorted(coords),
+            "variables": {
+                name: self._write_variable(staging / name, dims, source)
+                for name, (dims, source) in variables.items()
+            },
+            "created_at": time.time(),
+        }
+        with open(staging / _INDEX, "w") as f:
+            json.dump(index, f)
+        return index
+
+    def _write_variable(self, dest: Path, dims: Sequence[str], source: Any) -> Dict[str, Any]:
+        dest.mkdir()
+        shape = list(source.shape)
+        chunks = [min(self.time_chunk, shape[0])] + [min(self.space_chunk, s) for s in shape[1:]]
+        dtype = np.float32 if np.issubdtype(np.dtype(source.dtype), np.floating) else np.dtype(source.dtype)
+        for t in range(chunk_grid(shape, chunks)[0]):
+            # Decode one time slab at a time so large sources never sit in memory whole.
+            slab = np.asarray(source[t * chunks[0]:(t + 1) * chunks[0]], dtype=dtype)
+            for rest in itertools.product(*(range(n) for n in chunk_grid(shape[1:], chunks[1:]))):
+                selection = tuple(slice(i * c, (i + 1) * c) for i, c in zip(rest, chunks[1:]))
+                np.save(dest / chunk_name((t,) + rest), np.ascontiguousarray(slab[(slice(None),) + selection]))
+        return {"dims": list(dims), "shape": shape, "chunks": chunks, "dtype": np.dtype(dtype).str}
+
+    def _prune(self, domain: str, keep: str) -> None:
+        """Remove superseded entries that no job currently has open."""
+        for entry in (self.root / domain).iterdir():
+            if entry.name == keep or entry.name.startswith("."):
+                continue
+            lock_path = self._entry_lock_path(domain, entry.name)
+            try:
+                with file_lock(lock_path, blocking=False):
+                    shutil.rmtree(entry, ignore_errors=True)
+            except LockUnavailable:
+                continue
+            lock_path.unlink(missing_ok=True)
+            logger.info("Removed outdated forcing cache %s/%s", domain, entry.name)
+
+    def stats(self) -> Dict[str, Any]:
+        domains = {}
+        for domain_dir in self.root.iterdir():
+            if domain_dir.is_dir() and not domain_dir.name.startswith("."):
+                domains[domain_dir.name] = [e.name for e in domain_dir.iterdir() if (e / _INDEX).exists()]
+        return {"domains": domains, "builds": self.builds}
+
+
+_CACHE: Optional[ForcingCache] = None
+
+def get_forcing_cache() -> Optional[ForcingCache]:
+    global _CACHE
+    settings = get_settings()
+    if _CACHE is None and settings.forcing_cache_dir:
+        _CACHE = ForcingCache(settings.forcing_cache_dir, settings.forcing_time_chunk, settings.forcing_space_chunk)
+    return _CACHE
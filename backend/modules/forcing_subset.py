@@ -0,0 +1,233 @@
+# backend/modules/forcing_subset.py
+import json
+import logging
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from modules.forcing_cache import ForcingDataset
+from utils.error_handlers import ValidationError
+
+logger = logging.getLogger(__name__)
+
+LAT_NAMES = ("lat", "latitude")
+LON_NAMES = ("lon", "longitude")
+SUBSET_FILE = "forcing_subset.nc"
+
+
+@dataclass(frozen=True)
+class BoundingBox:
+    north: float
+    west: float
+    south: float
+    east: float
+
+    @classmethod
+    def parse(cls, text: str) -> "BoundingBox":
+        """SYMFLUENCE ``BOUNDING_BOX_COORDS`` order: ``lat_max/lon_min/lat_min/lon_max``."""
+        try:
+            north, west, south, east = (float(v) for v in str(text).split("/"))
+        except ValueError as e:
+            raise ValidationError(f"Invalid bounding box '{text}'") from e
+        if south > north or west > east:
+            raise ValidationError(f"Bounding box '{text}' is not lat_max/lon_min/lat_min/lon_max")
+        return cls(north, west, south, east)
+
+
+def parse_period(text: str) -> Tuple[str, str]:
+    """``"2012-10-01, 2015-09-30"`` -> ``("2012-10-01", "2015-09-30")``."""
+    parts = [p.strip() for p in str(text).split(",")]
+    if len(parts) != 2 or not all(parts):
+        raise ValidationError(f"Invalid period '{text}'")
+    return parts[0], parts[1]
+
+
+def axis_range(coord: np.ndarray, low: float, high: float) -> slice:
+    """Contiguous index range of a monotonic 1-D coordinate within ``[low, high]``."""
+    n = len(coord)
+    if n == 0:
+        return slice(0, 0)
+    if coord[0] <= coord[-1]:
+        return slice(int(np.searchsorted(coord, low, "left")), int(np.searchsorted(coord, high, "right")))
+    # Descending coordinates (e.g. ERA5 latitude run north to south).
+    reverse = coord[::-1]
+    j0 = int(np.searchsorted(reverse, low, "left"))
+    j1 = int(np.searchsorted(reverse, high, "right"))
+    return slice(n - j1, n - j0)
+
+
+def time_range(times: np.ndarray, start: Optional[str], end: Optional[str]) -> slice:
+    unit = np.datetime_data(times.dtype)[0] if np.issubdtype(times.dtype, np.datetime64) else "s"
+    i0 = 0 if not start else int(np.searchsorted(times, np.datetime64(start, unit), "left"))
+    i1 = len(times) if not end else int(np.searchsorted(times, np.datetime64(end, unit), "right"))
+    return slice(i0, max(i0, i1))
+
+
+def _longitudes_for(coord: np.ndarray, bbox: BoundingBox) -> Tuple[float, float]:
+    # Sources on a 0..360 grid get the box shifted into the same convention.
+    if len(coord) and float(np.max(coord)) > 180 and bbox.west < 0:
+        return bbox.west + 360, bbox.east + 360
+    return bbox.west, bbox.east
+
+
+@dataclass
+class Selection:
+    """Per-variable read plan: contiguous slices plus optional point picks on axis 1."""
+    slices: List[slice]
+    points: Optional[np.ndarray] = None
+
+
+def plan_subset(dataset: ForcingDataset, bbox: BoundingBox, start: Optional[str], end: Optional[str]) -> Dict[str, Selection]:
+    """Index ranges of every variable overlapping ``bbox`` and ``[start, end]``.
+
+    Gridded dimensions are cut with binary searches on their 1-D coordinates;
+    point dimensions (HRUs, stations) use a vectorised mask over per-point
+    latitude/longitude and are read as the tightest enclosing range.
+    """
+    coords = set(dataset.index["coords"])
+    times = dataset.coord("time") if "time" in coords else None
+    plans = {}
+    for name, meta in dataset.variables.items():
+        dims, shape = meta["dims"], meta["shape"]
+        slices = [time_range(times, start, end) if times is not None else slice(None)]
+        points = None
+        for axis, (dim, size) in enumerate(zip(dims[1:], shape[1:]), start=1):
+            if dim in LAT_NAMES and dim in coords:
+                slices.append(axis_range(dataset.coord(dim), bbox.south, bbox.north))
+            elif dim in LON_NAMES and dim in coords:
+                lon = dataset.coord(dim)
+                slices.append(axis_range(lon, *_longitudes_for(lon, bbox)))
+            else:
+                lat_name = next((c for c in LAT_NAMES if c in coords and len(dataset.coord(c)) == size), None)
+                lon_name = next((c for c in LON_NAMES if c in coords and len(dataset.coord(c)) == size), None)
+                if axis != 1 or points is not None or lat_name is None or lon_name is None:
+                    slices.append(slice(None))
+                    continue
+                lat, lon = np.asarray(dataset.coord(lat_name)), np.asarray(dataset.coord(lon_name))
+                west, east = _longitudes_for(lon, bbox)
+                inside = np.flatnonzero((lat >= bbox.south) & (lat <= bbox.north) & (lon >= west) & (lon <= east))
+                if len(inside) == 0:
+                    slices.append(slice(0, 0))
+                    continue
+                slices.append(slice(int(inside[0]), int(inside[-1]) + 1))
+                points = inside - inside[0]
+        plans[name] = Selection(slices, points)
+    return plans
+
+
+def subset_shape(meta: Dict[str, Any], plan: Selection) -> List[int]:
+    """Shape of a variable once ``plan`` is applied."""
+    shape = []
+    for axis, sel in enumerate(plan.slices):
+        lo, hi, _ = sel.indices(meta["shape"][axis])
+        shape.append(len(plan.points) if axis == 1 and plan.points is not None else max(0, hi - lo))
+    return shape
+
+
+def read_subset(dataset: ForcingDataset, name: str, plan: Selection) -> Iterator[Tuple[int, np.ndarray]]:
+    """Yield ``(time offset, block)`` of the selected part of ``name``, one time chunk at a time.
+
+    Blocks are aligned with the source chunk grid, so each chunk is read once
+    and only chunks overlapping the selection are touched.
+    """
+    meta = dataset.variable(name)
+    time_chunk = meta["chunks"][0]
+    t0, t1, _ = plan.slices[0].indices(meta["shape"][0])
+    block_start = t0
+    while block_start < t1:
+        block_end = min(t1, (block_start // time_chunk + 1) * time_chunk)
+        block = dataset.read(name, [slice(block_start, block_end)] + plan.slices[1:])
+        if plan.points is not None:
+            block = np.take(block, plan.points, axis=1)
+        yield block_start - t0, block
+        block_start = block_end
+
+
+def subset_coords(dataset: ForcingDataset, plans: Dict[str, Selection]) -> Dict[str, Tuple[str, np.ndarray]]:
+    """Each coordinate cut to the subset, with the dimension it runs along."""
+    coords = {}
+    for coord_name in dataset.index["coords"]:
+        values, dim = np.asarray(dataset.coord(coord_name)), coord_name
+        for name, plan in plans.items():
+            meta = dataset.variable(name)
+            if coord_name in meta["dims"]:
+                axis = meta["dims"].index(coord_name)
+                values = values[plan.slices[axis]]
+                if axis == 1 and plan.points is not None:
+                    values = values[plan.points]
+                break
+            if plan.points is not None and len(values) == meta["shape"][1]:
+                values = values[plan.slices[1]][plan.points]  # per-point latitude/longitude
+                dim = meta["dims"][1]
+                break
+        coords[coord_name] = (dim, values)
+    return coords
+
+
+def _open_netcdf(path: Path):
+    try:
+        import netCDF4
+    except ImportError as e:
+        raise RuntimeError("netCDF4 is required to write forcing subsets") from e
+    return netCDF4.Dataset(str(path), "w")
+
+
+def _encode(values: np.ndarray) -> Tuple[np.ndarray, Dict[str, str]]:
+    if np.issubdtype(values.dtype, np.datetime64):
+        seconds = values.astype("datetime64[s]").astype(np.int64)
+        return seconds, {"units": "seconds since 1970-01-01 00:00:00", "calendar": "standard"}
+    return values, {}
+
+
+def subset_forcing(
+    dataset: ForcingDataset,
+    bbox: BoundingBox,
+    start: Optional[str],
+    end: Optional[str],
+    dest: Path,
+) -> Dict[str, Any]:
+    """Write the part of ``dataset`` inside ``bbox`` and ``[start, end]`` to ``dest/SUBSET_FILE``.
+
+    The subset is a NetCDF file the model can read as its forcing. Each
+    variable is streamed into it one time chunk at a time, so only overlapping
+    chunks are read and the subset never has to fit in memory.
+    """
+    dest = Path(dest)
+    dest.mkdir(parents=True, exist_ok=True)
+    plans = plan_subset(dataset, bbox, start, end)
+    shapes = {name: subset_shape(dataset.variable(name), plan) for name, plan in plans.items()}
+    coords = subset_coords(dataset, plans)
+    summary: Dict[str, Any] = {
+        "bbox": asdict(bbox),
+        "start": start,
+        "end": end,
+        "file": SUBSET_FILE,
+        "variables": {name: {"dims": dataset.variable(name)["dims"], "shape": shape} for name, shape in shapes.items()},
+    }
+
+    sizes: Dict[str, int] = {dim: len(values) for dim, values in coords.values()}
+    for name, shape in shapes.items():
+        sizes.update(zip(dataset.variable(name)["dims"], shape))
+    path = dest / SUBSET_FILE
+    path.unlink(missing_ok=True)
+    with _open_netcdf(path) as nc:
+        for dim, size in sizes.items():
+            nc.createDimension(dim, size)
+        for coord_name, (dim, values) in coords.items():
+            values, attrs = _encode(values)
+            var = nc.createVariable(coord_name, values.dtype, (dim,))
+            var.setncatts(attrs)
+            var[:] = values
+        for name, plan in plans.items():
+            meta = dataset.variable(name)
+            var = nc.createVariable(name, np.dtype(meta["dtype"]), tuple(meta["dims"]))
+            if 0 in shapes[name]:
+                continue
+            for offset, block in read_subset(dataset, name, plan):
+                var[offset:offset + len(block)] = block
+
+    with open(dest / "subset.json", "w") as f:
+        json.dump(summary, f, default=str)
+    return summary
@@ -0,0 +1,61 @@
+# backend/modules/job_dedup.py
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from modules.forcing_cache import source_fingerprint
+
+# Parameters that change how a job is run or reported, not what it computes.
+NON_SEMANTIC_KEYS = frozenset({"member_index", "profile"})
+
+_DATA_VERSION_TTL = 60.0
+_data_versions: Dict[Path, Tuple[float, str]] = {}
+_data_versions_lock = threading.Lock()
+
+
+def input_data_version(data_dir: Optional[str], domain: Optional[str]) -> Optional[str]:
+    """Fingerprint of a domain's NetCDF inputs (names, sizes, mtimes).
+
+    Scanning a large data tree on every submission is wasteful, so results
+    are reused for a minute.
+    """
+    if not data_dir or not domain:
+        return None
+    path = Path(data_dir) / f"domain_{domain}"
+    if not path.exists():
+        return None
+    now = time.monotonic()
+    with _data_versions_lock:
+        cached = _data_versions.get(path)
+        if cached and cached[0] > now:
+            return cached[1]
+    version = source_fingerprint(path)
+    with _data_versions_lock:
+        _data_versions[path] = (now + _DATA_VERSION_TTL, version)
+    return version
+
+
+def canonical_parameters(parameters: Mapping[str, Any]) -> str:
+    return json.dumps(
+        {k: v for k, v in parameters.items() if k not in NON_SEMANTIC_KEYS},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+
+
+def job_content_hash(
+    job_type: str,
+    parameters: Mapping[str, Any],
+    template_version: Optional[str],
+    data_version: Optional[str],
+) -> str:
+    """Identity of a job's computation: type, parameters and the versions of its inputs."""
+    digest = hashlib.sha256()
+    for part in (job_type, canonical_parameters(parameters), template_version or "", data_version or ""):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
@@ -0,0 +1,136 @@
+# backend/modules/job_metrics.py
+import math
+import pstats
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Sequence
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    resource = None
+
+# Phase markers sent by the job runner itself rather than by job code.
+STARTED = "started"
+FINISHED = "finished"
+
+
+def _proc_io() -> Dict[str, int]:
+    try:
+        with open("/proc/self/io") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line)
+        return {"io_read_bytes": int(fields["read_bytes"]), "io_write_bytes": int(fields["write_bytes"])}
+    except (OSError, KeyError, ValueError):
+        return {}
+
+
+def resource_usage() -> Dict[str, Any]:
+    """CPU, peak memory and I/O of this process and the children it has reaped."""
+    usage: Dict[str, Any] = {}
+    if resource is not None:
+        own = resource.getrusage(resource.RUSAGE_SELF)
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        usage = {
+            "cpu_user_seconds": round(own.ru_utime + children.ru_utime, 3),
+            "cpu_system_seconds": round(own.ru_stime + children.ru_stime, 3),
+            # ru_maxrss is in kilobytes on Linux.
+            "peak_rss_mb": round(max(own.ru_maxrss, children.ru_maxrss) / 1024, 1),
+            "io_read_bytes": (own.ru_inblock + children.ru_inblock) * 512,
+            "io_write_bytes": (own.ru_oublock + children.ru_oublock) * 512,
+        }
+    usage.update(_proc_io())
+    return usage
+
+
+def profile_summary(stats: pstats.Stats, limit: int = 30) -> List[Dict[str, Any]]:
+    """The ``limit`` functions with the most cumulative time."""
+    rows = []
+    for (filename, line, name), (_cc, calls, total, cumulative, _callers) in stats.stats.items():
+        rows.append({
+            "function": f"{filename}:{line}({name})",
+            "calls": calls,
+            "total_seconds": round(total, 4),
+            "cumulative_seconds": round(cumulative, 4),
+        })
+    rows.sort(key=lambda row: row["cumulative_seconds"], reverse=True)
+    return rows[:limit]
+
+
+def summarize(messages: Sequence[Dict[str, Any]], started_at: float, ended_at: float) -> Dict[str, Any]:
+    """Metrics record of one job from the runner's progress messages.
+
+    Each phase lasts until the next phase message (or until the process ended,
+    for a job that was killed); ``startup`` is the time from launching the
+    process to its first message. Resource figures come from the last usage
+    snapshot, which phase messages carry.
+    """
+    phases = [m for m in messages if m.get("type") == "phase"]
+    if not phases:
+        return {}
+    durations: Dict[str, float] = {"startup": round(phases[0]["time"] - started_at, 3)}
+    for current, following in zip(phases, phases[1:] + [{"time": ended_at}]):
+        if current["phase"] == FINISHED:
+            continue
+        durations[current["phase"]] = round(
+            durations.get(current["phase"], 0.0) + following["time"] - current["time"], 3
+        )
+    metrics: Dict[str, Any] = {
+        "wall_seconds": round(ended_at - started_at, 3),
+        "phases": durations,
+        "warm": phases[0].get("warm"),
+        "completed": phases[-1]["phase"] == FINISHED,
+    }
+    usage = next((m["usage"] for m in reversed(phases) if m.get("usage")), None)
+    if usage:
+        metrics.update(usage)
+    profile = next((m["functions"] for m in messages if m.get("type") == "profile"), None)
+    if profile is not None:
+        metrics["profile"] = profile
+    return metrics
+
+
+def _percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+def _describe(values: List[float]) -> Dict[str, float]:
+    return {
+        "mean": round(sum(values) / len(values), 3),
+        "p50": _percentile(values, 0.5),
+        "p95": _percentile(values, 0.95),
+        "max": max(values),
+    }
+
+
+def aggregate(records: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Per-job-type distributions of wall time, phase times, CPU, memory and I/O.
+
+    ``records`` are dicts with the job ``type`` and its ``metrics``.
+    """
+    by_type: Dict[str, Dict[str, List[float]]] = defaultdict(lambda: defaultdict(list))
+    counts: Dict[str, int] = defaultdict(int)
+    for record in records:
+        metrics = record.get("metrics") or {}
+        if not metrics:
+            continue
+        series = by_type[record["type"]]
+        counts[record["type"]] += 1
+        for key in ("wall_seconds", "cpu_user_seconds", "cpu_system_seconds", "peak_rss_mb",
+                    "io_read_bytes", "io_write_bytes"):
+            if metrics.get(key) is not None:
+                series[key].append(metrics[key])
+        for phase, seconds in metrics.get("phases", {}).items():
+            series[f"phase:{phase}"].append(seconds)
+
+    summary: Dict[str, Any] = {}
+    for job_type, series in by_type.items():
+        entry: Dict[str, Any] = {"jobs": counts[job_type], "phases": {}}
+        for key, values in series.items():
+            if key.startswith("phase:"):
+                entry["phases"][key[len("phase:"):]] = _describe(values)
+            else:
+                entry[key] = _describe(values)
+        summary[job_type] = entry
+    return summary
+
@@ -0,0 +1,293 @@
+# backend/modules/job_runner.py
+import cProfile
+import importlib
+import logging
+import multiprocessing
+import os
+import pstats
+import signal
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from modules.job_metrics import FINISHED, STARTED, profile_summary, resource_usage, summarize
+from utils.logging_config import setup_logging
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ResourceLimits:
+    """Per-job limits applied inside the job process; ``None`` disables a limit."""
+    cpu_seconds: Optional[int] = None
+    memory_bytes: Optional[int] = None
+    wall_seconds: Optional[float] = None
+
+    def apply(self) -> None:
+        if resource is None:
+            return
+        if self.cpu_seconds:
+            # RLIMIT_CPU counts from process start, so add what start-up already used.
+            usage = resource.getrusage(resource.RUSAGE_SELF)
+            soft = int(usage.ru_utime + usage.ru_stime) + self.cpu_seconds
+            resource.setrlimit(resource.RLIMIT_CPU, (soft, soft + 5))
+        if self.memory_bytes:
+            resource.setrlimit(resource.RLIMIT_AS, (self.memory_bytes, self.memory_bytes))
+
+
+class JobProgress:
+    """Structured progress messages from a job process to the worker supervising it."""
+
+    def __init__(self, conn: Any = None):
+        self._conn = conn
+        self.current_phase: Optional[str] = None
+
+    def _send(self, message: Dict[str, Any]) -> None:
+        if self._conn is None:
+            return
+        try:
+            self._conn.send(message)
+        except (BrokenPipeError, EOFError, OSError):
+            self._conn = None
+
+    def phase(self, name: str, **data: Any) -> None:
+        self.current_phase = name
+        self._send({"type": "phase", "phase": name, "time": time.time(), "usage": resource_usage(), **data})
+
+    def update(self, **data: Any) -> None:
+        self._send({"type": "progress", "phase": self.current_phase, "time": time.time(), **data})
+
+    def profile(self, functions: List[Dict[str, Any]]) -> None:
+        self._send({"type": "profile", "functions": functions})
+
+
+# Imported once by the fork server, so every job process starts with them loaded.
+PRELOAD_MODULES = (
+    "numpy",
+    "yaml",
+    "sqlalchemy",
+    "utils.db",
+    "modules.modeling",
+    "modules.calibration",
+    "symfluence",
+)
+
+
+def job_context(preload: Optional[Sequence[str]] = None) -> multiprocessing.context.BaseContext:
+    """Start method for job processes.
+
+    With ``preload``, jobs are forked from a ``forkserver`` that imported those
+    modules once (missing ones are skipped), so a job starts warm while still
+    getting a fresh address space. Without it, or where fork servers are not
+    supported, jobs are spawned and import everything from cold.
+    """
+    if preload and "forkserver" in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context("forkserver")
+        ctx.set_forkserver_preload(list(preload))
+        return ctx
+    return multiprocessing.get_context("spawn")
+
+
+def resolve_target(target: str) -> Callable[..., Any]:
+    module_name, func_name = target.split(":")
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+def _child_main(target: str, job_id: int, limits: ResourceLimits, conn: Any, profile: bool = False) -> None:
+    warm = target.split(":")[0] in sys.modules
+    # Own process group, so cancellation can kill everything the model spawns.
+    os.setsid()
+    limits.apply()
+    setup_logging()
+    from utils.db import dispose_engine, get_session_local
+
+    dispose_engine()
+    progress = JobProgress(conn)
+    progress.phase(STARTED, pid=os.getpid(), warm=warm)
+    runner = resolve_target(target)
+    if not profile:
+        runner(job_id, get_session_local(), progress)
+    else:
+        profiler = cProfile.Profile()
+        try:
+            profiler.runcall(runner, job_id, get_session_local(), progress)
+        finally:
+            progress.profile(profile_summary(pstats.Stats(profiler)))
+    progress.phase(FINISHED)
+    conn.close()
+
+
+@dataclass
+class JobOutcome:
+    exitcode: Optional[int]
+    cancelled: bool = False
+    timed_out: bool = False
+    preempted: bool = False
+    last_phase: Optional[str] = None
+    warm: Optional[bool] = None
+    started_at: Optional[float] = None
+    ended_at: Optional[float] = None
+    messages: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def metrics(self) -> Dict[str, Any]:
+        ended_at = self.ended_at or time.time()
+        metrics = summarize(self.messages, self.started_at or ended_at, ended_at)
+        if metrics:
+            metrics["exit_code"] = self.exitcode
+        return metrics
+
+    @property
+    def failure_reason(self) -> Optional[str]:
+        """Why the process died, for jobs it could not mark as failed itself."""
+        if self.cancelled or self.preempted or self.exitcode == 0:
+            return None
+        where = f" during {self.last_phase}" if self.last_phase else ""
+        if self.timed_out:
+            return f"Job exceeded its wall-clock limit{where} and was killed."
+        if self.exitcode == -getattr(signal, "SIGXCPU", 24):
+            return f"Job exceeded its CPU time limit{where}."
+        if self.exitcode == -signal.SIGKILL:
+            return f"Job process was killed{where} (out of memory?)."
+        return f"Job process exited with code {self.exitcode}{where}."
+
+
+class IsolatedJobRunner:
+    """Runs each job in a fresh, resource-limited process group.
+
+    The supervising worker only relays progress messages and polls for
+    cancellation; a cancelled or overrunning job is stopped at once by killing
+    its whole process group, whatever the model code is doing.
+    """
+
+    def __init__(
+        self,
+        limits: ResourceLimits = ResourceLimits(),
+        is_cancelled: Callable[[int], bool] = lambda job_id: False,
+        cancel_poll_interval: float = 1.0,
+        preload: Optional[Sequence[str]] = None,
+        should_stop: Callable[[], bool] = lambda: False,
+    ):
+        self.limits = limits
+        self.should_stop = should_stop
+        self.is_cancelled = is_cancelled
+        self.cancel_poll_interval = cancel_poll_interval
+        self._ctx = job_context(preload)
+
+    @property
+    def preloaded(self) -> bool:
+        return self._ctx.get_start_method() == "forkserver"
+
+    def warm_up(self) -> None:
+        """Start the fork server now, so preloading happens before the first job."""
+        if not self.preloaded:
+            return
+        from multiprocessing import forkserver
+
+        # The server is a fresh interpreter that ignores our sys.path (which may
+        # include SYMFLUENCE), so hand it over through the environment.
+        previous = os.environ.get("PYTHONPATH")
+        os.environ["PYTHONPATH"] = os.pathsep.join(p for p in sys.path if p)
+        try:
+            forkserver.ensure_running()
+        finally:
+            if previous is None:
+                os.environ.pop("PYTHONPATH", None)
+            else:
+                os.environ["PYTHONPATH"] = previous
+
+    def run(
+        self,
+        target: str,
+        job_id: int,
+        on_message: Callable[[Dict[str, Any]], None] = lambda message: None,
+        profile: bool = False,
+    ) -> JobOutcome:
+        """Run ``target`` (``"module:function"``) for ``job_id`` and wait for it.
+
+        With ``profile`` the job runs under ``cProfile`` and its hottest
+        functions are returned with the outcome's metrics.
+        """
+        self.warm_up()
+        receiver, sender = self._ctx.Pipe(duplex=False)
+        process = self._ctx.Process(
+            target=_child_main,
+            args=(target, job_id, self.limits, sender, profile),
+            name=f"delta-job-{job_id}",
+        )
+        outcome = JobOutcome(exitcode=None, started_at=time.time())
+        process.start()
+        sender.close()
+
+        started = time.monotonic()
+        next_cancel_check = started + self.cancel_poll_interval
+
+        def drain(timeout: float) -> bool:
+            try:
+                if not receiver.poll(timeout):
+                    return True
+                message = receiver.recv()
+            except (EOFError, OSError):
+                return False
+            outcome.messages.append(message)
+            if message.get("type") == "phase":
+                outcome.last_phase = message["phase"]
+                if message["phase"] == STARTED:
+                    outcome.warm = message.get("warm")
+            on_message(message)
+            return True
+
+        open_pipe = True
+        while process.is_alive():
+            if open_pipe:
+                open_pipe = drain(0.2)
+            else:
+                process.join(0.2)
+            now = time.monotonic()
+            if self.limits.wall_seconds and now - started > self.limits.wall_seconds:
+                outcome.timed_out = True
+                self._kill(process)
+                break
+            if self.should_stop():
+                # Preempted by shutdown: the job resumes from its checkpoint elsewhere.
+                outcome.preempted = True
+                logger.info("Stopping job %s (pid %s) for shutdown", job_id, process.pid)
+                self._kill(process)
+                break
+            if now >= next_cancel_check:
+                next_cancel_check = now + self.cancel_poll_interval
+                try:
+                    cancelled = self.is_cancelled(job_id)
+                except Exception as e:
+                    logger.error("Could not check cancellation of job %s: %s", job_id, e)
+                    cancelled = False
+                if cancelled:
+                    outcome.cancelled = True
+                    logger.info("Killing cancelled job %s (pid %s)", job_id, process.pid)
+                    self._kill(process)
+                    break
+        while open_pipe and receiver.poll(0):
+            open_pipe = drain(0)
+        process.join()
+        receiver.close()
+        outcome.ended_at = time.time()
+        outcome.exitcode = process.exitcode
+        return outcome
+
+    @staticmethod
+    def _kill(process: multiprocessing.process.BaseProcess) -> None:
+        try:
+            if os.getpgid(process.pid) == process.pid:
+                os.killpg(process.pid, signal.SIGKILL)
+            else:
+                # The child has not reached setsid() yet; it has no descendants either.
+                process.kill()
+        except ProcessLookupError:
+            pass
+        process.join(10)
@@ -0,0 +1,168 @@
+# backend/modules/job_scheduler.py
+import heapq
+import time
+from collections import Counter, OrderedDict, deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Mapping, Optional, Sequence, Tuple
+
+# Priority classes of queued work, chat requests and jobs alike. Lower value =
+# served first: anything in a higher class goes before any lower-class work,
+# and within a class users are served round-robin so a single client cannot
+# monopolise the queue.
+PRIORITY_CLASSES: Dict[str, int] = {
+    "interactive": 0,
+    "standard": 1,
+    "bulk": 2,
+}
+
+DEFAULT_PRIORITY = "standard"
+# Ensemble members default to the lowest class so sweeps fill idle capacity.
+ENSEMBLE_PRIORITY = "bulk"
+# Assumed run time of a job type with no recorded metrics yet.
+DEFAULT_JOB_SECONDS = 600.0
+
+
+@dataclass(frozen=True)
+class QueuedJob:
+    id: int
+    owner: Optional[str]
+    priority: Optional[str]
+    type: str = "SIMULATION"
+    parent_id: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class RunningJob:
+    owner: Optional[str]
+    remaining_seconds: float
+    parent_id: Optional[int] = None
+
+
+class FairShareScheduler:
+    """Chooses which pending job runs next.
+
+    Priority classes are strict, as for request admission: a job waits while
+    any job of a higher class can run. Within a class, users take turns
+    weighted round-robin: the user with the fewest running jobs per unit of
+    weight goes first, ties going to whoever started a job longest ago. Users
+    at ``max_running_per_user`` running jobs are skipped until one finishes.
+    """
+
+    def __init__(self, user_weights: Optional[Mapping[str, float]] = None, max_running_per_user: int = 0):
+        self.user_weights = dict(user_weights or {})
+        self.max_running_per_user = max_running_per_user
+
+    def weight(self, owner: Optional[str]) -> float:
+        return max(self.user_weights.get(owner or "", 1.0), 1e-6)
+
+    def at_cap(self, owner: Optional[str], running: Mapping[Optional[str], int]) -> bool:
+        return bool(self.max_running_per_user) and running.get(owner, 0) >= self.max_running_per_user
+
+    def choose(
+        self,
+        heads: Sequence[QueuedJob],
+        running: Mapping[Optional[str], int],
+        last_started: Mapping[Optional[str], float],
+    ) -> Optional[QueuedJob]:
+        """Pick from the runnable jobs at the head of each user's queue in each class."""
+        candidates = [job for job in heads if not self.at_cap(job.owner, running)]
+        if not candidates:
+            return None
+        return min(
+            candidates,
+            key=lambda job: (
+                PRIORITY_CLASSES.get(job.priority or DEFAULT_PRIORITY, PRIORITY_CLASSES[DEFAULT_PRIORITY]),
+                running.get(job.owner, 0) / self.weight(job.owner),
+                last_started.get(job.owner, float("-inf")),
+                job.id,
+            ),
+        )
+
+    def plan(
+        self,
+        pending: Sequence[QueuedJob],
+        running: Sequence[RunningJob],
+        slots: int,
+        durations: Mapping[str, float],
+        last_started: Optional[Mapping[Optional[str], float]] = None,
+        parent_caps: Optional[Mapping[int, int]] = None,
+        now: Optional[float] = None,
+    ) -> Dict[int, Tuple[int, Optional[float]]]:
+        """Queue position and seconds until start of each pending job.
+
+        Replays the scheduler over ``slots`` workers, with running jobs
+        finishing after their remaining time and every job taking the mean
+        duration of its type. ``pending`` must be in submission order. With no
+        workers the order is still computed but start times are unknown.
+        """
+        parent_caps = parent_caps or {}
+        now = time.time() if now is None else now
+        last_started = dict(last_started or {})
+        queues: Dict[Tuple[str, Optional[str]], Deque[QueuedJob]] = OrderedDict()
+        for job in pending:
+            queues.setdefault((job.priority or DEFAULT_PRIORITY, job.owner), deque()).append(job)
+
+        by_owner: Counter = Counter(job.owner for job in running)
+        by_parent: Counter = Counter(job.parent_id for job in running if job.parent_id is not None)
+        finishing: List[Tuple[float, int, Optional[str], Optional[int]]] = [
+            (max(job.remaining_seconds, 0.0), i, job.owner, job.parent_id) for i, job in enumerate(running)
+        ]
+        heapq.heapify(finishing)
+        free = max(slots, 1) - len(running)
+        clock, sequence = 0.0, len(running)
+        plan: Dict[int, Tuple[int, Optional[float]]] = {}
+
+        def runnable(job: QueuedJob) -> bool:
+            cap = parent_caps.get(job.parent_id) if job.parent_id is not None else None
+            return cap is None or by_parent[job.parent_id] < cap
+
+        def finish_next() -> bool:
+            nonlocal clock, free
+            if not finishing:
+                return False
+            ends, _, owner, parent_id = heapq.heappop(finishing)
+            clock = max(clock, ends)
+            by_owner[owner] -= 1
+            if parent_id is not None:
+                by_parent[parent_id] -= 1
+            free += 1
+            return True
+
+        while queues:
+            while finishing and finishing[0][0] <= clock:
+                finish_next()
+            if free <= 0:
+                finish_next()
+                continue
+            heads = []
+            for queue in queues.values():
+                head = next((job for job in queue if runnable(job)), None)
+                if head is not None:
+                    heads.append(head)
+            job = self.choose(heads, by_owner, last_started)
+            if job is None:
+                if finish_next():
+                    continue
+                break
+            queue = queues[(job.priority or DEFAULT_PRIORITY, job.owner)]
+            queue.remove(job)
+            if not queue:
+                del queues[(job.priority or DEFAULT_PRIORITY, job.owner)]
+            plan[job.id] = (len(plan) + 1, clock if slots > 0 else None)
+            free -= 1
+            sequence += 1
+            by_owner[job.owner] += 1
+            if job.parent_id is not None:
+                by_parent[job.parent_id] += 1
+            # Simulated starts come after every real one; the sequence orders same-instant starts.
+            last_started[job.owner] = now + clock + sequence * 1e-6
+            heapq.heappush(
+                finishing,
+                (clock + durations.get(job.type, DEFAULT_JOB_SECONDS), sequence, job.owner, job.parent_id),
+            )
+
+        # Anything the replay could not place keeps its submission order at the end.
+        for queue in queues.values():
+            for job in queue:
+                plan[job.id] = (len(plan) + 1, None)
+        return plan
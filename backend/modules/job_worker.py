@@ -0,0 +1,355 @@
+# backend/modules/job_worker.py
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from api.models import JOB_TYPE_CALIBRATION, JOB_TYPE_SIMULATION
+from modules.job_runner import PRELOAD_MODULES, IsolatedJobRunner, ResourceLimits
+from utils.config import get_settings
+from utils.logging_config import setup_logging
+
+logger = logging.getLogger(__name__)
+
+
+# Entry points of the job types a worker runs; ENSEMBLE parents are never claimed.
+JOB_TARGETS = {
+    JOB_TYPE_SIMULATION: "modules.modeling:execute_modeling_job",
+    JOB_TYPE_CALIBRATION: "modules.calibration:execute_calibration_job",
+}
+
+
+def job_limits(settings: Any) -> ResourceLimits:
+    return ResourceLimits(
+        cpu_seconds=settings.job_cpu_limit or None,
+        memory_bytes=settings.job_memory_limit_mb * 1024 * 1024 or None,
+        wall_seconds=settings.job_timeout or None,
+    )
+
+
+class WorkerCounters:
+    """Job and start-up counters shared by all worker processes of a pool."""
+
+    FIELDS = ("jobs", "warm_starts", "cold_starts", "recycled")
+
+    def __init__(self, ctx: multiprocessing.context.BaseContext):
+        self._values = {name: ctx.Value("q", 0) for name in self.FIELDS}
+
+    def increment(self, name: str) -> None:
+        value = self._values[name]
+        with value.get_lock():
+            value.value += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        return {name: value.value for name, value in self._values.items()}
+
+
+def current_rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError):
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def worker_capabilities(settings: Any) -> Dict[str, Any]:
+    """What this node offers; ``domains``/``job_types`` of ``None`` mean any."""
+    return {
+        "cores": os.cpu_count(),
+        "domains": settings.worker_domains or None,
+        "job_types": settings.worker_job_types or None,
+    }
+
+
+class LeaseKeeper:
+    """Renews a worker's lease on the job it runs, as the runner's cancellation check.
+
+    Every third of the lease it extends the job's lease and the worker's
+    heartbeat; in between it only checks for cancellation. A renewal is
+    refused once the job was cancelled or, after this node stalled past its
+    lease, reclaimed by another worker; either way the job is stopped, and
+    ``lost`` records the latter so the worker leaves the job alone.
+    """
+
+    def __init__(self, service: Any, registry: Any, worker_id: str, lease_seconds: float):
+        self.service = service
+        self.registry = registry
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.jobs_run = 0
+        self.lost = False
+        self._next_renewal = 0.0
+
+    def start(self, job_id: int) -> None:
+        self.jobs_run += 1
+        self.lost = False
+        self._next_renewal = time.monotonic() + self.lease_seconds / 3
+        self.registry.heartbeat(self.worker_id, job_id, self.jobs_run)
+
+    def __call__(self, job_id: int) -> bool:
+        now = time.monotonic()
+        if now < self._next_renewal:
+            return self.service.is_cancelled(job_id)
+        self._next_renewal = now + self.lease_seconds / 3
+        if self.service.heartbeat(job_id, self.worker_id, self.lease_seconds):
+            self.registry.heartbeat(self.worker_id, job_id, self.jobs_run)
+            return False
+        if not self.service.is_cancelled(job_id):
+            self.lost = True
+            logger.warning("Worker %s lost its lease on job %s; stopping it", self.worker_id, job_id)
+        return True
+
+
+def preload_symfluence(settings: Any) -> None:
+    """Put SYMFLUENCE on ``sys.path`` so the fork server can import it."""
+    from modules.modeling import ModelingModule
+
+    ModelingModule(settings)._add_symfluence_to_path()
+
+
+def run_worker(
+    worker_id: str,
+    poll_interval: float,
+    stop_event: Any,
+    counters: Optional[WorkerCounters] = None,
+) -> None:
+    """Worker process entry point: claim jobs from the queue and supervise them.
+
+    Jobs are leased rather than owned: the worker renews its lease while a
+    job runs and regularly reclaims jobs whose workers stopped renewing
+    theirs, so any number of nodes can share one database queue.
+
+    Each job runs in its own process group (see ``IsolatedJobRunner``), so a
+    worker survives jobs that crash, hang or exhaust their resource limits.
+    With ``JOB_PRELOAD`` the job processes are forked from a per-worker fork
+    server that imported SYMFLUENCE and the scientific stack at start-up. The
+    worker exits after ``JOB_WORKER_MAX_JOBS`` jobs or once its memory passes
+    ``JOB_WORKER_MAX_RSS_MB``; the pool then starts a fresh one.
+    """
+    setup_logging()
+    from utils.db import dispose_engine, get_session_local
+    from api.services.job_service import JobService
+    from api.services.worker_registry import WorkerRegistry
+    from modules.calibration import remove_checkpoint
+    from modules.modeling import remove_job_workspace
+
+    settings = get_settings()
+    parent_pid = os.getppid()
+
+    # Never reuse connections inherited from the parent process.
+    dispose_engine()
+    service = JobService(get_session_local())
+    registry = WorkerRegistry(get_session_local())
+    capabilities = worker_capabilities(settings)
+    lease_seconds = settings.job_lease_seconds
+    lease = LeaseKeeper(service, registry, worker_id, lease_seconds)
+    preload = None
+    if settings.job_preload:
+        preload_symfluence(settings)
+        preload = PRELOAD_MODULES
+    runner = IsolatedJobRunner(
+        job_limits(settings), lease, settings.job_kill_check_interval, preload,
+        should_stop=stop_event.is_set,
+    )
+    started = time.monotonic()
+    runner.warm_up()
+    registry.register(worker_id, socket.gethostname(), os.getpid(), capabilities)
+    logger.info(
+        "Job worker %s started (pid %s, %s) in %.1fs",
+        worker_id, os.getpid(), "preloaded" if runner.preloaded else "cold starts", time.monotonic() - started,
+    )
+
+    next_heartbeat = next_reclaim = 0.0
+    while not stop_event.is_set():
+        if os.getppid() != parent_pid:
+            logger.warning("Worker %s lost its parent process; exiting", worker_id)
+            break
+        if settings.job_worker_max_jobs and lease.jobs_run >= settings.job_worker_max_jobs:
+            logger.info("Worker %s recycling after %d jobs", worker_id, lease.jobs_run)
+            break
+        rss = current_rss_mb()
+        if settings.job_worker_max_rss_mb and rss > settings.job_worker_max_rss_mb:
+            logger.info("Worker %s recycling at %.0f MB resident", worker_id, rss)
+            break
+        now = time.monotonic()
+        try:
+            if now >= next_heartbeat:
+                registry.heartbeat(worker_id, None, lease.jobs_run)
+                next_heartbeat = now + lease_seconds / 3
+            if now >= next_reclaim:
+                service.reclaim_expired()
+                next_reclaim = now + lease_seconds
+            job_id = service.claim_next(worker_id, capabilities, lease_seconds)
+        except Exception as e:
+            logger.error("Worker %s failed to poll the job queue: %s", worker_id, e)
+            job_id = None
+        if job_id is None:
+            stop_event.wait(poll_interval)
+            continue
+        lease.start(job_id)
+        reason, metrics, preempted = None, None, False
+        try:
+            job = service.get(job_id)
+            target = JOB_TARGETS.get(job.type)
+            if target is None:
+                reason = f"Unknown job type '{job.type}'."
+                logger.error("Job %s on worker %s: %s", job_id, worker_id, reason)
+            else:
+                outcome = runner.run(
+                    target,
+                    job_id,
+                    lambda message: logger.debug("Job %s: %s", job_id, message),
+                    profile=settings.job_profile or bool(job.parameters.get("profile")),
+                )
+                reason, metrics, preempted = outcome.failure_reason, outcome.metrics, outcome.preempted
+                if reason:
+                    logger.warning("Job %s on worker %s: %s", job_id, worker_id, reason)
+                if counters is not None:
+                    counters.increment("jobs")
+                    if outcome.warm is not None:
+                        counters.increment("warm_starts" if outcome.warm else "cold_starts")
+        except Exception:
+            logger.exception("Worker %s crashed while executing job %s", worker_id, job_id)
+        finally:
+            if lease.lost:
+                # Another worker holds the job now and resumes it from its checkpoint.
+                pass
+            elif preempted and service.requeue(
+                job_id, "Worker shut down; job requeued to resume from its checkpoint.", worker_id
+            ):
+                logger.info("Job %s preempted by shutdown of worker %s", job_id, worker_id)
+            else:
+                service.finalize(job_id, reason, metrics, worker_id)
+                remove_job_workspace(settings.job_workspace_dir, job_id)
+                remove_checkpoint(settings.calibration_checkpoint_dir, job_id)
+
+    registry.deregister(worker_id)
+    logger.info("Job worker %s stopped", worker_id)
+
+
+class WorkerPool:
+    """A fixed set of worker processes draining the persistent job queue.
+
+    Workers are started with the ``spawn`` method so they never inherit the
+    API process's event loop, sockets or database connections. They are not
+    daemonic, because calibration jobs start process pools of their own;
+    instead each worker exits when it notices its parent has gone. A
+    supervisor thread replaces workers that exit, whether recycled or crashed.
+    """
+
+    def __init__(self, size: int, poll_interval: float = 1.0):
+        self.size = size
+        self.poll_interval = poll_interval
+        self._ctx = multiprocessing.get_context("spawn")
+        self._stop_event = self._ctx.Event()
+        self._processes: List[multiprocessing.process.BaseProcess] = []
+        self._generations: List[int] = []
+        self._prefix = f"{socket.gethostname()}-{os.getpid()}"
+        self._supervisor: Optional[threading.Thread] = None
+        self.counters = WorkerCounters(self._ctx)
+
+    def _start_worker(self, index: int) -> multiprocessing.process.BaseProcess:
+        process = self._ctx.Process(
+            target=run_worker,
+            args=(
+                f"{self._prefix}-w{index}.{self._generations[index]}",
+                self.poll_interval,
+                self._stop_event,
+                self.counters,
+            ),
+            name=f"delta-job-worker-{index}",
+        )
+        process.start()
+        return process
+
+    def start(self) -> None:
+        self._generations = [0] * self.size
+        self._processes = [self._start_worker(index) for index in range(self.size)]
+        self._supervisor = threading.Thread(target=self._supervise, name="delta-worker-supervisor", daemon=True)
+        self._supervisor.start()
+        logger.info("Started %d job worker process(es)", self.size)
+
+    def _supervise(self) -> None:
+        while not self._stop_event.wait(self.poll_interval):
+            for index, process in enumerate(self._processes):
+                if process.is_alive() or self._stop_event.is_set():
+                    continue
+                process.join()
+                if process.exitcode != 0:
+                    logger.warning("Job worker %s exited with code %s", process.name, process.exitcode)
+                self.counters.increment("recycled")
+                self._generations[index] += 1
+                self._processes[index] = self._start_worker(index)
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stop_event.set()
+        if self._supervisor is not None:
+            self._supervisor.join()
+            self._supervisor = None
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                logger.warning("Terminating unresponsive job worker %s", process.name)
+                process.terminate()
+        self._processes.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": self.size,
+            "alive": sum(1 for p in self._processes if p.is_alive()),
+            "pids": [p.pid for p in self._processes],
+            **self.counters.snapshot(),
+        }
+
+
+_POOL: Optional[WorkerPool] = None
+
+def get_worker_pool() -> WorkerPool:
+    global _POOL
+    if _POOL is None:
+        settings = get_settings()
+        _POOL = WorkerPool(settings.job_workers, settings.job_poll_interval)
+    return _POOL
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run a worker pool on this node against the shared job database.
+
+    API nodes can set ``JOB_WORKERS=0`` and leave execution to machines
+    running ``python -m modules.job_worker``.
+    """
+    from utils.settings import load_environment
+    from utils.db import init_db
+
+    load_environment()
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="DELTA job worker node")
+    parser.add_argument("--workers", type=int, default=settings.job_workers or os.cpu_count() or 1)
+    parser.add_argument("--poll-interval", type=float, default=settings.job_poll_interval)
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    init_db()
+    # Under ``-m`` this module is ``__main__``; hand workers the importable one.
+    from modules.job_worker import WorkerPool as NodeWorkerPool
+
+    pool = NodeWorkerPool(args.workers, args.poll_interval)
+    stopping = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stopping.set())
+    pool.start()
+    while not stopping.wait(1.0):
+        pass
+    logger.info("Stopping job worker node")
+    pool.stop()
+
+
+if __name__ == "__main__":
+    main()
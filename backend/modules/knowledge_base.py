@@ -0,0 +1,239 @@
+# backend/modules/knowledge_base.py
+import heapq
+import logging
+import math
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+BUNDLED_KNOWLEDGE_DIR = Path(__file__).parent.parent / "knowledge"
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a about an and are as at be by can do does for from how i in into is it its me of on or so such "
+    "tell than that the their them then there these this to was what when where which why with you".split()
+)
+
+
+def _stem(token: str) -> str:
+    """Plural to singular only; stripping -ed or -ing mangles words like "watershed"."""
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    return [_stem(t) for t in _TOKEN.findall(text.lower()) if t not in STOPWORDS]
+
+
+@dataclass(frozen=True)
+class Passage:
+    doc_id: str
+    title: str
+    text: str
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    passage: Passage
+    score: float
+
+
+@dataclass
+class _Document:
+    title: str
+    text: str
+    version: Optional[str]
+    passage_ids: List[int]
+    terms: frozenset
+
+
+def split_passages(text: str) -> List[str]:
+    return [p.strip() for p in re.split(r"\n\s*\n", text) if p.strip()]
+
+
+def parse_markdown(text: str, default_title: str) -> Tuple[str, str]:
+    """Title from a leading ``# heading`` (else ``default_title``) and the body."""
+    lines = text.strip().splitlines()
+    if lines and lines[0].startswith("# "):
+        return lines[0][2:].strip(), "\n".join(lines[1:]).strip()
+    return default_title, text.strip()
+
+
+class KnowledgeBase:
+    """Passages of hydrology documents ranked with BM25 over an inverted index.
+
+    Documents are split into paragraphs; each paragraph is indexed together
+    with its document's title (weighted ``title_weight`` times). A query only
+    touches the postings of its own terms, so lookups stay fast as the corpus
+    grows, and documents can be added, replaced or removed at any time
+    without rebuilding the index.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, title_weight: int = 2):
+        self.k1 = k1
+        self.b = b
+        self.title_weight = title_weight
+        self._lock = threading.RLock()
+        self._documents: Dict[str, _Document] = {}
+        self._passages: Dict[int, Passage] = {}
+        self._lengths: Dict[int, int] = {}
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._total_length = 0
+        self._next_id = 0
+        self._sources: Dict[str, Path] = {}
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def add_document(self, doc_id: str, title: str, text: str, version: Optional[str] = None) -> bool:
+        """Index a document, replacing any previous version; False if ``version`` is unchanged."""
+        with self._lock:
+            existing = self._documents.get(doc_id)
+            if existing is not None:
+                if version is not None and existing.version == version:
+                    return False
+                self.remove_document(doc_id)
+            title_terms = tokenize(title) * self.title_weight
+            passage_ids = []
+            for paragraph in split_passages(text):
+                passage_id = self._next_id
+                self._next_id += 1
+                terms = Counter(tokenize(paragraph) + title_terms)
+                for term, tf in terms.items():
+                    self._postings.setdefault(term, {})[passage_id] = tf
+                length = sum(terms.values())
+                self._passages[passage_id] = Passage(doc_id, title, paragraph)
+                self._lengths[passage_id] = length
+                self._total_length += length
+                passage_ids.append(passage_id)
+            self._documents[doc_id] = _Document(
+                title, text, version, passage_ids, frozenset(tokenize(title + " " + text))
+            )
+            return True
+
+    def remove_document(self, doc_id: str) -> bool:
+        with self._lock:
+            document = self._documents.pop(doc_id, None)
+            if document is None:
+                return False
+            for passage_id in document.passage_ids:
+                passage = self._passages.pop(passage_id)
+                self._total_length -= self._lengths.pop(passage_id)
+                for term in set(tokenize(passage.text) + tokenize(passage.title)):
+                    postings = self._postings.get(term)
+                    if postings is not None:
+                        postings.pop(passage_id, None)
+                        if not postings:
+                            del self._postings[term]
+            return True
+
+    def search(self, query: str, k: int = 3) -> List[SearchHit]:
+        """The ``k`` best passages for ``query``, best first."""
+        terms = set(tokenize(query))
+        with self._lock:
+            n = len(self._passages)
+            if not terms or not n:
+                return []
+            avg_length = self._total_length / n
+            scores: Dict[int, float] = {}
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                for passage_id, tf in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._lengths[passage_id] / avg_length)
+                    scores[passage_id] = scores.get(passage_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+            best = heapq.nlargest(k, scores.items(), key=lambda item: (item[1], -item[0]))
+            return [SearchHit(self._passages[pid], round(score, 4)) for pid, score in best]
+
+    def document(self, doc_id: str) -> Optional[Dict[str, str]]:
+        with self._lock:
+            document = self._documents.get(doc_id)
+            return None if document is None else {"id": doc_id, "title": document.title, "text": document.text}
+
+    def covers(self, doc_id: str, query: str) -> bool:
+        """Whether the document mentions every term of ``query``."""
+        with self._lock:
+            document = self._documents.get(doc_id)
+            terms = set(tokenize(query))
+            return document is not None and bool(terms) and terms <= document.terms
+
+    def passages(self) -> List[Passage]:
+        with self._lock:
+            return [self._passages[pid] for doc in self._documents.values() for pid in doc.passage_ids]
+
+    def topics(self) -> List[str]:
+        with self._lock:
+            return sorted(document.title for document in self._documents.values())
+
+    def load_directory(self, path: Path, namespace: Optional[str] = None) -> Dict[str, int]:
+        """Index the Markdown files in ``path`` as ``<namespace>/<file stem>``.
+
+        Unchanged files are skipped and documents whose file is gone are
+        removed, so calling this again (or ``refresh``) picks up edits
+        incrementally.
+        """
+        path = Path(path)
+        namespace = namespace or path.name
+        self._sources[namespace] = path
+        files = sorted(path.glob("*.md")) if path.is_dir() else []
+        seen = set()
+        added = 0
+        for file in files:
+            doc_id = f"{namespace}/{file.stem}"
+            seen.add(doc_id)
+            stat = file.stat()
+            version = f"{stat.st_size}:{stat.st_mtime_ns}"
+            existing = self._documents.get(doc_id)
+            if existing is not None and existing.version == version:
+                continue
+            title, body = parse_markdown(file.read_text(encoding="utf-8"), file.stem.replace("_", " ").title())
+            added += self.add_document(doc_id, title, body, version)
+        with self._lock:
+            stale = [d for d in self._documents if d.startswith(f"{namespace}/") and d not in seen]
+        for doc_id in stale:
+            self.remove_document(doc_id)
+        return {"updated": added, "removed": len(stale)}
+
+    def refresh(self) -> Dict[str, int]:
+        """Reload every directory loaded so far."""
+        totals: Counter = Counter()
+        for namespace, path in list(self._sources.items()):
+            totals.update(self.load_directory(path, namespace))
+        return {"updated": totals["updated"], "removed": totals["removed"]}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "documents": len(self._documents),
+                "passages": len(self._passages),
+                "terms": len(self._postings),
+            }
+
+
+_KNOWLEDGE_BASE: Optional[KnowledgeBase] = None
+_KNOWLEDGE_BASE_LOCK = threading.Lock()
+
+def get_knowledge_base() -> KnowledgeBase:
+    global _KNOWLEDGE_BASE
+    with _KNOWLEDGE_BASE_LOCK:
+        if _KNOWLEDGE_BASE is None:
+            from utils.config import get_settings
+
+            knowledge_base = KnowledgeBase()
+            knowledge_base.load_directory(BUNDLED_KNOWLEDGE_DIR, "delta")
+            extra = get_settings().knowledge_dir
+            if extra:
+                knowledge_base.load_directory(Path(extra), "local")
+            logger.info("Knowledge base loaded: %s", knowledge_base.stats())
+            _KNOWLEDGE_BASE = knowledge_base
+    return _KNOWLEDGE_BASE
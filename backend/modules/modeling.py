@@ -1,70 +1,278 @@
 # backend/modules/modeling.py
+import json
 import os
 import sys
-import yaml
 import tempfile
 import shutil
 import logging
+import time
 import traceback
 from pathlib import Path
-from typing import Tuple, Optional, Any, Dict
+from typing import Tuple, Optional, Any, Dict, List, Mapping
 from utils.config import get_settings, Settings
+from sqlalchemy import update
 from sqlalchemy.orm import Session
-from api.models import Job as DBJob
+from api.models import Job as DBJob, JOB_CANCELLED, JOB_COMPLETED, JOB_FAILED, JOB_PENDING, JOB_RUNNING
+from modules.config_templates import ConfigOverlay, get_template_cache, resolve_template_path
+from modules.forcing_cache import ForcingCache, ForcingDataset, get_forcing_cache
+from modules.forcing_subset import BoundingBox, subset_forcing
+from modules.job_runner import JobProgress
+from modules.result_store import get_result_store
+from modules.workspace_cache import WorkspaceCache, workspace_key
 
 logger = logging.getLogger(__name__)
 
+CHECKPOINT_FILE = "checkpoint.json"
+
 class WorkspaceManager:
-    """Handles temporary workspace creation and data linking."""
-    def __init__(self, domain: str, job_id: int, data_dir: Optional[str]):
+    """Handles job workspace creation and data linking.
+
+    With a ``root`` the workspace is ``<root>/job_<id>`` and outlives the
+    process that created it, so a job interrupted by a crash or shutdown can
+    resume from its checkpoint; otherwise it is a temporary directory. Either
+    way it is removed when the job finishes in this process.
+    """
+    def __init__(self, domain: str, job_id: int, data_dir: Optional[str], root: Optional[str] = None):
         self.domain = domain
         self.job_id = job_id
         self.data_dir = data_dir
+        self.root = root
         self.tmp_dir: Optional[tempfile.TemporaryDirectory] = None
         self.path: Optional[Path] = None
+        self.forcing: Optional[ForcingDataset] = None
 
     def __enter__(self):
-        self.tmp_dir = tempfile.TemporaryDirectory(prefix="delta_model_run_")
-        self.path = Path(self.tmp_dir.name)
+        if self.root:
+            self.path = job_workspace_path(self.root, self.job_id)
+            self.path.mkdir(parents=True, exist_ok=True)
+        else:
+            self.tmp_dir = tempfile.TemporaryDirectory(prefix="delta_model_run_")
+            self.path = Path(self.tmp_dir.name)
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
+        if self.forcing:
+            self.forcing.close()
         if self.tmp_dir:
             self.tmp_dir.cleanup()
+        elif self.path is not None:
+            shutil.rmtree(self.path, ignore_errors=True)
+
+    def clear(self):
+        """Empty the workspace before starting from scratch."""
+        shutil.rmtree(self.path, ignore_errors=True)
+        self.path.mkdir(parents=True)
 
     def get_domain_path(self) -> Path:
         return self.path / f"domain_{self.domain}"
 
     def setup_domain(self, job_logger: Any):
-        domain_path = self.get_domain_path()
-        domain_path.mkdir()
-        
-        if not self.data_dir:
-            job_logger.append("Warning: Data directory not configured. Initializing empty project.")
-            return
+        link_domain_data(self.get_domain_path(), self.domain, self.data_dir, job_logger)
+
+    def attach_forcing(
+        self,
+        forcing_cache: Optional[ForcingCache],
+        job_logger: Any,
+        model_config: Optional[Mapping[str, Any]] = None,
+    ) -> Optional[Path]:
+        """Link the shared, pre-decoded forcing into the workspace as ``forcing_cache``.
+
+        The entry stays open (and protected from pruning) until the workspace
+        exits. With a ``BOUNDING_BOX_COORDS`` in ``model_config`` the domain's
+        box and experiment period are also extracted into ``forcing_subset``,
+        whose path is returned so the model can be pointed at it.
+        """
+        if forcing_cache is None or not self.data_dir:
+            return None
+        source = Path(self.data_dir) / f"domain_{self.domain}" / "forcing"
+        if not source.exists():
+            return None
+        try:
+            self.forcing = forcing_cache.get(self.domain, source)
+        except Exception as e:
+            logger.warning("Forcing cache unavailable for %s: %s", self.domain, e)
+            job_logger.append(f"Warning: shared forcing cache unavailable ({e}).")
+            return None
+        link = self.get_domain_path() / "forcing_cache"
+        link.unlink(missing_ok=True)
+        os.symlink(self.forcing.path, link)
+        job_logger.append(f"Attached shared forcing cache {self.forcing.fingerprint[:12]}.")
+
+        if not model_config or not model_config.get('BOUNDING_BOX_COORDS'):
+            return None
+        dest = self.get_domain_path() / "forcing_subset"
+        try:
+            summary = subset_forcing(
+                self.forcing,
+                BoundingBox.parse(model_config['BOUNDING_BOX_COORDS']),
+                model_config.get('EXPERIMENT_TIME_START'),
+                model_config.get('EXPERIMENT_TIME_END'),
+                dest,
+            )
+        except Exception as e:
+            logger.warning("Forcing subsetting failed for %s: %s", self.domain, e)
+            job_logger.append(f"Warning: forcing could not be subset to the domain ({e}).")
+            return None
+        shapes = ", ".join(f"{k}{tuple(v['shape'])}" for k, v in summary["variables"].items())
+        job_logger.append(f"Extracted domain forcing subset: {shapes}.")
+        return dest
+
+def job_workspace_path(root: str, job_id: int) -> Path:
+    return Path(root) / f"job_{job_id}"
+
+
+def remove_job_workspace(root: Optional[str], job_id: int) -> None:
+    """Delete what a job killed mid-run (e.g. on cancellation) left behind."""
+    if root:
+        shutil.rmtree(job_workspace_path(root, job_id), ignore_errors=True)
+
+
+class PhaseCheckpoint:
+    """Phases a modeling job has completed, stored as JSON in its workspace.
+
+    The checkpoint only applies to the configuration it was written for:
+    a different ``fingerprint`` means the job starts over.
+    """
+
+    def __init__(self, path: Path, fingerprint: str):
+        self.path = Path(path)
+        self.fingerprint = fingerprint
+        self.phases: Dict[str, Any] = {}
+        if self.path.exists():
+            try:
+                with open(self.path) as f:
+                    state = json.load(f)
+            except (OSError, ValueError):
+                state = {}
+            if state.get("fingerprint") == fingerprint:
+                self.phases = state.get("phases", {})
+
+    def done(self, phase: str) -> bool:
+        return phase in self.phases
+
+    def complete(self, phase: str, **data: Any) -> None:
+        self.phases[phase] = {"completed_at": time.time(), **data}
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump({"fingerprint": self.fingerprint, "phases": self.phases}, f)
+        os.replace(tmp, self.path)
+
+
+def link_domain_data(domain_path: Path, domain: str, data_dir: Optional[str], job_logger: Any):
+    """Create ``domain_path`` and symlink the shared example datasets into it."""
+    domain_path.mkdir()
+
+    if not data_dir:
+        job_logger.append("Warning: Data directory not configured. Initializing empty project.")
+        return
+
+    domain_data_path = Path(data_dir) / f"domain_{domain}"
+    if domain_data_path.exists():
+        job_logger.append("Linking example datasets (attributes, forcing, shapefiles)...")
+        for sub in ['attributes', 'forcing', 'shapefiles']:
+            src = domain_data_path / sub
+            if src.exists():
+                os.symlink(src, domain_path / sub)
+    else:
+        job_logger.append(f"Warning: Example data not found at {domain_data_path}.")
+
+class JobCancelledError(Exception):
+    """Raised inside a running job once its row has been marked CANCELLED."""
+
+
+def transition_job(
+    db: Session, job_id: int, status: str, from_states: Tuple[str, ...] = (JOB_RUNNING,), **values: Any
+) -> bool:
+    """Set a job's ``status`` (and other columns) only while it is in ``from_states``.
+
+    A conditional ``UPDATE``, so a cancellation committed meanwhile is never
+    overwritten; returns False when the job had already left those states.
+    """
+    updated = db.execute(
+        update(DBJob)
+        .where(DBJob.id == job_id, DBJob.status.in_(from_states))
+        .values(status=status, **values)
+    ).rowcount
+    db.commit()
+    return updated == 1
 
-        domain_data_path = Path(self.data_dir) / f"domain_{self.domain}"
-        if domain_data_path.exists():
-            job_logger.append("Linking example datasets (attributes, forcing, shapefiles)...")
-            for sub in ['attributes', 'forcing', 'shapefiles']:
-                src = domain_data_path / sub
-                if src.exists():
-                    os.symlink(src, domain_path / sub)
-        else:
-            job_logger.append(f"Warning: Example data not found at {domain_data_path}.")
 
 class JobLogger:
-    def __init__(self, db: Session, job: DBJob):
+    """Buffered writer for a job's log column.
+
+    Lines are kept in memory and appended to ``jobs.logs`` with a single
+    ``UPDATE ... SET logs = logs || :chunk`` once ``flush_lines`` lines are
+    buffered or ``flush_interval`` seconds have passed. Cancellation is polled
+    every ``cancel_check_interval`` seconds rather than on every line. Use it as
+    a context manager so the buffer is flushed when the job exits or fails.
+    """
+    def __init__(
+        self,
+        db: Session,
+        job: DBJob,
+        flush_lines: int = 50,
+        flush_interval: float = 2.0,
+        cancel_check_interval: float = 5.0,
+        clock=time.monotonic,
+    ):
         self.db = db
         self.job = job
+        self.job_id = job.id
+        self.flush_lines = flush_lines
+        self.flush_interval = flush_interval
+        self.cancel_check_interval = cancel_check_interval
+        self.cancelled = False
+        self._clock = clock
+        self._buffer: List[str] = []
+        self._last_flush = clock()
+        self._last_cancel_check = clock()
+
+    def __enter__(self) -> "JobLogger":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error("Failed to flush logs for job %s: %s", self.job_id, e)
+        return False
 
-    def append(self, message: str):
-        # Refresh from DB to check for cancellation
-        self.db.refresh(self.job)
-        if self.job.status == "CANCELLED":
+    def append(self, message: str, check_cancel: bool = True):
+        """Buffer a line; ``check_cancel=False`` never raises JobCancelledError (for error handlers)."""
+        if check_cancel and self.cancelled:
+            raise JobCancelledError(f"Job {self.job_id} was cancelled")
+        self._buffer.append(f"{message}\n")
+        now = self._clock()
+        if len(self._buffer) >= self.flush_lines or now - self._last_flush >= self.flush_interval:
+            self.flush()
+        if check_cancel and now - self._last_cancel_check >= self.cancel_check_interval:
+            self.raise_if_cancelled()
+
+    def flush(self):
+        if not self._buffer:
             return
-        self.job.logs += f"{message}\n"
+        chunk = "".join(self._buffer)
+        self._buffer.clear()
+        self.db.execute(
+            update(DBJob)
+            .where(DBJob.id == self.job_id)
+            .values(logs=DBJob.logs + chunk)
+            .execution_options(synchronize_session=False)
+        )
         self.db.commit()
+        self._last_flush = self._clock()
+
+    def is_cancelled(self) -> bool:
+        self._last_cancel_check = self._clock()
+        status = self.db.query(DBJob.status).filter(DBJob.id == self.job_id).scalar()
+        self.cancelled = status == JOB_CANCELLED
+        return self.cancelled
+
+    def raise_if_cancelled(self):
+        if self.is_cancelled():
+            self._buffer.append("Cancellation requested; stopping job.\n")
+            self.flush()
+            raise JobCancelledError(f"Job {self.job_id} was cancelled")
 
 class ModelingModule:
     def __init__(self, settings: Settings):
@@ -84,86 +292,166 @@ class ModelingModule:
             sys.path.append(code_dir)
         return True
 
+    def _get_workspace_cache(self) -> Optional[WorkspaceCache]:
+        if not self.settings.workspace_cache_dir:
+            return None
+        return WorkspaceCache(
+            self.settings.workspace_cache_dir,
+            self.settings.workspace_cache_max_mb * 1024 * 1024,
+        )
+
+    def _write_config(self, root: Path, model_config: ConfigOverlay) -> Path:
+        config_path = root / "config.yaml"
+        # A config cloned from the workspace cache may be a read-only hardlink.
+        config_path.unlink(missing_ok=True)
+        with open(config_path, 'w') as f:
+            f.write(model_config.render({'CONFLUENCE_DATA_DIR': str(root)}))
+        return config_path
+
+    def _setup_project(
+        self, root: Path, model_config: ConfigOverlay, job_log: "JobLogger", progress: Optional[JobProgress] = None
+    ):
+        from symfluence import SYMFLUENCE
+
+        if progress is not None:
+            progress.phase("setup_project")
+        config_path = self._write_config(root, model_config)
+        job_log.append(f"SYMFLUENCE initializing with model: {model_config['HYDROLOGICAL_MODEL']}")
+        sf = SYMFLUENCE(str(config_path))
+        sf.managers['project'].setup_project()
+
+    def _store_outputs(self, job_id: int, domain_path: Path, job_log: "JobLogger") -> Optional[Dict[str, Any]]:
+        """Ingest simulation output into the result store before the workspace is removed."""
+        outputs = sorted((domain_path / "simulations").glob("**/*.nc")) if domain_path.exists() else []
+        if not outputs:
+            return None
+        try:
+            result_set = get_result_store().ingest_netcdf(f"job_{job_id}", outputs)
+        except Exception as e:
+            logger.warning("Could not store outputs of job %s: %s", job_id, e)
+            job_log.append(f"Warning: model outputs were not stored ({e}).")
+            return None
+        job_log.append(f"Stored {len(result_set.variables)} output variable(s) for querying.")
+        return result_set.describe()
+
     def _get_template_path(self) -> Path:
-        code_dir = self.settings.symfluence_code_dir
-        template_path = None
-        if code_dir:
-            template_path = Path(code_dir) / "0_config_files" / "config_template.yaml"
-        
-        if not template_path or not template_path.exists():
-            template_path = Path(__file__).parent.parent / "examples" / "config_Bow.yaml"
-        
-        return template_path
-
-    async def execute(self, job_id: int, db: Session):
+        return resolve_template_path(self.settings.symfluence_code_dir)
+
+    def execute(self, job_id: int, db: Session, progress: Optional[JobProgress] = None):
+        progress = progress or JobProgress()
         job = db.query(DBJob).filter(DBJob.id == job_id).first()
         if not job:
             logger.error(f"Job {job_id} not found in database.")
             return
 
         # Check if already cancelled before starting
-        if job.status == "CANCELLED":
+        if job.status == JOB_CANCELLED:
             logger.info(f"Job {job_id} was cancelled before execution.")
             return
 
-        job_log = JobLogger(db, job)
-        
-        try:
-            job.status = "RUNNING"
-            job_log.append("Scientific model execution initialized...")
+        job_log = JobLogger(
+            db,
+            job,
+            flush_lines=self.settings.job_log_flush_lines,
+            flush_interval=self.settings.job_log_flush_interval,
+            cancel_check_interval=self.settings.job_cancel_check_interval,
+        )
 
-            self._add_symfluence_to_path()
-            from symfluence import SYMFLUENCE
+        with job_log:
+            try:
+                if not transition_job(db, job_id, JOB_RUNNING, (JOB_PENDING, JOB_RUNNING)):
+                    raise JobCancelledError(f"Job {job_id} was cancelled")
+                job_log.append("Scientific model execution initialized...")
+                progress.phase("config_render")
 
-            model_name = job.parameters.get("model", "SUMMA")
-            domain = job.parameters.get("watershed", "Bow_at_Banff_lumped")
-            
-            with WorkspaceManager(domain, job_id, self.settings.symfluence_data_dir) as ws:
-                job_log.append(f"Workspace created: {ws.path}")
-                ws.setup_domain(job_log)
+                self._add_symfluence_to_path()
 
-                template_path = self._get_template_path()
-                with open(template_path, 'r') as f:
-                    model_config = yaml.safe_load(f)
+                model_name = job.parameters.get("model", "SUMMA")
+                domain = job.parameters.get("watershed", "Bow_at_Banff_lumped")
 
-                model_config.update({
+                template = get_template_cache().get(self._get_template_path())
+                model_config = template.overlay({
+                    **job.parameters.get("config_overrides", {}),
                     'DOMAIN_NAME': domain,
                     'EXPERIMENT_ID': f"delta_job_{job_id}",
                     'HYDROLOGICAL_MODEL': model_name,
-                    'CONFLUENCE_DATA_DIR': str(ws.path)
                 })
-                
-                temp_config_path = ws.path / "config.yaml"
-                with open(temp_config_path, 'w') as f:
-                    yaml.dump(model_config, f)
-
-                job_log.append(f"SYMFLUENCE initializing with model: {model_name}")
-                
-                sf = SYMFLUENCE(str(temp_config_path))
-                sf.managers['project'].setup_project()
-                
-                job_log.append("Project structure ready. Ready for mathematical execution.")
-                
-                job.status = "COMPLETED"
-                job.result = {
-                    "project_dir": str(ws.get_domain_path()),
-                    "model": model_name,
-                    "domain": domain,
-                    "message": "Modeling workspace successfully established."
-                }
-                job_log.append("Process complete.")
 
-        except Exception as e:
-            error_trace = traceback.format_exc()
-            logger.error(f"Modeling job {job_id} failed: {e}")
-            job.status = "FAILED"
-            job.logs += f"\nERROR: {str(e)}\n{error_trace}"
-            db.commit()
+                workspace = WorkspaceManager(
+                    domain, job_id, self.settings.symfluence_data_dir, self.settings.job_workspace_dir
+                )
+                with workspace as ws:
+                    job_log.append(f"Workspace created: {ws.path}")
+                    progress.phase("workspace_setup", workspace=str(ws.path))
+                    cache_key = workspace_key(domain, model_name, model_config)
+                    checkpoint = PhaseCheckpoint(ws.path / CHECKPOINT_FILE, cache_key)
+                    workspace_cache = self._get_workspace_cache()
+
+                    if checkpoint.done("setup_project"):
+                        job_log.append("Resuming from checkpoint; project setup already complete.")
+                        self._write_config(ws.path, model_config)
+                    elif workspace_cache is None:
+                        ws.clear()
+                        ws.setup_domain(job_log)
+                        self._setup_project(ws.path, model_config, job_log, progress)
+                    else:
+                        ws.clear()
+
+                        def build(staging: Path):
+                            job_log.append("No cached workspace for this setup; preparing project...")
+                            link_domain_data(
+                                staging / f"domain_{domain}", domain, self.settings.symfluence_data_dir, job_log
+                            )
+                            self._setup_project(staging, model_config, job_log, progress)
+
+                        if workspace_cache.materialize(cache_key, build, ws.path):
+                            job_log.append(f"Reusing cached workspace {cache_key[:12]}; project setup skipped.")
+                        else:
+                            job_log.append(f"Prepared workspace cached as {cache_key[:12]}.")
+                        self._write_config(ws.path, model_config)
+                    if not checkpoint.done("setup_project"):
+                        checkpoint.complete("setup_project")
+
+                    progress.phase("attach_forcing")
+                    forcing_subset = ws.attach_forcing(get_forcing_cache(), job_log, model_config)
+                    if forcing_subset is not None:
+                        model_config = model_config.template.overlay(
+                            {**model_config.overrides, 'FORCING_PATH': str(forcing_subset)}
+                        )
+                        self._write_config(ws.path, model_config)
+                        job_log.append("Model forcing set to the domain subset.")
+                    job_log.append("Project structure ready. Ready for mathematical execution.")
+                    job_log.raise_if_cancelled()
+
+                    result = {
+                        "project_dir": str(ws.get_domain_path()),
+                        "model": model_name,
+                        "domain": domain,
+                        "message": "Modeling workspace successfully established."
+                    }
+                    progress.phase("store_outputs")
+                    stored = self._store_outputs(job_id, ws.get_domain_path(), job_log)
+                    if stored is not None:
+                        result["results"] = stored
+                    if not transition_job(db, job_id, JOB_COMPLETED, result=result):
+                        raise JobCancelledError(f"Job {job_id} was cancelled")
+                    job_log.append("Process complete.")
+
+            except JobCancelledError:
+                logger.info(f"Modeling job {job_id} cancelled during execution.")
+                db.rollback()
+
+            except Exception as e:
+                error_trace = traceback.format_exc()
+                logger.error(f"Modeling job {job_id} failed: {e}")
+                db.rollback()
+                job_log.append(f"\nERROR: {str(e)}\n{error_trace}", check_cancel=False)
+                job_log.flush()
+                transition_job(db, job_id, JOB_FAILED)
 
-async def execute_modeling_job(job_id: int, db_session_factory):
+def execute_modeling_job(job_id: int, db_session_factory, progress: Optional[JobProgress] = None):
     db: Session = db_session_factory()
     try:
-        module = ModelingModule(get_settings())
-        await module.execute(job_id, db)
+        ModelingModule(get_settings()).execute(job_id, db, progress)
     finally:
         db.close()
\ No newline at end of file
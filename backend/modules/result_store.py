@@ -0,0 +1,242 @@
+# backend/modules/result_store.py
+import json
+import logging
+import shutil
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from utils.config import get_settings
+from utils.error_handlers import NotFoundError, ValidationError
+
+logger = logging.getLogger(__name__)
+
+_META = "meta.json"
+_TIME = "time.npy"
+
+TimeLike = Union[str, np.datetime64, None]
+
+
+def _to_seconds(value: TimeLike) -> Optional[int]:
+    if value is None or value == "":
+        return None
+    try:
+        return int(np.datetime64(value, "s").astype(np.int64))
+    except ValueError as e:
+        raise ValidationError(f"Invalid timestamp '{value}'") from e
+
+
+class ResultSet:
+    """Read-only view of one run's outputs.
+
+    Every variable is a ``(time, hru)`` float32 ``.npy`` file opened as a memory
+    map, so a query touches only the pages covering the requested time range;
+    rows are time-major, which keeps a time window of all HRUs contiguous.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        with open(path / _META) as f:
+            self.meta: Dict[str, Any] = json.load(f)
+        self.hru_ids: List[Any] = self.meta["hru_ids"]
+        self._hru_index = {h: i for i, h in enumerate(self.hru_ids)}
+        self._time: Optional[np.ndarray] = None
+        self._arrays: Dict[str, np.ndarray] = {}
+
+    @property
+    def version(self) -> int:
+        """Changes whenever the run is rewritten; used to key derived caches."""
+        return (self.path / _META).stat().st_mtime_ns
+
+    @property
+    def variables(self) -> List[str]:
+        return list(self.meta["variables"])
+
+    @property
+    def time(self) -> np.ndarray:
+        if self._time is None:
+            self._time = np.load(self.path / _TIME, mmap_mode="r")
+        return self._time
+
+    def array(self, variable: str) -> np.ndarray:
+        if variable not in self.meta["variables"]:
+            raise NotFoundError(f"Variable '{variable}' not found in results")
+        array = self._arrays.get(variable)
+        if array is None:
+            array = self._arrays[variable] = np.load(self.path / f"{variable}.npy", mmap_mode="r")
+        return array
+
+    def time_slice(self, start: TimeLike = None, end: TimeLike = None) -> slice:
+        """Index range of timestamps within ``[start, end]`` by binary search."""
+        lo, hi = _to_seconds(start), _to_seconds(end)
+        i0 = 0 if lo is None else int(np.searchsorted(self.time, lo, side="left"))
+        i1 = len(self.time) if hi is None else int(np.searchsorted(self.time, hi, side="right"))
+        return slice(i0, max(i0, i1))
+
+    def hru_positions(self, hrus: Optional[Sequence[Any]]) -> Union[slice, List[int]]:
+        if not hrus:
+            return slice(None)
+        positions = []
+        for hru in hrus:
+            index = self._hru_index.get(hru)
+            if index is None:
+                # Query strings arrive as text; HRU ids are usually integers.
+                index = self._hru_index.get(int(hru)) if str(hru).lstrip("-").isdigit() else None
+            if index is None:
+                raise NotFoundError(f"HRU '{hru}' not found in results")
+            positions.append(index)
+        return positions
+
+    def series(self, variable: str, hru: Any = None, start: TimeLike = None, end: TimeLike = None) -> Tuple[np.ndarray, np.ndarray]:
+        """One HRU's ``(times, values)`` within ``[start, end]``; defaults to the first HRU."""
+        rows = self.time_slice(start, end)
+        column = 0 if hru is None else self.hru_positions([hru])[0]
+        values = np.asarray(self.array(variable)[rows, column])
+        return np.asarray(self.time[rows]).astype("datetime64[s]"), values
+
+    def query(
+        self,
+        variables: Optional[Iterable[str]] = None,
+        start: TimeLike = None,
+        end: TimeLike = None,
+        hrus: Optional[Sequence[Any]] = None,
+    ) -> Dict[str, Any]:
+        """Slices of the requested variables; arrays are ``(time, hru)`` copies."""
+        rows = self.time_slice(start, end)
+        columns = self.hru_positions(hrus)
+        names = list(variables) if variables else self.variables
+        return {
+            "time": np.asarray(self.time[rows]).astype("datetime64[s]"),
+            "hru_ids": self.hru_ids if isinstance(columns, slice) else [self.hru_ids[i] for i in columns],
+            "values": {name: np.array(self.array(name)[rows][:, columns]) for name in names},
+        }
+
+    def describe(self) -> Dict[str, Any]:
+        time = self.time
+        return {
+            "variables": self.meta["variables"],
+            "hru_ids": self.hru_ids,
+            "time_steps": int(len(time)),
+            "start": str(time[0].astype("datetime64[s]")) if len(time) else None,
+            "end": str(time[-1].astype("datetime64[s]")) if len(time) else None,
+            "attrs": self.meta.get("attrs", {}),
+        }
+
+
+class ResultStore:
+    """On-disk columnar store of model output time series, one directory per run."""
+
+    def __init__(self, root: Union[str, Path]):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, run_id: str) -> Path:
+        return self.root / str(run_id)
+
+    def exists(self, run_id: str) -> bool:
+        return (self._path(run_id) / _META).exists()
+
+    def write(
+        self,
+        run_id: str,
+        times: Sequence[Any],
+        variables: Mapping[str, Any],
+        hru_ids: Optional[Sequence[Any]] = None,
+        attrs: Optional[Mapping[str, Any]] = None,
+    ) -> ResultSet:
+        """Store sorted ``times`` and ``(time, hru)`` (or ``(time,)``) arrays, replacing any previous run."""
+        seconds = np.asarray(times, dtype="datetime64[s]").astype(np.int64)
+        if seconds.ndim != 1:
+            raise ValidationError("Result times must be one-dimensional")
+        order = None
+        if len(seconds) > 1 and np.any(np.diff(seconds) < 0):
+            order = np.argsort(seconds, kind="stable")
+            seconds = seconds[order]
+
+        staging = self.root / f".staging-{run_id}-{uuid.uuid4().hex}"
+        staging.mkdir()
+        try:
+            np.save(staging / _TIME, seconds)
+            n_hru = None
+            for name, values in variables.items():
+                array = np.asarray(values, dtype=np.float32)
+                if array.ndim == 1:
+                    array = array[:, None]
+                if array.ndim != 2 or array.shape[0] != len(seconds):
+                    raise ValidationError(f"Variable '{name}' must have shape (time, hru)")
+                if n_hru is not None and array.shape[1] != n_hru:
+                    raise ValidationError("All variables must share the same HRU dimension")
+                n_hru = array.shape[1]
+                if order is not None:
+                    array = array[order]
+                np.save(staging / f"{name}.npy", np.ascontiguousarray(array))
+            ids = list(hru_ids) if hru_ids is not None else list(range(n_hru or 0))
+            if n_hru is not None and len(ids) != n_hru:
+                raise ValidationError("hru_ids does not match the HRU dimension")
+            meta = {"variables": list(variables), "hru_ids": ids, "attrs": dict(attrs or {})}
+            with open(staging / _META, "w") as f:
+                json.dump(meta, f, default=str)
+
+            target = self._path(run_id)
+            if target.exists():
+                shutil.rmtree(target)
+            staging.rename(target)
+        finally:
+            if staging.exists():
+                shutil.rmtree(staging, ignore_errors=True)
+        logger.info("Stored %d variable(s) x %d steps for run %s", len(variables), len(seconds), run_id)
+        return ResultSet(self._path(run_id))
+
+    def open(self, run_id: str) -> ResultSet:
+        if not self.exists(run_id):
+            raise NotFoundError(f"No stored results for run {run_id}")
+        return ResultSet(self._path(run_id))
+
+    def delete(self, run_id: str) -> None:
+        shutil.rmtree(self._path(run_id), ignore_errors=True)
+
+    def ingest_netcdf(self, run_id: str, paths: Sequence[Path], variables: Optional[Sequence[str]] = None) -> ResultSet:
+        """Ingest time-dimensioned variables from model output NetCDF files (requires xarray)."""
+        try:
+            import xarray as xr
+        except ImportError as e:
+            raise RuntimeError("xarray is required to ingest NetCDF model output") from e
+
+        collected: Dict[str, Any] = {}
+        times = hru_ids = n_hru = None
+        for path in paths:
+            with xr.open_dataset(path) as ds:
+                time_dim = "time" if "time" in ds.dims else None
+                if time_dim is None:
+                    continue
+                for name, da in ds.data_vars.items():
+                    if variables and name not in variables:
+                        continue
+                    if da.dims[0] != time_dim or da.ndim > 2 or name in collected:
+                        continue
+                    if times is None:
+                        times = ds[time_dim].values
+                    elif len(ds[time_dim]) != len(times):
+                        continue
+                    width = 1 if da.ndim == 1 else da.shape[1]
+                    if n_hru is None:
+                        n_hru = width
+                        if da.ndim == 2 and da.dims[1] in ds.coords:
+                            hru_ids = ds[da.dims[1]].values.tolist()
+                    elif width != n_hru:
+                        continue
+                    collected[name] = da.values
+        if not collected:
+            raise ValidationError("No time series variables found in model output")
+        return self.write(run_id, times, collected, hru_ids=hru_ids, attrs={"sources": [str(p) for p in paths]})
+
+
+_STORE: Optional[ResultStore] = None
+
+def get_result_store() -> ResultStore:
+    global _STORE
+    if _STORE is None:
+        _STORE = ResultStore(get_settings().result_store_dir)
+    return _STORE
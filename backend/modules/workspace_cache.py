@@ -0,0 +1,269 @@
+# backend/modules/workspace_cache.py
+import hashlib
+import json
+import logging
+import os
+import shutil
+import stat
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from utils.config import get_settings
+from utils.file_lock import LockUnavailable, file_lock
+
+try:
+    import fcntl
+    _FICLONE = 0x40049409  # Linux FICLONE ioctl (btrfs, xfs, ...)
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+    _FICLONE = None
+
+logger = logging.getLogger(__name__)
+
+# Config keys that differ per job but do not change the prepared project tree.
+JOB_SPECIFIC_CONFIG_KEYS = ("EXPERIMENT_ID", "CONFLUENCE_DATA_DIR")
+
+_READY_MARKER = ".delta_ready.json"
+_STATS = ".stats.json"
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return dict(value)
+    return str(value)
+
+
+def workspace_key(domain: str, model: str, config: Mapping[str, Any]) -> str:
+    """Content hash of everything that determines a prepared workspace."""
+    effective = {k: v for k, v in config.items() if k not in JOB_SPECIFIC_CONFIG_KEYS}
+    payload = json.dumps(
+        {"domain": domain, "model": model, "config": effective},
+        sort_keys=True,
+        default=_json_default,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _tree_size(root: Path) -> int:
+    total = 0
+    for dirpath, _dirnames, filenames in os.walk(root):
+        for name in filenames:
+            st = os.lstat(os.path.join(dirpath, name))
+            if stat.S_ISREG(st.st_mode):
+                total += st.st_size
+    return total
+
+
+def _rebase(path: str, build_root: Optional[str], dest: Path) -> str:
+    if build_root and (path == build_root or path.startswith(build_root + os.sep)):
+        return str(dest) + path[len(build_root):]
+    return path
+
+
+def _clone_file(src: str, dst: str) -> str:
+    """Reflink where the filesystem supports it, else hardlink, else copy."""
+    if fcntl is not None:
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+            shutil.copystat(src, dst)
+            os.chmod(dst, os.stat(dst).st_mode | stat.S_IWUSR)  # private copy-on-write clone
+            return dst
+        except OSError:
+            if os.path.exists(dst):
+                os.unlink(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+        os.chmod(dst, os.stat(dst).st_mode | stat.S_IWUSR)
+    return dst
+
+
+class WorkspaceCache:
+    """Content-addressed cache of prepared SYMFLUENCE project trees.
+
+    Each entry lives in ``<root>/<key>`` and is published atomically with a
+    rename once fully built. Builders for the same key are serialised by a
+    per-key file lock so concurrent jobs (threads or processes) build once and
+    share the result. Cached files are read-only. Jobs get private, writable
+    copies of files up to ``copy_max_bytes`` (configs and model settings that
+    later steps edit in place), with absolute paths into the build directory
+    rewritten to the job's workspace; larger files are reflinked or hardlinked
+    and must be replaced rather than modified. The least recently used entries
+    are evicted once the total exceeds ``max_bytes``. Hit and miss counts are
+    kept in the cache directory, so they add up across job processes.
+    """
+
+    def __init__(self, root: str, max_bytes: int, copy_max_bytes: int = 1024 * 1024):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.copy_max_bytes = copy_max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _entry(self, key: str) -> Path:
+        return self.root / key
+
+    def _lock_path(self, key: str) -> Path:
+        return self.root / f".{key}.lock"
+
+    def lookup(self, key: str) -> Optional[Path]:
+        entry = self._entry(key)
+        marker = entry / _READY_MARKER
+        if not marker.exists():
+            return None
+        os.utime(marker)  # LRU timestamp
+        return entry
+
+    def get_or_build(self, key: str, build: Callable[[Path], None]) -> Path:
+        """Return the ready entry for ``key``, running ``build(staging_dir)`` on a miss."""
+        return self._get_or_build(key, build)[0]
+
+    def _get_or_build(self, key: str, build: Callable[[Path], None]) -> Tuple[Path, bool]:
+        with file_lock(self._lock_path(key)):
+            entry = self.lookup(key)
+            if entry is not None:
+                self._count("hits")
+                return entry, True
+            self._count("misses")
+            staging = self.root / f".staging-{key}-{uuid.uuid4().hex}"
+            staging.mkdir()
+            try:
+                build(staging)
+                self._publish(key, staging)
+            finally:
+                if staging.exists():
+                    shutil.rmtree(staging, ignore_errors=True)
+        self.evict()
+        return self._entry(key), False
+
+    def _count(self, field: str) -> None:
+        with file_lock(self.root / ".stats.lock"):
+            counts = self._counts()
+            counts[field] = counts.get(field, 0) + 1
+            tmp = self.root / f"{_STATS}.{os.getpid()}.tmp"
+            tmp.write_text(json.dumps(counts))
+            os.replace(tmp, self.root / _STATS)
+
+    def _counts(self) -> Dict[str, int]:
+        try:
+            return json.loads((self.root / _STATS).read_text())
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _publish(self, key: str, staging: Path) -> None:
+        for dirpath, _dirnames, filenames in os.walk(staging):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                if not os.path.islink(path):
+                    os.chmod(path, stat.S_IMODE(os.lstat(path).st_mode) & ~0o222)
+        # The build root lets clones rebase absolute paths written during setup.
+        metadata = {"key": key, "size": _tree_size(staging), "created_at": time.time(), "root": str(staging)}
+        (staging / _READY_MARKER).write_text(json.dumps(metadata))
+        entry = self._entry(key)
+        if entry.exists():
+            shutil.rmtree(entry)  # incomplete leftover from a crashed builder
+        os.rename(staging, entry)
+        logger.info("Workspace cache stored %s (%d bytes)", key[:12], metadata["size"])
+
+    def materialize(self, key: str, build: Callable[[Path], None], dest: Path, attempts: int = 3) -> bool:
+        """Clone entry ``key`` into ``dest``, building it first on a miss.
+
+        Returns True when an existing entry was reused.
+        """
+        for _ in range(attempts):
+            _, reused = self._get_or_build(key, build)
+            try:
+                self.clone_into(key, dest)
+            except FileNotFoundError:
+                # Evicted between build and clone; try again.
+                continue
+            return reused
+        raise RuntimeError(f"Workspace cache entry {key[:12]} kept disappearing")
+
+    def clone_into(self, key: str, dest: Path) -> None:
+        """Materialise entry ``key`` inside ``dest`` without copying large file data."""
+        with file_lock(self._lock_path(key), shared=True):
+            entry = self._entry(key)
+            marker = entry / _READY_MARKER
+            if not marker.exists():
+                raise FileNotFoundError(f"Workspace cache entry {key[:12]} is not available")
+            build_root = json.loads(marker.read_text()).get("root")
+            for dirpath, dirnames, filenames in os.walk(entry):
+                target_dir = Path(dest) / os.path.relpath(dirpath, entry)
+                target_dir.mkdir(exist_ok=True)
+                for name in dirnames + filenames:
+                    src, target = os.path.join(dirpath, name), target_dir / name
+                    if os.path.islink(src):
+                        os.symlink(_rebase(os.readlink(src), build_root, dest), target)
+                    elif name in filenames and not (dirpath == str(entry) and name == _READY_MARKER):
+                        self._clone(src, target, build_root, dest)
+
+    def _clone(self, src: str, dst: Path, build_root: Optional[str], dest: Path) -> None:
+        if os.path.getsize(src) > self.copy_max_bytes:
+            _clone_file(src, str(dst))
+            return
+        with open(src, "rb") as f:
+            data = f.read()
+        if build_root and b"\0" not in data:
+            data = data.replace(build_root.encode(), str(dest).encode())
+        with open(dst, "wb") as f:
+            f.write(data)
+        shutil.copymode(src, dst)
+        os.chmod(dst, os.stat(dst).st_mode | stat.S_IWUSR)
+
+    def entries(self) -> List[Dict[str, Any]]:
+        result = []
+        for entry in self.root.iterdir():
+            if entry.name.startswith("."):
+                continue
+            marker = entry / _READY_MARKER
+            try:
+                metadata = json.loads(marker.read_text())
+                metadata["last_used"] = marker.stat().st_mtime
+            except FileNotFoundError:
+                continue  # not built yet, or evicted by another process meanwhile
+            result.append(metadata)
+        return result
+
+    def evict(self) -> int:
+        """Drop least recently used entries until within budget; busy entries are skipped."""
+        entries = sorted(self.entries(), key=lambda e: e["last_used"])
+        total = sum(e["size"] for e in entries)
+        evicted = 0
+        for metadata in entries:
+            if total <= self.max_bytes:
+                break
+            key = metadata["key"]
+            try:
+                with file_lock(self._lock_path(key), blocking=False):
+                    shutil.rmtree(self._entry(key), ignore_errors=True)
+            except LockUnavailable:
+                continue
+            total -= metadata["size"]
+            evicted += 1
+            logger.info("Workspace cache evicted %s", key[:12])
+        return evicted
+
+    def stats(self) -> Dict[str, Any]:
+        entries = self.entries()
+        counts = self._counts()
+        return {
+            "entries": len(entries),
+            "total_bytes": sum(e["size"] for e in entries),
+            "max_bytes": self.max_bytes,
+            "hits": counts.get("hits", 0),
+            "misses": counts.get("misses", 0),
+        }
+
+
+_CACHE: Optional[WorkspaceCache] = None
+
+def get_workspace_cache() -> Optional[WorkspaceCache]:
+    global _CACHE
+    settings = get_settings()
+    if _CACHE is None and settings.workspace_cache_dir:
+        _CACHE = WorkspaceCache(settings.workspace_cache_dir, settings.workspace_cache_max_mb * 1024 * 1024)
+    return _CACHE
@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+from api.services.admission import AdmissionController
+from utils.error_handlers import OverloadedError
+
+
+@pytest.mark.asyncio
+async def test_rejects_with_retry_after_when_queue_full():
+    controller = AdmissionController(max_concurrency=1, max_queue=1, queue_timeout=5)
+    first = await controller.acquire("alice")
+
+    waiter = asyncio.create_task(controller.acquire("bob"))
+    await asyncio.sleep(0)
+
+    with pytest.raises(OverloadedError) as exc_info:
+        await controller.acquire("carol")
+    assert exc_info.value.status_code == 429
+    assert int(exc_info.value.headers["Retry-After"]) >= 1
+
+    controller.release(first)
+    second = await waiter
+    assert second.user == "bob"
+    controller.release(second)
+
+    stats = controller.snapshot()
+    assert stats["rejected_total"] == 1
+    assert stats["active"] == 0 and stats["queued"] == 0
+
+
+@pytest.mark.asyncio
+async def test_fair_share_and_priority_ordering():
+    controller = AdmissionController(max_concurrency=1, max_queue=10, queue_timeout=5)
+    holder = await controller.acquire("holder")
+    order = []
+
+    async def request(user, priority="standard"):
+        ticket = await controller.acquire(user, priority)
+        order.append(user)
+        controller.release(ticket)
+
+    tasks = [asyncio.create_task(request("alice")) for _ in range(3)]
+    tasks.append(asyncio.create_task(request("bob")))
+    tasks.append(asyncio.create_task(request("vip", "interactive")))
+    await asyncio.sleep(0)
+
+    controller.release(holder)
+    await asyncio.gather(*tasks)
+
+    assert order[0] == "vip"
+    # bob is served before alice's backlog drains
+    assert order.index("bob") < 3
+
+
+@pytest.mark.asyncio
+async def test_queue_timeout_raises_overloaded():
+    controller = AdmissionController(max_concurrency=1, queue_timeout=0.01)
+    ticket = await controller.acquire("alice")
+    with pytest.raises(OverloadedError):
+        await controller.acquire("bob")
+    assert controller.snapshot()["timed_out_total"] == 1
+    controller.release(ticket)
@@ -0,0 +1,123 @@
+import random
+
+import pytest
+
+from api.services.answer_cache import SemanticAnswerCache
+from api.services.llm_service import LLMService
+from modules.embeddings import HashingEmbedder
+
+
+class CountingProvider:
+    def __init__(self, reply="A watershed is the land area draining to a common outlet."):
+        self.reply = reply
+        self.calls = 0
+
+    async def generate_response(self, user_input, system_prompt):
+        self.calls += 1
+        return self.reply
+
+    async def generate_response_stream(self, user_input, system_prompt):
+        self.calls += 1
+        for i, word in enumerate(self.reply.split(" ")):
+            yield word if i == 0 else " " + word
+
+
+def _cache(**kwargs):
+    return SemanticAnswerCache(HashingEmbedder(), **kwargs)
+
+
+def test_paraphrases_hit_per_role_and_follow_ups_bypass():
+    cache = _cache(thresholds={"EDUCATIONAL": 0.99})
+    assert cache.put("DELTA", "What is a watershed?", "Land draining to one outlet.")
+
+    hit = cache.get("DELTA", "explain watersheds")
+    assert hit is not None and hit.answer == "Land draining to one outlet."
+    assert cache.get("EDUCATIONAL", "explain watersheds") is None
+    assert cache.get("DELTA", "How is groundwater recharged?") is None
+    assert cache.get("DELTA", "why is that a watershed?") is None
+    assert not cache.put("DELTA", "tell me more", "...")
+    assert not cache.put("DELTA", "What is baseflow?", "Error: quota exceeded")
+
+    delta = cache.stats()["roles"]["DELTA"]
+    assert (delta["hits"], delta["misses"], delta["threshold"]) == (1, 1, 0.95)
+    assert cache.stats()["bypassed"] == 1
+
+
+def test_interrogatives_and_negation_must_agree():
+    cache = _cache(threshold=0.5)
+    cache.put("DELTA", "How does snowmelt affect runoff?", "how")
+    cache.put("DELTA", "When does snowmelt peak?", "when")
+
+    assert cache.get("DELTA", "Why does snowmelt affect runoff?") is None
+    assert cache.get("DELTA", "Where does snowmelt peak?") is None
+    assert cache.get("DELTA", "When doesn't snowmelt peak?") is None
+    assert cache.get("DELTA", "how does snowmelt affect runoff").answer == "how"
+
+
+def test_eviction_by_size_and_age(monkeypatch):
+    cache = _cache(max_size=2, ttl=60)
+    cache.put("DELTA", "what is a watershed", "a")
+    cache.put("DELTA", "what is groundwater", "b")
+    cache.get("DELTA", "what is a watershed")
+    cache.put("DELTA", "what is snowmelt", "c")
+
+    assert cache.get("DELTA", "what is groundwater") is None
+    assert cache.get("DELTA", "what is a watershed").answer == "a"
+
+    now = __import__("time").time()
+    monkeypatch.setattr("api.services.answer_cache.time.time", lambda: now + 120)
+    assert cache.get("DELTA", "what is snowmelt") is None
+    assert cache.stats()["roles"]["DELTA"]["size"] == 0
+
+
+def test_sampled_hits_are_audited_against_a_fresh_answer():
+    cache = _cache(sample_rate=1.0, rng=random.Random(0))
+    cache.put("DELTA", "what is evapotranspiration", "Evaporation plus plant transpiration to the atmosphere.")
+
+    hit = cache.get("DELTA", "explain evapotranspiration")
+    assert hit.audit
+    assert not cache.audit(hit, "Evapotranspiration is evaporation plus transpiration from plants.")
+    assert cache.audit(cache.get("DELTA", "explain evapotranspiration"), "Snow accumulates in winter.")
+
+    stats = cache.stats()["roles"]["DELTA"]
+    assert (stats["hits"], stats["audits"], stats["false_hits"], stats["false_hit_rate"]) == (0, 2, 1, 0.5)
+    cache.sample_rate = 0.0
+    assert cache.get("DELTA", "what is evapotranspiration").answer == "Snow accumulates in winter."
+
+
+@pytest.mark.asyncio
+async def test_llm_service_serves_similar_prompts_from_cache():
+    provider = CountingProvider()
+    service = LLMService(answer_cache=_cache())
+    service._provider = provider
+    service.system_prompt = lambda user_input, role="DELTA": "system"
+
+    first = await service.generate_response("What is a watershed?")
+    assert await service.generate_response("explain watersheds") == first
+    streamed = [chunk async for chunk in service.generate_stream("Describe a watershed")]
+    assert streamed == [first]
+    assert provider.calls == 1
+
+    [chunk async for chunk in service.generate_stream("What is groundwater recharge?")]
+    assert await service.generate_response("explain groundwater recharge") == provider.reply
+    assert provider.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_cache_is_per_user_and_skipped_with_history():
+    provider = CountingProvider()
+    cache = _cache()
+    service = LLMService(answer_cache=cache)
+    service._provider = provider
+    service.system_prompt = lambda user_input, role="DELTA": "system"
+
+    await service.generate_response("What is a watershed?", user="alice")
+    await service.generate_response("What is a watershed?", user="bob")
+    await service.generate_response("What is a watershed?", history=[{"role": "user", "content": "hi"}], user="alice")
+    assert provider.calls == 3
+    await service.generate_response("explain watersheds", user="alice")
+    assert provider.calls == 3
+
+    cache.put("EDUCATIONAL", "What is baseflow?", "Groundwater discharge.", user="alice")
+    assert cache.get("EDUCATIONAL", "explain baseflow", user="bob").answer == "Groundwater discharge."
+    assert cache.stats()["bypassed"] == 1
@@ -0,0 +1,100 @@
+import json
+import time
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import JWTError, jwk, jwt
+
+from api.auth import TokenCache, TokenSigner, TokenVerifier
+from utils.error_handlers import ConfigurationError
+
+SECRET = "test-secret"
+
+
+def test_verified_tokens_are_served_from_cache():
+    verifier = TokenVerifier(SECRET, "HS256")
+    token = jwt.encode({"sub": "alice", "exp": int(time.time()) + 60}, SECRET, algorithm="HS256")
+
+    assert verifier.verify(token)["sub"] == "alice"
+    assert verifier.verify(token)["sub"] == "alice"
+
+    stats = verifier.cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+def test_cache_entries_expire_with_token_and_respect_bound():
+    cache = TokenCache(max_size=2)
+    cache.put("expired", {"sub": "x", "exp": time.time() - 1})
+    assert cache.get("expired") is None
+
+    for name in ("a", "b", "c"):
+        cache.put(name, {"sub": name, "exp": time.time() + 60})
+    assert cache.get("a") is None
+    assert cache.get("c")["sub"] == "c"
+
+
+def test_jwks_verification_by_key_id(tmp_path):
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo,
+    ).decode()
+
+    public_jwk = jwk.construct(public_pem, "RS256").to_dict()
+    public_jwk.update({"kid": "svc-1", "alg": "RS256"})
+    jwks_path = tmp_path / "jwks.json"
+    jwks_path.write_text(json.dumps({"keys": [public_jwk]}))
+
+    verifier = TokenVerifier(SECRET, "HS256", jwks_path=str(jwks_path))
+    claims = {"sub": "worker", "exp": int(time.time()) + 60}
+
+    token = jwt.encode(claims, private_pem, algorithm="RS256", headers={"kid": "svc-1"})
+    assert verifier.verify(token)["sub"] == "worker"
+
+    unknown = jwt.encode(claims, private_pem, algorithm="RS256", headers={"kid": "other"})
+    with pytest.raises(JWTError):
+        verifier.verify(unknown)
+
+    # A kid must never be satisfiable with an HMAC signature.
+    forged = jwt.encode(claims, SECRET, algorithm="HS256", headers={"kid": "svc-1"})
+    with pytest.raises(JWTError):
+        verifier.verify(forged)
+
+
+def test_private_key_signing_is_validated_and_read_once(tmp_path):
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    key_path = tmp_path / "signing.pem"
+    key_path.write_bytes(private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ))
+
+    jwks_path = str(tmp_path / "jwks.json")
+    with pytest.raises(ConfigurationError):
+        TokenSigner(SECRET, "HS256", private_key_path=str(key_path), key_id="svc-1", jwks_path=jwks_path)
+    with pytest.raises(ConfigurationError):
+        TokenSigner(SECRET, "RS256", private_key_path=str(key_path), key_id="svc-1")
+
+    signer = TokenSigner(SECRET, "RS256", private_key_path=str(key_path), key_id="svc-1", jwks_path=jwks_path)
+    key_path.unlink()
+    token = signer.sign({"sub": "alice", "exp": int(time.time()) + 60})
+    assert jwt.get_unverified_header(token) == {"alg": "RS256", "kid": "svc-1", "typ": "JWT"}
+
+
+def test_malformed_jwks_is_a_configuration_error(tmp_path):
+    jwks_path = tmp_path / "jwks.json"
+    jwks_path.write_text("{not json")
+    verifier = TokenVerifier(SECRET, "HS256", jwks_path=str(jwks_path))
+    token = jwt.encode({"sub": "x"}, SECRET, algorithm="HS256", headers={"kid": "svc-1"})
+
+    with pytest.raises(ConfigurationError):
+        verifier.verify(token)
@@ -0,0 +1,105 @@
+import concurrent.futures as cf
+import dataclasses
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.orm import sessionmaker
+
+from api.models import Job as DBJob, JOB_CANCELLED, JOB_COMPLETED, JOB_TYPE_CALIBRATION
+from modules import calibration
+from modules.calibration import (
+    DDS,
+    CalibrationCheckpoint,
+    CalibrationModule,
+    CalibrationSpec,
+    evaluate_candidate,
+    run_parallel_dds,
+)
+from utils.config import get_settings
+from utils.db import create_db_engine, init_db
+
+BOUNDS = {"k_soil": (0.0, 1.0), "theta_sat": (0.0, 1.0), "vGn_n": (0.0, 1.0)}
+
+
+def _spec(max_evaluations, parallelism=4):
+    return CalibrationSpec("synthetic_reservoir", BOUNDS, max_evaluations, 0.2, parallelism, 1, "NSE")
+
+
+def test_parallel_dds_improves_synthetic_objective():
+    spec = _spec(300)
+    dds = DDS(BOUNDS, spec.max_evaluations, seed=1)
+    improvements = []
+    with cf.ThreadPoolExecutor(max_workers=spec.parallelism) as executor:
+        run_parallel_dds(dds, spec, executor, on_improvement=lambda d: improvements.append(d.best_f))
+
+    assert dds.completed == 300
+    assert improvements == sorted(improvements, reverse=True)
+    start = evaluate_candidate(spec.objective, {n: 0.5 for n in BOUNDS}, BOUNDS)
+    assert dds.best_f < 0.05 < start
+
+
+def test_checkpoint_resumes_the_same_search(tmp_path):
+    objective = lambda x: evaluate_candidate("synthetic_reservoir", x, BOUNDS)
+    dds = DDS(BOUNDS, 50, seed=3)
+    for _ in range(20):
+        candidate = dds.ask()
+        dds.tell(candidate, objective(candidate))
+
+    checkpoint = CalibrationCheckpoint(tmp_path / "job_1.json")
+    checkpoint.save(dds)
+    resumed = checkpoint.load()
+
+    assert (resumed.completed, resumed.best_f, resumed.best_x) == (dds.completed, dds.best_f, dds.best_x)
+    assert [resumed.ask() for _ in range(5)] == [dds.ask() for _ in range(5)]
+
+
+def test_calibration_job_runs_on_process_pool(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    init_db(engine)
+    session_factory = sessionmaker(bind=engine, expire_on_commit=False)
+    settings = dataclasses.replace(get_settings(), calibration_checkpoint_dir=str(tmp_path / "ckpt"))
+
+    with session_factory() as db:
+        job = DBJob(
+            type=JOB_TYPE_CALIBRATION,
+            parameters={"param_bounds": BOUNDS, "max_evaluations": 40, "parallelism": 2, "seed": 5},
+        )
+        db.add(job)
+        db.commit()
+        CalibrationModule(settings).execute(job.id, db)
+
+    with session_factory() as db:
+        done = db.get(DBJob, job.id)
+        assert done.status == JOB_COMPLETED, done.logs
+        assert done.result["evaluations"] == 40
+        assert set(done.result["best_parameters"]) == set(BOUNDS)
+        assert "best objective" in done.logs
+    # Only interrupted jobs resume, so a finished job's checkpoint is removed.
+    assert not (tmp_path / "ckpt" / f"job_{job.id}.json").exists()
+    engine.dispose()
+
+
+def test_cancel_during_completion_is_not_overwritten(tmp_path, monkeypatch):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    init_db(engine)
+    session_factory = sessionmaker(bind=engine, expire_on_commit=False)
+    settings = dataclasses.replace(get_settings(), calibration_checkpoint_dir=str(tmp_path / "ckpt"))
+
+    def cancel_as_search_ends(dds, spec, *args, **kwargs):
+        with session_factory() as other:
+            other.execute(update(DBJob).where(DBJob.id == job.id).values(status=JOB_CANCELLED))
+            other.commit()
+
+    monkeypatch.setattr(calibration, "run_parallel_dds", cancel_as_search_ends)
+    with session_factory() as db:
+        job = DBJob(type=JOB_TYPE_CALIBRATION, parameters={"param_bounds": BOUNDS, "max_evaluations": 4})
+        db.add(job)
+        db.commit()
+        checkpoint = CalibrationModule(settings).checkpoint_for(job.id)
+        checkpoint.save(DDS(BOUNDS, 4, seed=1))
+        CalibrationModule(settings).execute(job.id, db)
+
+    with session_factory() as db:
+        assert db.get(DBJob, job.id).status == JOB_CANCELLED
+    assert not checkpoint.path.exists()
+    engine.dispose()
@@ -0,0 +1,52 @@
+import os
+from pathlib import Path
+
+import pytest
+import yaml
+
+from modules.config_templates import TemplateCache
+
+EXAMPLE_TEMPLATE = Path(__file__).parent.parent / "examples" / "config_Bow.yaml"
+
+
+def test_render_matches_full_dump_of_merged_config():
+    template = TemplateCache().get(EXAMPLE_TEMPLATE)
+    overrides = {"DOMAIN_NAME": "Elbow", "EXPERIMENT_ID": "delta_job_7", "NEW_KEY": [1, 2]}
+    config = template.overlay(overrides)
+
+    with open(EXAMPLE_TEMPLATE) as f:
+        expected = yaml.safe_load(f)
+    expected.update(overrides, CONFLUENCE_DATA_DIR="/tmp/job7")
+
+    rendered = config.render({"CONFLUENCE_DATA_DIR": "/tmp/job7"})
+    assert yaml.safe_load(rendered) == expected
+    assert rendered == yaml.safe_dump(expected, default_flow_style=False)
+
+
+def test_overlays_do_not_touch_shared_base():
+    template = TemplateCache().get(EXAMPLE_TEMPLATE)
+    original = template.base["DOMAIN_NAME"]
+    config = template.overlay({"DOMAIN_NAME": "Other"})
+
+    assert config["DOMAIN_NAME"] == "Other"
+    assert template.base["DOMAIN_NAME"] == original
+    with pytest.raises(TypeError):
+        template.base["DOMAIN_NAME"] = "Mutated"
+
+
+def test_parses_once_and_reloads_on_change(tmp_path):
+    path = tmp_path / "template.yaml"
+    path.write_text("A: 1\nB: x\n")
+    cache = TemplateCache()
+
+    first = cache.get(path)
+    assert cache.get(path) is first
+    assert cache.stats() == {"templates": 1, "hits": 1, "misses": 1}
+
+    path.write_text("A: 2\nB: x\n")
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, first.mtime_ns + 1_000_000))
+    second = cache.get(path)
+    assert second is not first
+    assert second.base["A"] == 2
+    assert second.version != first.version
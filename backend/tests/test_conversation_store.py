@@ -0,0 +1,54 @@
+import sys
+
+from api.services.conversation_store import ConversationStore, Message
+
+
+def test_message_is_compact_and_dict_compatible():
+    msg = Message("user", "What is baseflow?")
+    assert not hasattr(msg, "__dict__")
+    assert msg["content"] == "What is baseflow?"
+    assert msg.get("sender") == "user"
+    assert msg.get("missing", "fallback") == "fallback"
+    assert Message("assistant", "x").role is Message(sys.intern("assistant"), "y").role
+
+
+def test_history_window_is_a_view_not_a_copy():
+    store = ConversationStore()
+    for i in range(5):
+        store.append(("alice", 1), "user" if i % 2 == 0 else "assistant", f"m{i}")
+
+    window = store.history(("alice", 1), 3)
+    assert [m.content for m in window] == ["m2", "m3", "m4"]
+    assert [m.content for m in window[1:]] == ["m3", "m4"]
+    assert window[-1] is store.messages(("alice", 1))[4]
+
+    # Appends after the window was taken do not change it.
+    store.append(("alice", 1), "user", "m5")
+    assert len(window) == 3
+    assert store.count(("alice", 1)) == 6
+
+
+def test_store_evicts_least_recently_used_and_reports_memory():
+    store = ConversationStore(max_conversations=2)
+    store.append(("alice", 1), "user", "a")
+    store.append(("alice", 2), "user", "b")
+    store.history(("alice", 1), 5)  # touch conversation 1
+    store.append(("alice", 3), "user", "c")
+
+    assert store.count(("alice", 2)) == 0
+    assert store.count(("alice", 1)) == 1
+
+    stats = store.memory_stats()
+    assert stats["conversations"] == 2
+    assert stats["messages"] == 2
+    assert stats["avg_bytes_per_conversation"] > 0
+
+
+def test_conversations_are_scoped_to_their_owner():
+    store = ConversationStore()
+    store.append(("alice", 1), "user", "alice's question")
+
+    assert len(store.history(("bob", 1), 5)) == 0
+    assert not store.exists(("bob", 1))
+    first, second = store.create("bob"), store.create("bob")
+    assert first != second and store.exists(("bob", first))
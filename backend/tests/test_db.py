@@ -0,0 +1,14 @@
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+
+from api.models import Base
+from utils.db import create_db_engine, init_db
+
+
+def test_migrations_build_the_model_schema(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    init_db(engine)
+    init_db(engine)
+
+    with engine.connect() as connection:
+        assert compare_metadata(MigrationContext.configure(connection), Base.metadata) == []
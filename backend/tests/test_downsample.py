@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from modules.downsample import SeriesCache, downsample, lttb, minmax, pack_series
+
+
+def _hydrograph(n=100_000):
+    rng = np.random.default_rng(0)
+    times = np.datetime64("1990-01-01T00") + np.arange(n).astype("timedelta64[h]")
+    flow = (50 + 10 * np.sin(np.arange(n) / 500) + rng.normal(0, 1, n)).astype(np.float32)
+    flow[12_345] = 900.0  # flood peak
+    flow[54_321] = -5.0   # sensor dip
+    return times, flow
+
+
+@pytest.mark.parametrize("method", ["minmax", "lttb"])
+def test_downsampling_keeps_shape_and_extremes(method):
+    times, flow = _hydrograph()
+    t, v = downsample(times, flow, 800, method)
+
+    assert len(v) <= 802
+    assert t.dtype == times.dtype and np.all(np.diff(t.astype(np.int64)) > 0)
+    assert (t[0], t[-1]) == (times[0], times[-1])
+    assert v.max() == 900.0
+    if method == "minmax":
+        assert v.min() == -5.0
+
+
+def _reference_lttb(x, y, n_out):
+    # Straightforward transcription of the original algorithm.
+    n = len(x)
+    every = (n - 2) / (n_out - 2)
+    selected, a = [0], 0
+    for i in range(n_out - 2):
+        start, stop = int(i * every) + 1, int((i + 1) * every) + 1
+        next_start, next_stop = stop, min(int((i + 2) * every) + 1, n)
+        avg_x, avg_y = x[next_start:next_stop].mean(), y[next_start:next_stop].mean()
+        best, best_area = start, -1.0
+        for j in range(start, stop):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+        a = best
+    return selected + [n - 1]
+
+
+def test_lttb_matches_reference_implementation():
+    rng = np.random.default_rng(1)
+    x = np.sort(rng.uniform(0, 100, 503))
+    y = rng.normal(size=503)
+    assert lttb(x, y, 37).tolist() == _reference_lttb(x, y, 37)
+
+    small = np.array([0, 1, 0, 5, 0, 1, 0, -4, 0, 1], dtype=np.float64)
+    assert minmax(np.arange(10), small, 4).tolist() == [0, 3, 5, 7, 9]
+
+
+def test_missing_values_and_short_series():
+    times = np.arange(5).astype("datetime64[D]")
+    values = np.array([1, np.nan, 3, 4, 5], dtype=np.float32)
+    t, v = downsample(times, values, 10)
+    assert v.tolist() == [1, 3, 4, 5]
+    assert len(pack_series(t, v)) == 4 * 8 + 4 * 4
+
+
+def test_cache_reuses_results():
+    cache = SeriesCache(max_entries=1)
+    calls = []
+    compute = lambda: calls.append(1) or (np.zeros(1), np.zeros(1))
+    cache.get_or_compute("a", compute)
+    cache.get_or_compute("a", compute)
+    cache.get_or_compute("b", compute)
+    cache.get_or_compute("a", compute)
+    assert len(calls) == 3
+    assert cache.stats() == {"entries": 1, "hits": 1, "misses": 3}
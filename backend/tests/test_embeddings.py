@@ -0,0 +1,85 @@
+import numpy as np
+
+from modules.educational import EducationalModule
+from modules.embeddings import EmbeddingIndex, HashingEmbedder
+from modules.knowledge_base import BUNDLED_KNOWLEDGE_DIR, KnowledgeBase
+
+
+class RandomEmbedder:
+    """Deterministic random unit vectors keyed by the text."""
+    name = "random-32"
+    dim = 32
+
+    def embed(self, texts):
+        vectors = np.stack([
+            np.random.default_rng(int(text)).standard_normal(self.dim) for text in texts
+        ]).astype(np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_top_k_matches_brute_force(tmp_path, monkeypatch):
+    monkeypatch.setattr("modules.embeddings._SEARCH_BLOCK", 100)
+    embedder = RandomEmbedder()
+    index = EmbeddingIndex(tmp_path, embedder)
+    texts = [str(i) for i in range(1000)]
+    assert index.add(texts, texts) == 1000
+    assert index.add(texts[:10], texts[:10]) == 0
+
+    queries = embedder.embed(["5000", "5001", "17"])
+    expected = np.argsort(-(queries @ embedder.embed(texts).T), axis=1)[:, :5]
+    results = index.search_vectors(queries, k=5)
+    assert [[int(n.key) for n in hits] for hits in results] == expected.tolist()
+    assert results[2][0].score > 0.999
+
+    approximate = index.search_vectors(queries[2:], k=1, approximate=True)
+    assert approximate[0][0].key == "17"
+
+
+def test_processes_share_the_mapped_index(tmp_path):
+    writer = EmbeddingIndex(tmp_path, HashingEmbedder(64))
+    reader = EmbeddingIndex(tmp_path, HashingEmbedder(64))
+    writer.add(["a", "b"], ["groundwater recharge", "snowmelt runoff"], [{"n": 1}, {"n": 2}])
+
+    [hits] = reader.search(["aquifer recharge by groundwater"], k=1)
+    assert (hits[0].key, hits[0].metadata) == ("a", {"n": 1})
+    assert isinstance(reader._vectors, np.memmap)
+
+    writer.remove(["a"])
+    assert reader.keys() == ["b"]
+    assert len(EmbeddingIndex(tmp_path, HashingEmbedder(32))) == 0
+
+
+def test_compaction_drops_dead_and_oldest_rows(tmp_path, monkeypatch):
+    monkeypatch.setattr("modules.embeddings._COMPACT_MIN_GARBAGE", 4)
+    writer = EmbeddingIndex(tmp_path, HashingEmbedder(32), max_rows=10)
+    reader = EmbeddingIndex(tmp_path, HashingEmbedder(32))
+    writer.add([str(i) for i in range(8)], [f"text {i}" for i in range(8)])
+    writer.remove([str(i) for i in range(5)])
+
+    assert writer.stats()["generation"] == 1 and writer.stats()["rows"] == 3
+    assert reader.keys() == ["5", "6", "7"]
+    assert [n.key for n in reader.search(["text 6"], k=1)[0]] == ["6"]
+
+    writer.add([str(i) for i in range(10, 20)], [f"text {i}" for i in range(10, 20)])
+    assert len(reader) == 10 and "5" not in reader
+    assert sorted(p.name for p in tmp_path.glob("vectors.*")) == ["vectors.2.f32"]
+
+
+def test_grounding_fuses_keyword_and_embedding_matches(tmp_path):
+    knowledge_base = KnowledgeBase()
+    knowledge_base.load_directory(BUNDLED_KNOWLEDGE_DIR, "delta")
+    module = EducationalModule(
+        knowledge_base,
+        EmbeddingIndex(tmp_path / "knowledge", HashingEmbedder()),
+        EmbeddingIndex(tmp_path / "answers", HashingEmbedder()),
+    )
+    assert module.sync_embeddings()["added"] == len(knowledge_base.passages())
+    assert module.sync_embeddings() == {"added": 0, "removed": 0}
+
+    assert module.passages("baseflow from aquifers")[0].doc_id == "delta/groundwater"
+    assert not module.record_answer("Why is my Bow run slow?", "Your job is queued.")
+    assert not module.record_answer("/explain droughts", "Error: quota exceeded")
+    assert module.record_answer("/explain why rivers keep flowing in droughts", "Groundwater sustains baseflow.")
+    grounding = module.grounding("/explain why rivers keep flowing during droughts")
+    assert 'Earlier DELTA answer to "/explain why rivers keep flowing in droughts"' in grounding
+    assert len(module.answer_index) == 1
@@ -0,0 +1,109 @@
+import datetime
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.orm import sessionmaker
+
+from api.models import Job as DBJob, JOB_CANCELLED, JOB_COMPLETED, JOB_FAILED, JOB_PENDING, JOB_RUNNING, JOB_STALLED
+from api.schemas import JobCreate
+from api.services.job_service import JobService
+from modules.ensemble import expand_ensemble
+from utils.db import create_db_engine, init_db
+from utils.error_handlers import ValidationError
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    init_db(engine)
+    yield sessionmaker(bind=engine, expire_on_commit=False)
+    engine.dispose()
+
+
+def _set_status(session_factory, job_id, status):
+    with session_factory() as db:
+        db.execute(update(DBJob).where(DBJob.id == job_id).values(status=status, result={"ok": status}))
+        db.commit()
+
+
+def test_decision_sweep_uses_template_options_by_default():
+    template = {"DECISION_OPTIONS": {"snowIncept": ["lightSnow", "stickySnow"], "compaction": ["consettl", "anderson"]}}
+    members = expand_ensemble({"model": "SUMMA"}, template, max_members=10)
+
+    assert len(members) == 4
+    assert members[0] == {
+        "model": "SUMMA",
+        "member_index": 0,
+        "config_overrides": {"DECISION_OPTIONS": {"compaction": ["consettl"], "snowIncept": ["lightSnow"]}},
+    }
+    with pytest.raises(ValidationError):
+        expand_ensemble({}, template, max_members=3)
+
+
+def test_parameter_sweeps_are_rejected():
+    # Members cannot set parameter values, so they would all be the same run.
+    with pytest.raises(ValidationError):
+        expand_ensemble({"sweep": "parameters", "param_ranges": {"k_soil": [0.0, 1.0]}}, {}, max_members=10)
+
+
+def test_members_respect_parallelism_and_aggregate(session_factory):
+    service = JobService(session_factory)
+    parent = service.create(
+        JobCreate(type="ENSEMBLE", parameters={
+            "model": "SUMMA",
+            "decision_options": {"a": [1, 2], "b": ["x", "y"]},
+            "parallelism": 2,
+        }),
+        owner="alice",
+    )
+    assert parent.status == JOB_RUNNING
+    with pytest.raises(ValidationError):
+        service.create(JobCreate(type="ENSEMBLE", parameters={"decision_options": {"a": [1]}, "parallelism": "two"}))
+    members = service.members(parent.id)
+    assert len(members) == 4 and all(m.status == JOB_PENDING for m in members)
+
+    first, second = service.claim_next("w1"), service.claim_next("w2")
+    assert service.claim_next("w3") is None  # capped at two running members
+
+    _set_status(session_factory, first, JOB_COMPLETED)
+    service.finalize(first)
+    third = service.claim_next("w3")
+    assert third is not None
+
+    _set_status(session_factory, second, JOB_FAILED)
+    service.finalize(second)
+    assert service.get(parent.id).status == JOB_RUNNING
+
+    _set_status(session_factory, third, JOB_COMPLETED)
+    service.finalize(third)
+    last = service.claim_next("w1")
+    service.cancel(last)
+
+    done = service.get(parent.id)
+    assert done.status == JOB_COMPLETED
+    assert done.result["status_counts"] == {JOB_COMPLETED: 2, JOB_FAILED: 1, JOB_CANCELLED: 1}
+    assert [r["member_index"] for r in done.result["results"]] == [0, 1, 2, 3]
+
+
+def test_stalled_members_finish_the_ensemble(session_factory):
+    service = JobService(session_factory)
+    parent = service.create(JobCreate(type="ENSEMBLE", parameters={"decision_options": {"a": [1, 2]}}))
+    first, second = service.claim_next("w1", lease_seconds=60), service.claim_next("w2", lease_seconds=60)
+    _set_status(session_factory, first, JOB_COMPLETED)
+    service.finalize(first)
+
+    later = service.get(second).lease_expires_at + datetime.timedelta(seconds=1)
+    assert service.reclaim_expired(max_attempts=1, now=later) == {"requeued": 0, "stalled": 1}
+
+    done = service.get(parent.id)
+    assert done.status == JOB_COMPLETED
+    assert done.result["status_counts"] == {JOB_COMPLETED: 1, JOB_STALLED: 1}
+
+
+def test_cancelling_parent_cancels_members(session_factory):
+    service = JobService(session_factory)
+    parent = service.create(JobCreate(type="ENSEMBLE", parameters={"decision_options": {"a": [1, 2, 3]}}))
+    service.cancel(parent.id)
+
+    assert {m.status for m in service.members(parent.id)} == {JOB_CANCELLED}
+    assert service.claim_next("w1") is None
@@ -0,0 +1,81 @@
+import os
+from contextlib import contextmanager
+
+import numpy as np
+import pytest
+
+from modules.forcing_cache import ForcingCache
+
+TIMES = np.datetime64("2012-10-01T00") + np.arange(100).astype("timedelta64[h]")
+PRECIP = np.arange(100 * 6 * 5, dtype=np.float64).reshape(100, 6, 5)
+
+
+def _loader(calls):
+    @contextmanager
+    def load(files, time_chunk):
+        calls.append([f.name for f in files])
+        coords = {"time": TIMES, "lat": np.linspace(50, 52, 6), "lon": np.linspace(-117, -115, 5)}
+        yield coords, {"pptrate": (["time", "lat", "lon"], PRECIP)}
+    return load
+
+
+@pytest.fixture
+def source(tmp_path):
+    forcing = tmp_path / "domain_Bow" / "forcing"
+    forcing.mkdir(parents=True)
+    (forcing / "ERA5_2012.nc").write_bytes(b"x")
+    return forcing
+
+
+def test_converts_once_and_reads_across_chunks(tmp_path, source):
+    calls = []
+    cache = ForcingCache(str(tmp_path / "cache"), time_chunk=24, space_chunk=4, loader=_loader(calls))
+
+    with cache.get("Bow", source) as first:
+        meta = first.variable("pptrate")
+        assert meta["chunks"] == [24, 4, 4] and meta["dtype"] == "<f4"
+        window = first.read("pptrate", [slice(20, 50), slice(3, 6), slice(1, 5)])
+        np.testing.assert_array_equal(window, PRECIP[20:50, 3:6, 1:5].astype(np.float32))
+        assert isinstance(first.chunk("pptrate", (0, 0, 0)), np.memmap)
+        np.testing.assert_array_equal(first.coord("time"), TIMES)
+
+    with cache.get("Bow", source) as second:
+        assert second.path == first.path
+    assert len(calls) == 1
+
+
+def test_changed_sources_rebuild_and_prune(tmp_path, source):
+    calls = []
+    cache = ForcingCache(str(tmp_path / "cache"), time_chunk=50, loader=_loader(calls))
+    old = cache.get("Bow", source)
+
+    (source / "ERA5_2013.nc").write_bytes(b"y")
+    with cache.get("Bow", source) as new:
+        assert new.fingerprint != old.fingerprint
+        # The old entry is still open, so it survives this round of pruning.
+        assert old.path.exists()
+
+    old.close()
+    os.utime(source / "ERA5_2013.nc", ns=(1, 1))
+    with cache.get("Bow", source):
+        pass
+    assert not old.path.exists()
+    assert len(calls) == 3
+    assert len(cache.stats()["domains"]["Bow"]) == 1
+
+
+def test_sources_are_closed_after_a_failed_build(tmp_path, source):
+    closed = []
+
+    @contextmanager
+    def load(files, time_chunk):
+        try:
+            yield {"time": TIMES}, {"pptrate": (["time"], None)}
+        finally:
+            closed.append(time_chunk)
+
+    cache = ForcingCache(str(tmp_path / "cache"), time_chunk=24, loader=load)
+    with pytest.raises(AttributeError):
+        cache.get("Bow", source)
+    assert closed == [24]
+    assert not list((tmp_path / "cache" / "Bow").iterdir())
@@ -0,0 +1,97 @@
+from contextlib import contextmanager
+
+import numpy as np
+import pytest
+
+from modules.forcing_cache import ForcingCache
+from modules.forcing_subset import (
+    SUBSET_FILE, BoundingBox, axis_range, plan_subset, read_subset, subset_coords, subset_forcing, subset_shape,
+)
+from utils.error_handlers import ValidationError
+
+TIMES = np.datetime64("2011-01-01T00") + np.arange(240).astype("timedelta64[h]")
+LAT = np.linspace(60.0, 45.0, 16)      # descending, as in ERA5
+LON = np.linspace(240.0, 250.0, 11)    # 0..360 convention
+GRID = np.random.default_rng(0).random((240, 16, 11))
+HRU_LAT = np.array([51.2, 40.0, 51.5, 55.0, 51.0])
+HRU_LON = np.array([-116.0, -116.0, -115.8, -100.0, -116.4])
+HRU = np.arange(240 * 5, dtype=np.float64).reshape(240, 5)
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    source = tmp_path / "forcing"
+    source.mkdir()
+    (source / "grid.nc").write_bytes(b"x")
+
+    @contextmanager
+    def load(files, time_chunk):
+        coords = {"time": TIMES, "lat": LAT, "lon": LON, "hru": np.arange(5),
+                  "latitude": HRU_LAT, "longitude": HRU_LON}
+        yield coords, {"airtemp": (["time", "lat", "lon"], GRID), "pptrate": (["time", "hru"], HRU)}
+
+    cache = ForcingCache(str(tmp_path / "cache"), time_chunk=24, space_chunk=4, loader=load)
+    with cache.get("Bow", source) as ds:
+        yield ds
+
+
+def test_axis_range_handles_descending_coordinates():
+    assert axis_range(np.array([1.0, 2.0, 3.0, 4.0]), 1.5, 3.0) == slice(1, 3)
+    assert axis_range(np.array([4.0, 3.0, 2.0, 1.0]), 1.5, 3.0) == slice(1, 3)
+    with pytest.raises(ValidationError):
+        BoundingBox.parse("50/-115/52/-116")
+
+
+def _expected(t_sel):
+    lat_sel = (LAT >= 50.95) & (LAT <= 51.76)
+    lon_sel = (LON >= 243.45) & (LON <= 244.5)
+    return GRID[t_sel][:, lat_sel][:, :, lon_sel].astype(np.float32), HRU[t_sel][:, [0, 2, 4]]
+
+
+def test_subset_reads_only_overlapping_chunks(dataset, monkeypatch):
+    bbox = BoundingBox.parse("51.76/-116.55/50.95/-115.5")
+    plans = plan_subset(dataset, bbox, "2011-01-03 01:00", "2011-01-04 12:00")
+    t_sel = (TIMES >= np.datetime64("2011-01-03T01")) & (TIMES <= np.datetime64("2011-01-04T12"))
+    grid, hru = _expected(t_sel)
+    reads = []
+    chunk = dataset.chunk
+    monkeypatch.setattr(dataset, "chunk", lambda name, index: reads.append((name, index)) or chunk(name, index))
+
+    airtemp = np.concatenate([block for _, block in read_subset(dataset, "airtemp", plans["airtemp"])])
+    np.testing.assert_array_equal(airtemp, grid)
+    assert subset_shape(dataset.variable("airtemp"), plans["airtemp"]) == list(grid.shape)
+    # 36 hours starting at hour 49 overlap time chunks 2 and 3 of 10; the box one spatial chunk per axis.
+    assert len(reads) == 2 and len(set(reads)) == 2
+
+    # HRUs 0, 2 and 4 lie inside the box; only their enclosing range is read.
+    pptrate = np.concatenate([block for _, block in read_subset(dataset, "pptrate", plans["pptrate"])])
+    np.testing.assert_array_equal(pptrate, hru)
+    assert len(reads) == 2 + 2 * 2
+    coords = subset_coords(dataset, plans)
+    assert coords["latitude"][0] == "hru"
+    np.testing.assert_array_equal(coords["latitude"][1], HRU_LAT[[0, 2, 4]])
+    np.testing.assert_array_equal(coords["hru"][1], [0, 2, 4])
+    np.testing.assert_array_equal(coords["time"][1], TIMES[t_sel])
+
+
+def test_empty_window(dataset):
+    plans = plan_subset(dataset, BoundingBox(10, 0, 5, 1), None, None)
+    assert subset_shape(dataset.variable("airtemp"), plans["airtemp"])[1] == 0
+    assert subset_shape(dataset.variable("pptrate"), plans["pptrate"]) == [240, 0]
+
+
+def test_subset_is_written_as_netcdf(dataset, tmp_path):
+    netCDF4 = pytest.importorskip("netCDF4")
+    summary = subset_forcing(
+        dataset, BoundingBox.parse("51.76/-116.55/50.95/-115.5"), "2011-01-03 01:00", "2011-01-04 12:00", tmp_path
+    )
+    t_sel = (TIMES >= np.datetime64("2011-01-03T01")) & (TIMES <= np.datetime64("2011-01-04T12"))
+    grid, hru = _expected(t_sel)
+
+    assert summary["file"] == SUBSET_FILE
+    with netCDF4.Dataset(tmp_path / SUBSET_FILE) as nc:
+        np.testing.assert_array_equal(nc["airtemp"][:], grid)
+        np.testing.assert_array_equal(nc["pptrate"][:], hru)
+        assert nc["latitude"].dimensions == ("hru",)
+        times = netCDF4.num2date(nc["time"][:], nc["time"].units, only_use_cftime_datetimes=False)
+        assert np.datetime64(times[0]) == TIMES[t_sel][0]
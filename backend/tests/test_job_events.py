@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from api.models import Job as DBJob
+from api.services.job_events import JobEventBroker
+from utils.db import create_db_engine, init_db
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    init_db(engine)
+    yield sessionmaker(bind=engine, expire_on_commit=False)
+    engine.dispose()
+
+
+def _write(session_factory, job_id, **values):
+    with session_factory() as db:
+        db.query(DBJob).filter(DBJob.id == job_id).update(values)
+        db.commit()
+
+
+async def _collect(agen, count):
+    frames = []
+    async for frame in agen:
+        if not frame.startswith(":"):
+            frames.append(frame)
+        if len(frames) == count:
+            break
+    return frames
+
+
+@pytest.mark.asyncio
+async def test_subscribers_receive_only_new_lines_and_can_resume(session_factory):
+    with session_factory() as db:
+        job = DBJob(type="SIMULATION", status="RUNNING", parameters={}, logs="one\ntwo\npart")
+        db.add(job)
+        db.commit()
+        job_id = job.id
+
+    broker = JobEventBroker(session_factory, poll_interval=0.01)
+    first, second = broker.subscribe(job_id), broker.subscribe(job_id)
+    frames_a, frames_b = await asyncio.gather(_collect(first, 3), _collect(second, 3))
+
+    assert frames_a == frames_b
+    assert 'data: {"line": "one"}' in frames_a[0]
+    assert 'data: {"line": "two"}' in frames_a[1]
+    assert "event: status" in frames_a[2]
+    await first.aclose()
+
+    _write(session_factory, job_id, logs="one\ntwo\npartial done\n", status="COMPLETED")
+    rest = await _collect(second, 3)
+    assert 'data: {"line": "partial done"}' in rest[0]
+    assert '"COMPLETED"' in rest[1]
+    assert rest[2].startswith("id: 6\nevent: end")
+    await second.aclose()
+
+    # Resuming from a cursor replays only what came after it.
+    resumed = await _collect(broker.subscribe(job_id, cursor=4), 10)
+    assert [frame.split("\n")[0] for frame in resumed] == ["id: 5", "id: 6"]
+
+
+@pytest.mark.asyncio
+async def test_abandoned_streams_of_running_jobs_are_pruned(session_factory):
+    with session_factory() as db:
+        jobs = [DBJob(type="SIMULATION", status="RUNNING", parameters={}, logs="") for _ in range(5)]
+        db.add_all(jobs)
+        db.commit()
+        job_ids = [job.id for job in jobs]
+
+    broker = JobEventBroker(session_factory, poll_interval=0.01, max_streams=2)
+    for job_id in job_ids:
+        stream = broker.subscribe(job_id)
+        assert "event: status" in (await _collect(stream, 1))[0]
+        await stream.aclose()
+        assert broker.stats()["streams"] <= 2
+
+    assert broker.stats()["subscribers"] == 0
@@ -0,0 +1,75 @@
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from api.models import Job as DBJob, JOB_CANCELLED
+from modules.modeling import JobCancelledError, JobLogger
+from utils.db import create_db_engine, init_db
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def db_and_job(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    init_db(engine)
+    statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    db = sessionmaker(bind=engine, expire_on_commit=False)()
+    job = DBJob(type="SIMULATION", parameters={}, logs="")
+    db.add(job)
+    db.commit()
+    statements.clear()
+    yield db, job, statements
+    db.close()
+    engine.dispose()
+
+
+def _updates(statements):
+    return [s for s in statements if s.startswith("UPDATE jobs")]
+
+
+def test_lines_are_flushed_in_batches(db_and_job):
+    db, job, statements = db_and_job
+    clock = FakeClock()
+    with JobLogger(db, job, flush_lines=5, flush_interval=60, cancel_check_interval=60, clock=clock) as log:
+        for i in range(12):
+            log.append(f"line {i}")
+        assert len(_updates(statements)) == 2
+    # The remainder is flushed on exit.
+    assert len(_updates(statements)) == 3
+
+    db.expire_all()
+    assert db.get(DBJob, job.id).logs.splitlines() == [f"line {i}" for i in range(12)]
+
+
+def test_time_threshold_and_periodic_cancellation(db_and_job):
+    db, job, statements = db_and_job
+    clock = FakeClock()
+    log = JobLogger(db, job, flush_lines=100, flush_interval=1.0, cancel_check_interval=5.0, clock=clock)
+
+    log.append("first")
+    assert _updates(statements) == []
+    clock.now = 1.5
+    log.append("second")
+    assert len(_updates(statements)) == 1
+
+    db.query(DBJob).filter(DBJob.id == job.id).update({"status": JOB_CANCELLED})
+    db.commit()
+    clock.now = 3.0
+    log.append("not checked yet")
+    clock.now = 6.0
+    with pytest.raises(JobCancelledError):
+        log.append("checked now")
+    with pytest.raises(JobCancelledError):
+        log.append("after cancel")
@@ -0,0 +1,65 @@
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from api.schemas import JobCreate
+from api.services.job_service import JobService
+from modules.job_metrics import aggregate, summarize
+from modules.job_runner import IsolatedJobRunner
+from utils.db import create_db_engine, init_db
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    init_db(engine)
+    yield sessionmaker(bind=engine, expire_on_commit=False)
+    engine.dispose()
+
+
+def _phase(name, at, **usage):
+    return {"type": "phase", "phase": name, "time": at, "usage": usage}
+
+
+def test_phase_durations_run_until_the_next_phase():
+    messages = [
+        _phase("started", 100.0, peak_rss_mb=50.0),
+        _phase("config_render", 100.5),
+        {"type": "progress", "phase": "config_render", "time": 101.0},
+        _phase("setup_project", 102.0),
+        _phase("finished", 110.0, peak_rss_mb=300.0, cpu_user_seconds=7.5),
+    ]
+    metrics = summarize(messages, started_at=99.0, ended_at=110.2)
+
+    assert metrics["phases"] == {"startup": 1.0, "started": 0.5, "config_render": 1.5, "setup_project": 8.0}
+    assert metrics["wall_seconds"] == 11.2
+    assert metrics["completed"] is True
+    assert (metrics["peak_rss_mb"], metrics["cpu_user_seconds"]) == (300.0, 7.5)
+
+    killed = summarize(messages[:4], started_at=99.0, ended_at=150.0)
+    assert killed["phases"]["setup_project"] == 48.0 and killed["completed"] is False
+
+
+def test_runner_reports_resources_and_profile():
+    outcome = IsolatedJobRunner().run("test_job_runner:reporting_job", 1, profile=True)
+    metrics = outcome.metrics
+
+    assert set(metrics["phases"]) == {"startup", "started", "simulate"}
+    assert metrics["exit_code"] == 0 and metrics["peak_rss_mb"] > 0
+    assert "cpu_user_seconds" in metrics and "io_write_bytes" in metrics
+    assert any("reporting_job" in row["function"] for row in metrics["profile"])
+
+
+def test_metrics_are_stored_and_aggregated(session_factory):
+    service = JobService(session_factory)
+    walls = [10.0, 20.0, 30.0, 40.0]
+    for wall in walls:
+        job = service.create(JobCreate(parameters={"model": "SUMMA"}))
+        service.claim_next("w0")
+        service.finalize(job.id, metrics={"wall_seconds": wall, "peak_rss_mb": wall * 10, "phases": {"setup_project": wall / 2}})
+
+    assert service.get(job.id).metrics["wall_seconds"] == 40.0
+    summary = service.metrics_summary()["types"]["SIMULATION"]
+    assert summary["jobs"] == 4
+    assert summary["wall_seconds"] == {"mean": 25.0, "p50": 20.0, "p95": 40.0, "max": 40.0}
+    assert summary["phases"]["setup_project"]["max"] == 20.0
+    assert aggregate([{"type": "SIMULATION", "metrics": None}]) == {}
@@ -0,0 +1,92 @@
+import os
+import signal
+import subprocess
+import sys
+import time
+
+from modules.job_runner import IsolatedJobRunner, JobProgress, ResourceLimits
+
+
+def reporting_job(job_id, db_session_factory, progress: JobProgress):
+    progress.phase("simulate", steps=3)
+    for step in range(3):
+        progress.update(step=step)
+
+
+def spawning_job(job_id, db_session_factory, progress: JobProgress):
+    child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+    with open(os.path.join(os.environ["DELTA_TEST_JOB_RUNNER_DIR"], "grandchild.pid"), "w") as f:
+        f.write(str(child.pid))
+    progress.phase("model_run")
+    time.sleep(60)
+
+
+def spinning_job(job_id, db_session_factory, progress: JobProgress):
+    progress.phase("spin")
+    while True:
+        pass
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    # A killed grandchild is reparented and may linger as a zombie briefly.
+    with open(f"/proc/{pid}/stat") as f:
+        return f.read().split(")")[-1].split()[0] != "Z"
+
+
+def test_progress_messages_reach_the_parent():
+    received = []
+    outcome = IsolatedJobRunner().run("test_job_runner:reporting_job", 1, received.append)
+
+    assert outcome.exitcode == 0 and outcome.failure_reason is None
+    assert [m["phase"] for m in received if m["type"] == "phase"] == ["started", "simulate", "finished"]
+    assert [m["step"] for m in received if m["type"] == "progress"] == [0, 1, 2]
+
+
+def test_preloaded_runner_starts_jobs_warm():
+    cold = IsolatedJobRunner().run("test_job_runner:reporting_job", 1)
+    warm_runner = IsolatedJobRunner(preload=["test_job_runner"])
+    warm_runner.warm_up()
+    warm = warm_runner.run("test_job_runner:reporting_job", 1)
+
+    assert warm_runner.preloaded
+    assert (cold.warm, warm.warm) == (False, True)
+    assert warm.exitcode == 0 and warm.last_phase == "finished"
+
+
+def test_cancellation_kills_the_whole_process_group(tmp_path, monkeypatch):
+    monkeypatch.setenv("DELTA_TEST_JOB_RUNNER_DIR", str(tmp_path))
+    pid_file = tmp_path / "grandchild.pid"
+    runner = IsolatedJobRunner(is_cancelled=lambda job_id: pid_file.exists(), cancel_poll_interval=0.1)
+
+    started = time.monotonic()
+    outcome = runner.run("test_job_runner:spawning_job", 2)
+
+    assert outcome.cancelled and outcome.exitcode == -signal.SIGKILL
+    assert outcome.failure_reason is None
+    assert time.monotonic() - started < 30
+    deadline = time.monotonic() + 5
+    grandchild = int(pid_file.read_text())
+    while _alive(grandchild) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not _alive(grandchild)
+
+
+def test_cpu_limit_stops_runaway_jobs():
+    outcome = IsolatedJobRunner(ResourceLimits(cpu_seconds=1)).run("test_job_runner:spinning_job", 3)
+
+    assert outcome.exitcode == -signal.SIGXCPU
+    assert outcome.last_phase == "spin"
+    assert "CPU time limit during spin" in outcome.failure_reason
+
+
+def test_shutdown_preempts_running_jobs(tmp_path, monkeypatch):
+    monkeypatch.setenv("DELTA_TEST_JOB_RUNNER_DIR", str(tmp_path))
+    pid_file = tmp_path / "grandchild.pid"
+    outcome = IsolatedJobRunner(should_stop=pid_file.exists).run("test_job_runner:spawning_job", 4)
+
+    assert outcome.preempted and not outcome.cancelled
+    assert outcome.failure_reason is None
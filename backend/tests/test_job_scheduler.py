@@ -0,0 +1,40 @@
+from modules.job_scheduler import FairShareScheduler, QueuedJob, RunningJob
+
+
+def test_heavy_users_do_not_block_others():
+    batch = [QueuedJob(i, "alice", "bulk", parent_id=100) for i in range(1, 6)]
+    quick = QueuedJob(6, "bob", "standard")
+    plan = FairShareScheduler().plan(batch + [quick], [], slots=1, durations={"SIMULATION": 10.0}, now=0.0)
+
+    assert plan[6] == (1, 0.0)
+    assert [plan[i][0] for i in range(1, 6)] == [2, 3, 4, 5, 6]
+    assert plan[5][1] == 50.0
+
+
+def test_weighted_round_robin_and_caps():
+    pending = [QueuedJob(i, "alice", "standard") for i in range(1, 5)]
+    pending += [QueuedJob(i, "bob", "standard") for i in range(5, 9)]
+    weighted = FairShareScheduler({"alice": 2.0}).plan(pending, [], slots=6, durations={}, now=0.0)
+    first_six = sorted(pending, key=lambda job: weighted[job.id][0])[:6]
+    assert [job.owner for job in first_six].count("alice") == 4
+
+    capped = FairShareScheduler(max_running_per_user=1).plan(
+        pending, [RunningJob("alice", 30.0)], slots=4, durations={"SIMULATION": 60.0}, now=0.0
+    )
+    assert capped[1][1] == 30.0 and capped[5][1] == 0.0
+
+
+def test_ensemble_parallelism_delays_members():
+    members = [QueuedJob(i, "alice", "bulk", parent_id=9) for i in range(1, 4)]
+    plan = FairShareScheduler().plan(
+        members, [RunningJob("alice", 5.0, parent_id=9)], slots=4, durations={"SIMULATION": 10.0},
+        parent_caps={9: 2}, now=0.0,
+    )
+    assert [plan[i][1] for i in range(1, 4)] == [0.0, 5.0, 10.0]
+
+
+def test_no_workers_still_orders_the_queue():
+    plan = FairShareScheduler().plan(
+        [QueuedJob(1, "alice", "bulk"), QueuedJob(2, "bob", "interactive")], [], slots=0, durations={}
+    )
+    assert plan == {2: (1, None), 1: (2, None)}
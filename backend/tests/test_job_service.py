@@ -0,0 +1,220 @@
+import dataclasses
+import datetime
+
+import pydantic
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from api.models import Job as DBJob, JOB_CANCELLED, JOB_COMPLETED, JOB_FAILED, JOB_PENDING, JOB_RUNNING, JOB_STALLED
+from api.schemas import JobCreate
+from api.services.job_service import JobService
+from api.services.worker_registry import WorkerRegistry
+from modules.calibration import DDS, CalibrationCheckpoint, checkpoint_path
+from modules.job_dedup import input_data_version, job_content_hash
+from modules.job_scheduler import FairShareScheduler
+from utils.config import get_settings
+from utils.db import create_db_engine, init_db
+from utils.error_handlers import NotFoundError, ValidationError
+
+
+@pytest.fixture
+def job_service(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    init_db(engine)
+    yield JobService(sessionmaker(bind=engine, expire_on_commit=False))
+    engine.dispose()
+
+
+def test_jobs_are_claimed_once_in_fifo_order(job_service):
+    first = job_service.create(JobCreate(parameters={"model": "SUMMA"}), owner="alice")
+    second = job_service.create(JobCreate(parameters={"model": "FUSE"}), owner="bob")
+
+    assert job_service.claim_next("w1") == first.id
+    assert job_service.claim_next("w2") == second.id
+    assert job_service.claim_next("w3") is None
+
+    claimed = job_service.get(first.id)
+    assert claimed.status == JOB_RUNNING
+    assert claimed.worker_id == "w1"
+    assert claimed.attempts == 1
+    assert [j.id for j in job_service.list_pending()] == [first.id, second.id]
+
+
+def test_finalize_fails_jobs_left_running(job_service):
+    other = job_service.create(JobCreate(), owner="alice")
+    job_service.claim_next("w1")
+    job_service.finalize(other.id)
+    finished = job_service.get(other.id)
+    assert finished.status == JOB_FAILED
+    assert finished.finished_at is not None
+
+
+def test_expired_leases_are_reclaimed_until_out_of_attempts(job_service):
+    job = job_service.create(JobCreate(), owner="alice")
+    job_service.claim_next("w1", lease_seconds=60)
+
+    assert job_service.requeue(job.id, "Worker shut down.", worker_id="w1")
+    assert not job_service.requeue(job.id, "Worker shut down.")
+    assert job_service.claim_next("w2", lease_seconds=60) == job.id
+
+    later = job_service.get(job.id).lease_expires_at + datetime.timedelta(seconds=1)
+    assert job_service.reclaim_expired(max_attempts=3) == {"requeued": 0, "stalled": 0}
+    assert job_service.reclaim_expired(max_attempts=3, now=later) == {"requeued": 1, "stalled": 0}
+    assert not job_service.heartbeat(job.id, "w2")
+
+    assert job_service.claim_next("w3", lease_seconds=60) == job.id
+    assert job_service.heartbeat(job.id, "w3", lease_seconds=600)
+    assert job_service.reclaim_expired(max_attempts=3, now=later) == {"requeued": 0, "stalled": 0}
+    far_later = job_service.get(job.id).lease_expires_at + datetime.timedelta(seconds=1)
+    job_service.finalize(job.id, "too late", worker_id="w2")
+    assert job_service.get(job.id).status == JOB_RUNNING
+    assert job_service.reclaim_expired(max_attempts=3, now=far_later) == {"requeued": 0, "stalled": 1}
+
+    stalled = job_service.get(job.id)
+    assert (stalled.status, stalled.attempts) == (JOB_STALLED, 3)
+    assert stalled.finished_at == far_later
+    assert "resuming from the last checkpoint" in stalled.logs
+    assert "job stalled" in stalled.logs
+    with pytest.raises(ValidationError):
+        job_service.cancel(job.id)
+
+
+def test_claims_follow_priority_and_fair_share(job_service, monkeypatch):
+    monkeypatch.setattr(job_service, "scheduler", lambda: FairShareScheduler(max_running_per_user=2))
+    bulk = [job_service.create(JobCreate(priority="bulk"), owner="alice").id for _ in range(3)]
+    alice = [job_service.create(JobCreate(), owner="alice").id for _ in range(3)]
+    bob = job_service.create(JobCreate(), owner="bob").id
+    urgent = job_service.create(JobCreate(priority="interactive"), owner="carol").id
+    with pytest.raises(ValidationError):
+        job_service.create(JobCreate(priority="urgent"), owner="carol")
+
+    claims = [job_service.claim_next(f"w{i}") for i in range(5)]
+    assert claims == [urgent, alice[0], bob, alice[1], None]
+
+    queue = job_service.queue_status()
+    assert [j.id for j in queue[:4]] == claims[:4]
+    assert [(j.id, j.queue_position) for j in queue[4:]] == [(alice[2], 1), (bulk[0], 2), (bulk[1], 3), (bulk[2], 4)]
+    assert all(j.estimated_start is None for j in queue)
+
+
+def test_workers_only_claim_jobs_they_can_run(job_service):
+    calibration = job_service.create(JobCreate(type="CALIBRATION", parameters={"watershed": "Bow"}), owner="a")
+    elbow = job_service.create(JobCreate(parameters={"watershed": "Elbow"}), owner="a")
+    bow = job_service.create(JobCreate(parameters={"watershed": "Bow"}), owner="a")
+
+    bow_simulations = {"domains": ["Bow"], "job_types": ["SIMULATION"]}
+    assert job_service.claim_next("w1", bow_simulations) == bow.id
+    assert job_service.claim_next("w1", bow_simulations) is None
+    assert job_service.claim_next("w2", {"domains": ["Bow"]}) == calibration.id
+    assert job_service.claim_next("w3", {"cores": 4}) == elbow.id
+
+
+def test_worker_registry_tracks_heartbeats(job_service):
+    registry = WorkerRegistry(job_service.session_factory)
+    registry.register("node1-w0.0", "node1", 123, {"cores": 8, "domains": None, "job_types": None})
+    registry.heartbeat("node1-w0.0", current_job_id=7, jobs_run=1)
+    registry.register("node2-w0.0", "node2", 456, {"cores": 4, "domains": ["Bow"], "job_types": None})
+    registry.deregister("node2-w0.0")
+
+    [worker] = registry.list_workers()
+    assert (worker["hostname"], worker["alive"], worker["current_job_id"], worker["jobs_run"]) == ("node1", True, 7, 1)
+    stopped = registry.list_workers(include_stopped=True)[1]
+    assert (stopped["status"], stopped["alive"]) == ("STOPPED", False)
+
+
+def test_cancel(job_service):
+    job = job_service.create(JobCreate(), owner="alice")
+    assert job_service.get(job.id).status == JOB_PENDING
+    assert job_service.cancel(job.id).status == JOB_CANCELLED
+    with pytest.raises(ValidationError):
+        job_service.cancel(job.id)
+    with pytest.raises(NotFoundError):
+        job_service.get(9999)
+
+
+def test_cancel_and_stall_remove_calibration_checkpoints(job_service, tmp_path, monkeypatch):
+    settings = dataclasses.replace(get_settings(), calibration_checkpoint_dir=str(tmp_path / "ckpt"))
+    monkeypatch.setattr("api.services.job_service.get_settings", lambda: settings)
+    cancelled = job_service.create(JobCreate(type="CALIBRATION"), owner="alice")
+    stalled = job_service.create(JobCreate(type="CALIBRATION"), owner="alice")
+    for job in (cancelled, stalled):
+        CalibrationCheckpoint(checkpoint_path(settings.calibration_checkpoint_dir, job.id)).save(DDS({"k": (0, 1)}, 4))
+
+    job_service.cancel(cancelled.id)
+    job_service.claim_next("w1", lease_seconds=60)
+    later = job_service.get(stalled.id).lease_expires_at + datetime.timedelta(seconds=1)
+    assert job_service.reclaim_expired(max_attempts=1, now=later) == {"requeued": 0, "stalled": 1}
+    assert list((tmp_path / "ckpt").iterdir()) == []
+
+
+def test_unknown_job_types_are_rejected():
+    with pytest.raises(pydantic.ValidationError):
+        JobCreate(type="CALIBRATON")
+
+
+def test_calibration_submissions_are_validated(job_service, monkeypatch):
+    settings = dataclasses.replace(get_settings(), calibration_max_evaluations=100)
+    monkeypatch.setattr("api.services.job_service.get_settings", lambda: settings)
+    bounds = {"k": [0.0, 1.0]}
+
+    for parameters in (
+        {"objective": "synthetic_reservoir_typo", "param_bounds": bounds},
+        {"param_bounds": {"k": [1.0, 0.0]}},
+        {"param_bounds": bounds, "max_evaluations": 101},
+        {"param_bounds": bounds, "max_evaluations": "many"},
+    ):
+        with pytest.raises(ValidationError):
+            job_service.create(JobCreate(type="CALIBRATION", parameters=parameters))
+    assert job_service.list_pending() == []
+    job = job_service.create(JobCreate(type="CALIBRATION", parameters={"param_bounds": bounds, "max_evaluations": 100}))
+    assert job.status == JOB_PENDING
+
+
+def test_jobs_are_only_visible_to_their_owner(job_service):
+    job = job_service.create(JobCreate(), owner="alice")
+    job_service.create(JobCreate(), owner="bob")
+
+    assert job_service.get(job.id, owner="alice").id == job.id
+    with pytest.raises(NotFoundError):
+        job_service.get(job.id, owner="bob")
+    with pytest.raises(NotFoundError):
+        job_service.cancel(job.id, owner="bob")
+    assert job_service.get(job.id).status == JOB_PENDING
+    assert [j.owner for j in job_service.queue_status(owner="bob")] == ["bob"]
+    assert len(job_service.queue_status()) == 2
+
+
+def test_identical_submissions_reuse_the_job(job_service):
+    params = {"model": "SUMMA", "watershed": "Bow_at_Banff_lumped"}
+    first, reused = job_service.submit(JobCreate(parameters=params), owner="alice")
+    assert not reused and first.content_hash
+
+    queued, reused = job_service.submit(JobCreate(parameters=dict(reversed(list(params.items())))), owner="alice")
+    assert reused and queued.id == first.id
+    bobs, reused = job_service.submit(JobCreate(parameters=params), owner="bob")
+    assert not reused and bobs.id != first.id and bobs.owner == "bob"
+
+    job_service.claim_next("w1")
+    with job_service.session_factory() as db:
+        job = db.get(DBJob, first.id)
+        job.status, job.result = JOB_COMPLETED, {"project_dir": "/tmp/x"}
+        db.commit()
+    done, reused = job_service.submit(JobCreate(parameters={**params, "profile": True}), owner="alice")
+    assert reused and done.result == {"project_dir": "/tmp/x"}
+
+    forced, reused = job_service.submit(JobCreate(parameters=params, force=True), owner="alice")
+    other, _ = job_service.submit(JobCreate(parameters={**params, "model": "FUSE"}), owner="alice")
+    assert not reused and len({first.id, forced.id, other.id}) == 3
+
+
+def test_content_hash_tracks_input_versions(tmp_path):
+    forcing = tmp_path / "domain_Bow" / "forcing"
+    forcing.mkdir(parents=True)
+    (forcing / "ERA5_2012.nc").write_bytes(b"x")
+    version = input_data_version(str(tmp_path), "Bow")
+
+    assert version is not None and input_data_version(str(tmp_path), "Elbow") is None
+    base = job_content_hash("SIMULATION", {"model": "SUMMA"}, "t1", version)
+    assert base == job_content_hash("SIMULATION", {"model": "SUMMA", "member_index": 3}, "t1", version)
+    assert base != job_content_hash("SIMULATION", {"model": "SUMMA"}, "t2", version)
+    assert base != job_content_hash("SIMULATION", {"model": "SUMMA"}, "t1", "other-data")
@@ -0,0 +1,65 @@
+import time
+
+from api.services.llm_service import LLMService
+from modules.educational import EducationalModule
+from modules.knowledge_base import BUNDLED_KNOWLEDGE_DIR, KnowledgeBase
+
+
+def _bundled() -> KnowledgeBase:
+    knowledge_base = KnowledgeBase()
+    knowledge_base.load_directory(BUNDLED_KNOWLEDGE_DIR, "delta")
+    return knowledge_base
+
+
+def test_bm25_ranks_the_relevant_document_first():
+    knowledge_base = _bundled()
+
+    assert knowledge_base.search("how do aquifers get recharged")[0].passage.doc_id == "delta/groundwater"
+    assert knowledge_base.search("Nash-Sutcliffe efficiency")[0].passage.doc_id == "delta/model_calibration"
+    assert knowledge_base.search("quantum chromodynamics") == []
+
+    started = time.perf_counter()
+    for _ in range(100):
+        knowledge_base.search("snowmelt timing in a warming climate")
+    assert (time.perf_counter() - started) / 100 < 0.005
+
+
+def test_documents_update_incrementally(tmp_path):
+    knowledge_base = KnowledgeBase()
+    (tmp_path / "karst.md").write_text("# Karst\n\nSinkholes drain karst aquifers quickly.")
+    assert knowledge_base.load_directory(tmp_path, "local") == {"updated": 1, "removed": 0}
+    assert knowledge_base.load_directory(tmp_path, "local") == {"updated": 0, "removed": 0}
+
+    knowledge_base.add_document("notes/permafrost", "Permafrost", "Frozen ground limits infiltration.")
+    assert knowledge_base.search("permafrost")[0].passage.doc_id == "notes/permafrost"
+    assert knowledge_base.search("sinkholes")[0].passage.title == "Karst"
+
+    (tmp_path / "karst.md").unlink()
+    assert knowledge_base.refresh() == {"updated": 0, "removed": 1}
+    assert knowledge_base.search("sinkholes") == []
+    assert knowledge_base.remove_document("notes/permafrost")
+    assert knowledge_base.stats() == {"documents": 0, "passages": 0, "terms": 0}
+
+
+def test_educational_answers_and_grounding():
+    module = EducationalModule(_bundled())
+
+    assert module.get_educational_content("Watershed").startswith("Watersheds and drainage basins")
+    assert module.get_educational_content("volcanoes").startswith("Sorry")
+    assert module.answer_command("/learn groundwater recharge").startswith("**Groundwater hydrology**")
+    assert module.answer_command("/learn groundwater politics") is None
+    assert module.answer_command("What is a watershed?") is None
+
+    grounding = module.grounding("evapotranspiration Penman-Monteith")
+    assert "[1] Evapotranspiration:" in grounding
+
+
+def test_educational_prompts_are_grounded(monkeypatch):
+    import modules.educational as educational
+
+    monkeypatch.setattr(educational, "_MODULE", EducationalModule(_bundled()))
+    service = LLMService()
+
+    assert "Reference Material" in service.system_prompt("What controls baseflow?", role="EDUCATIONAL")
+    assert "Reference Material" in service.system_prompt("/explain baseflow")
+    assert "Reference Material" not in service.system_prompt("Run SUMMA for the Bow")
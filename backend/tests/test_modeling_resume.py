@@ -0,0 +1,120 @@
+import dataclasses
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.orm import sessionmaker
+
+from api.models import Job as DBJob, JOB_CANCELLED, JOB_COMPLETED, JOB_FAILED, JOB_PENDING
+from modules import modeling
+from modules.modeling import CHECKPOINT_FILE, ModelingModule, WorkspaceManager, job_workspace_path
+from utils.config import get_settings
+from utils.db import create_db_engine, init_db
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    init_db(engine)
+    yield sessionmaker(bind=engine, expire_on_commit=False)
+    engine.dispose()
+
+
+def test_interrupted_job_resumes_after_project_setup(tmp_path, session_factory, monkeypatch):
+    settings = dataclasses.replace(
+        get_settings(),
+        job_workspace_dir=str(tmp_path / "workspaces"),
+        workspace_cache_dir="",
+        symfluence_data_dir=None,
+        symfluence_code_dir=str(tmp_path / "missing"),
+    )
+    setups = []
+    monkeypatch.setattr(ModelingModule, "_setup_project", lambda self, root, *args: setups.append(root))
+    monkeypatch.setattr(modeling, "get_forcing_cache", lambda: None)
+    monkeypatch.setattr(modeling, "get_result_store", lambda: None)
+
+    # First attempt dies after project setup without cleaning up, like a killed process.
+    original_exit = WorkspaceManager.__exit__
+    monkeypatch.setattr(WorkspaceManager, "__exit__", lambda self, *exc: False)
+    monkeypatch.setattr(WorkspaceManager, "attach_forcing", lambda *args, **kwargs: 1 / 0)
+
+    with session_factory() as db:
+        job = DBJob(parameters={"model": "SUMMA"}, status=JOB_PENDING)
+        db.add(job)
+        db.commit()
+        ModelingModule(settings).execute(job.id, db)
+        assert db.get(DBJob, job.id).status == JOB_FAILED
+
+    workspace = job_workspace_path(settings.job_workspace_dir, job.id)
+    assert (workspace / CHECKPOINT_FILE).exists() and len(setups) == 1
+
+    monkeypatch.setattr(WorkspaceManager, "__exit__", original_exit)
+    monkeypatch.setattr(WorkspaceManager, "attach_forcing", lambda *args, **kwargs: None)
+    with session_factory() as db:
+        db.execute(update(DBJob).where(DBJob.id == job.id).values(status=JOB_PENDING))
+        db.commit()
+        ModelingModule(settings).execute(job.id, db)
+        resumed = db.get(DBJob, job.id)
+
+    assert resumed.status == JOB_COMPLETED
+    assert "Resuming from checkpoint" in resumed.logs
+    assert len(setups) == 1
+    assert not workspace.exists()
+
+
+def test_cancel_during_completion_is_not_overwritten(tmp_path, session_factory, monkeypatch):
+    settings = dataclasses.replace(
+        get_settings(),
+        job_workspace_dir=str(tmp_path / "workspaces"),
+        workspace_cache_dir="",
+        symfluence_data_dir=None,
+        symfluence_code_dir=str(tmp_path / "missing"),
+    )
+    monkeypatch.setattr(ModelingModule, "_setup_project", lambda self, root, *args: None)
+    monkeypatch.setattr(modeling, "get_forcing_cache", lambda: None)
+
+    def cancel_while_storing(self, job_id, *args):
+        with session_factory() as other:
+            other.execute(update(DBJob).where(DBJob.id == job_id).values(status=JOB_CANCELLED))
+            other.commit()
+
+    monkeypatch.setattr(ModelingModule, "_store_outputs", cancel_while_storing)
+    with session_factory() as db:
+        job = DBJob(parameters={"model": "SUMMA"}, status=JOB_PENDING)
+        db.add(job)
+        db.commit()
+        ModelingModule(settings).execute(job.id, db)
+        db.expire_all()
+        cancelled = db.get(DBJob, job.id)
+
+    assert (cancelled.status, cancelled.result) == (JOB_CANCELLED, None)
+
+
+def test_failure_after_cancel_is_logged_without_raising(tmp_path, session_factory, monkeypatch):
+    settings = dataclasses.replace(
+        get_settings(),
+        job_workspace_dir=str(tmp_path / "workspaces"),
+        workspace_cache_dir="",
+        symfluence_data_dir=None,
+        symfluence_code_dir=str(tmp_path / "missing"),
+        job_cancel_check_interval=0.0,
+    )
+    monkeypatch.setattr(ModelingModule, "_setup_project", lambda self, root, *args: None)
+    monkeypatch.setattr(modeling, "get_forcing_cache", lambda: None)
+
+    def cancel_then_fail(self, job_id, *args):
+        with session_factory() as other:
+            other.execute(update(DBJob).where(DBJob.id == job_id).values(status=JOB_CANCELLED))
+            other.commit()
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(ModelingModule, "_store_outputs", cancel_then_fail)
+    with session_factory() as db:
+        job = DBJob(parameters={"model": "SUMMA"}, status=JOB_PENDING)
+        db.add(job)
+        db.commit()
+        ModelingModule(settings).execute(job.id, db)
+        db.expire_all()
+        cancelled = db.get(DBJob, job.id)
+
+    assert cancelled.status == JOB_CANCELLED
+    assert "ERROR: disk full" in cancelled.logs
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from modules.result_store import ResultStore
+from utils.error_handlers import NotFoundError
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ResultStore(tmp_path / "results")
+
+
+def _daily(n):
+    return np.datetime64("2012-10-01") + np.arange(n).astype("timedelta64[D]")
+
+
+def test_query_reads_requested_slices(store):
+    times = _daily(365)
+    flow = np.arange(365 * 3, dtype=np.float32).reshape(365, 3)
+    store.write("job_1", times, {"streamflow": flow, "swe": flow * 2}, hru_ids=[11, 12, 13])
+
+    result_set = store.open("job_1")
+    assert isinstance(result_set.array("streamflow"), np.memmap)
+
+    sliced = result_set.query(["streamflow"], start="2012-10-03", end="2012-10-05", hrus=["13", 11])
+    assert sliced["time"].astype(str).tolist() == ["2012-10-03T00:00:00", "2012-10-04T00:00:00", "2012-10-05T00:00:00"]
+    assert sliced["hru_ids"] == [13, 11]
+    np.testing.assert_array_equal(sliced["values"]["streamflow"], flow[2:5][:, [2, 0]])
+    assert list(sliced["values"]) == ["streamflow"]
+
+    assert result_set.describe()["time_steps"] == 365
+    with pytest.raises(NotFoundError):
+        result_set.query(["runoff"])
+    with pytest.raises(NotFoundError):
+        result_set.query(hrus=[99])
+
+
+def test_unsorted_input_and_one_dimensional_series(store):
+    times = _daily(4)[[2, 0, 3, 1]]
+    store.write("run", times, {"q": [2.0, 0.0, 3.0, 1.0]})
+
+    sliced = store.open("run").query(start="2012-10-02")
+    np.testing.assert_array_equal(sliced["values"]["q"][:, 0], [1.0, 2.0, 3.0])
+    assert sliced["hru_ids"] == [0]
+
+
+def test_missing_run(store):
+    with pytest.raises(NotFoundError):
+        store.open("job_404")
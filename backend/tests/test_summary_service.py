@@ -0,0 +1,69 @@
+import pytest
+
+from api.services.conversation_store import ConversationStore
+from api.services.summary_service import SummaryService
+
+KEY = ("alice", 1)
+
+
+class RecordingLLM:
+    def __init__(self):
+        self.calls = []
+
+    async def generate_incremental_summary(self, previous, messages):
+        self.calls.append((previous, [m["content"] for m in messages]))
+        return f"{previous or ''}|{','.join(m['content'] for m in messages)}"
+
+
+@pytest.mark.asyncio
+async def test_summary_folds_only_new_messages():
+    store = ConversationStore()
+    llm = RecordingLLM()
+    service = SummaryService(store=store, llm_service=llm, min_batch=2)
+
+    store.append(KEY, "user", "a")
+    assert service.schedule_update(KEY) is None  # below batch threshold
+    store.append(KEY, "assistant", "b")
+    await service.schedule_update(KEY)
+
+    store.append(KEY, "user", "c")
+    store.append(KEY, "assistant", "d")
+    await service.schedule_update(KEY)
+
+    assert llm.calls == [(None, ["a", "b"]), ("|a,b", ["c", "d"])]
+    summary = service.get(KEY)
+    assert summary.message_count == 4
+    assert summary.text == "|a,b|c,d"
+    assert service.pending_messages(KEY) == 0
+
+
+@pytest.mark.asyncio
+async def test_summary_failure_keeps_previous_version():
+    class FailingLLM:
+        async def generate_incremental_summary(self, previous, messages):
+            return "Error: quota exceeded"
+
+    store = ConversationStore()
+    service = SummaryService(store=store, llm_service=FailingLLM(), min_batch=1)
+    store.append(KEY, "user", "hello")
+    await service.schedule_update(KEY)
+
+    assert service.get(KEY) is None
+    assert service.pending_messages(KEY) == 1
+
+
+@pytest.mark.asyncio
+async def test_evicting_a_conversation_drops_its_summary():
+    store = ConversationStore(max_conversations=1)
+    llm = RecordingLLM()
+    service = SummaryService(store=store, llm_service=llm, min_batch=1)
+    store.append(KEY, "user", "a")
+    store.append(KEY, "assistant", "b")
+    await service.schedule_update(KEY)
+
+    store.append(("bob", 1), "user", "x")  # evicts alice's conversation
+    assert service.get(KEY) is None
+    store.append(KEY, "user", "c")
+    assert service.pending_messages(KEY) == 1
+    await service.schedule_update(KEY)
+    assert llm.calls[-1] == (None, ["c"])
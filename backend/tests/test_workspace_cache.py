@@ -0,0 +1,100 @@
+import os
+import threading
+
+from modules.workspace_cache import WorkspaceCache, workspace_key
+
+
+def _build_project(staging):
+    (staging / "domain_Bow").mkdir()
+    (staging / "domain_Bow" / "settings.txt").write_text("x" * 100)
+
+
+def test_key_ignores_job_specific_config():
+    base = {"DOMAIN_NAME": "Bow", "EXPERIMENT_ID": "delta_job_1", "CONFLUENCE_DATA_DIR": "/tmp/a"}
+    other_job = dict(base, EXPERIMENT_ID="delta_job_2", CONFLUENCE_DATA_DIR="/tmp/b")
+    assert workspace_key("Bow", "SUMMA", base) == workspace_key("Bow", "SUMMA", other_job)
+    assert workspace_key("Bow", "SUMMA", base) != workspace_key("Bow", "FUSE", base)
+
+
+def test_build_once_and_clone_for_each_job(tmp_path):
+    cache = WorkspaceCache(str(tmp_path / "cache"), max_bytes=10_000)
+    builds = []
+
+    def build(staging):
+        builds.append(staging)
+        _build_project(staging)
+
+    first, second = tmp_path / "job1", tmp_path / "job2"
+    first.mkdir()
+    second.mkdir()
+    assert cache.materialize("k1", build, first) is False
+    assert cache.materialize("k1", build, second) is True
+
+    assert len(builds) == 1
+    cloned = second / "domain_Bow" / "settings.txt"
+    assert cloned.read_text() == "x" * 100
+    # Cached files are read-only; small files are private copies the job may edit in place.
+    cached_mode = (cache.lookup("k1") / "domain_Bow" / "settings.txt").stat().st_mode
+    assert cached_mode & 0o222 == 0
+    with open(cloned, "a") as f:
+        f.write("y")
+    assert (first / "domain_Bow" / "settings.txt").read_text() == "x" * 100
+    assert WorkspaceCache(str(tmp_path / "cache"), max_bytes=10_000).stats()["hits"] == 1
+
+
+def test_clones_rebase_paths_into_the_job_workspace(tmp_path):
+    cache = WorkspaceCache(str(tmp_path / "cache"), max_bytes=10_000, copy_max_bytes=4096)
+
+    def build(staging):
+        settings = staging / "domain_Bow" / "settings"
+        settings.mkdir(parents=True)
+        (settings / "fileManager.txt").write_text(f"settingsPath '{settings}/'\n")
+        (settings / "forcing.bin").write_bytes(b"\0" * 8192)
+        os.symlink(settings / "fileManager.txt", staging / "fileManager.txt")
+
+    dest = tmp_path / "job"
+    dest.mkdir()
+    cache.materialize("k", build, dest)
+
+    settings = dest / "domain_Bow" / "settings"
+    assert (settings / "fileManager.txt").read_text() == f"settingsPath '{settings}/'\n"
+    assert os.readlink(dest / "fileManager.txt") == str(settings / "fileManager.txt")
+    # Larger files are linked, so they stay read-only.
+    assert os.stat(settings / "forcing.bin").st_mode & 0o222 == 0
+
+
+def test_concurrent_builders_share_one_build(tmp_path):
+    cache = WorkspaceCache(str(tmp_path / "cache"), max_bytes=10_000)
+    builds = []
+    barrier = threading.Barrier(4)
+
+    def build(staging):
+        builds.append(1)
+        _build_project(staging)
+
+    def job(index):
+        dest = tmp_path / f"job{index}"
+        dest.mkdir()
+        barrier.wait()
+        cache.materialize("shared", build, dest)
+
+    threads = [threading.Thread(target=job, args=(i,)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(builds) == 1
+    assert all((tmp_path / f"job{i}" / "domain_Bow" / "settings.txt").exists() for i in range(4))
+
+
+def test_lru_eviction_respects_budget(tmp_path):
+    cache = WorkspaceCache(str(tmp_path / "cache"), max_bytes=250)
+    for key in ("a", "b", "c"):
+        cache.get_or_build(key, _build_project)
+        os.utime(tmp_path / "cache" / key / ".delta_ready.json", (0, {"a": 1, "b": 3, "c": 2}[key]))
+    cache.get_or_build("d", _build_project)
+
+    remaining = {entry["key"] for entry in cache.entries()}
+    assert remaining == {"b", "d"}
+    assert cache.stats()["total_bytes"] <= 250
@@ -1,6 +1,8 @@
 # backend/utils/config.py
+import os
+import tempfile
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from utils.settings import get_env
 
@@ -28,11 +30,77 @@ class Settings:
     hydro_model_base_url: str
     symfluence_code_dir: Optional[str]
     symfluence_data_dir: Optional[str]
+    workspace_cache_dir: Optional[str]
+    workspace_cache_max_mb: int
+    result_store_dir: str
+    forcing_cache_dir: Optional[str]
+    forcing_time_chunk: int
+    forcing_space_chunk: int
+    result_query_max_values: int
 
     allowed_origins: List[str]
+    # Users who may see and cancel every job and manage shared indexes.
+    admin_users: List[str]
+
+    database_url: str
+    job_workers: int
+    job_poll_interval: float
+    job_log_flush_lines: int
+    job_log_flush_interval: float
+    job_cancel_check_interval: float
+    job_events_poll_interval: float
+    job_cpu_limit: int
+    job_memory_limit_mb: int
+    job_timeout: float
+    job_kill_check_interval: float
+    job_preload: bool
+    job_worker_max_jobs: int
+    job_worker_max_rss_mb: int
+    job_profile: bool
+    job_stats_window: int
+    job_workspace_dir: str
+    job_max_attempts: int
+    job_lease_seconds: float
+    worker_domains: List[str]
+    worker_job_types: List[str]
+    job_max_running_per_user: int
+    job_user_weights: Dict[str, float]
+    ensemble_max_members: int
+    ensemble_parallelism: Optional[int]
+    calibration_workers: int
+    calibration_max_evaluations: int
+    calibration_checkpoint_dir: str
+    calibration_checkpoint_interval: float
 
     jwt_secret_key: str
     jwt_algorithm: str
+    jwt_jwks_path: Optional[str]
+    jwt_private_key_path: Optional[str]
+    jwt_key_id: str
+    jwt_cache_size: int
+    jwt_cache_ttl: float
+
+    # Admission control for generation endpoints
+    admission_max_concurrency: int
+    admission_max_queue: int
+    admission_max_queued_per_user: int
+    admission_queue_timeout: float
+
+    # In-memory conversation history
+    chat_history_window: int
+    chat_max_conversations: int
+    knowledge_dir: Optional[str]
+    embedder: str
+    embedding_dim: int
+    embedding_index_dir: str
+    embedding_ann_min_rows: int
+    embedding_answers_max: int
+    # Semantic answer cache for LLM replies
+    answer_cache_size: int
+    answer_cache_ttl: float
+    answer_cache_threshold: float
+    answer_cache_thresholds: Dict[str, float]
+    answer_cache_sample_rate: float
 
     @classmethod
     def from_env(cls) -> "Settings":
@@ -59,6 +127,20 @@ class Settings:
                 "SYMFLUENCE_DATA_DIR",
                 "/Users/darrieythorsson/compHydro/data/SYMFLUENCE_data",
             ),
+            workspace_cache_dir=get_env(
+                "WORKSPACE_CACHE_DIR",
+                os.path.join(tempfile.gettempdir(), "delta_workspace_cache"),
+            ),
+            workspace_cache_max_mb=int(get_env("WORKSPACE_CACHE_MAX_MB", "10240")),
+            result_store_dir=get_env("RESULT_STORE_DIR", "./delta_results"),
+            forcing_cache_dir=get_env(
+                "FORCING_CACHE_DIR",
+                os.path.join(tempfile.gettempdir(), "delta_forcing_cache"),
+            ),
+            forcing_time_chunk=int(get_env("FORCING_TIME_CHUNK", "720")),
+            forcing_space_chunk=int(get_env("FORCING_SPACE_CHUNK", "64")),
+            result_query_max_values=int(get_env("RESULT_QUERY_MAX_VALUES", "1000000")),
+            admin_users=[u.strip() for u in get_env("ADMIN_USERS", "").split(",") if u.strip()],
             allowed_origins=get_env(
                 "ALLOWED_ORIGINS",
                 ",".join(
@@ -74,8 +156,85 @@ class Settings:
                     ]
                 ),
             ).split(","),
+            database_url=get_env("DATABASE_URL", "sqlite:///./delta.db"),
+            job_workers=int(get_env("JOB_WORKERS", "2")),
+            job_poll_interval=float(get_env("JOB_POLL_INTERVAL", "1.0")),
+            job_log_flush_lines=int(get_env("JOB_LOG_FLUSH_LINES", "50")),
+            job_log_flush_interval=float(get_env("JOB_LOG_FLUSH_INTERVAL", "2.0")),
+            job_cancel_check_interval=float(get_env("JOB_CANCEL_CHECK_INTERVAL", "5.0")),
+            job_events_poll_interval=float(get_env("JOB_EVENTS_POLL_INTERVAL", "0.5")),
+            job_cpu_limit=int(get_env("JOB_CPU_LIMIT", "0")),
+            job_memory_limit_mb=int(get_env("JOB_MEMORY_LIMIT_MB", "0")),
+            job_timeout=float(get_env("JOB_TIMEOUT", "0")),
+            job_kill_check_interval=float(get_env("JOB_KILL_CHECK_INTERVAL", "1.0")),
+            job_preload=get_env("JOB_PRELOAD", "true").lower() in ("1", "true", "yes"),
+            job_worker_max_jobs=int(get_env("JOB_WORKER_MAX_JOBS", "200")),
+            job_worker_max_rss_mb=int(get_env("JOB_WORKER_MAX_RSS_MB", "1024")),
+            job_profile=get_env("JOB_PROFILE", "false").lower() in ("1", "true", "yes"),
+            job_stats_window=int(get_env("JOB_STATS_WINDOW", "1000")),
+            job_workspace_dir=get_env(
+                "JOB_WORKSPACE_DIR",
+                os.path.join(tempfile.gettempdir(), "delta_workspaces"),
+            ),
+            job_max_attempts=int(get_env("JOB_MAX_ATTEMPTS", "3")),
+            job_lease_seconds=float(get_env("JOB_LEASE_SECONDS", "60")),
+            worker_domains=[d.strip() for d in get_env("WORKER_DOMAINS", "").split(",") if d.strip()],
+            worker_job_types=[t.strip() for t in get_env("WORKER_JOB_TYPES", "").split(",") if t.strip()],
+            job_max_running_per_user=int(get_env("JOB_MAX_RUNNING_PER_USER", "0")),
+            # e.g. "alice=2,bob=0.5"; users not listed weigh 1.
+            job_user_weights={
+                user.strip(): float(weight)
+                for user, weight in (
+                    item.split("=", 1) for item in get_env("JOB_USER_WEIGHTS", "").split(",") if "=" in item
+                )
+            },
+            ensemble_max_members=int(get_env("ENSEMBLE_MAX_MEMBERS", "256")),
+            ensemble_parallelism=int(get_env("ENSEMBLE_PARALLELISM", "0")) or None,
+            calibration_workers=int(get_env("CALIBRATION_WORKERS", "0")),
+            calibration_max_evaluations=int(get_env("CALIBRATION_MAX_EVALUATIONS", "10000")),
+            calibration_checkpoint_dir=get_env(
+                "CALIBRATION_CHECKPOINT_DIR",
+                os.path.join(tempfile.gettempdir(), "delta_calibration"),
+            ),
+            calibration_checkpoint_interval=float(get_env("CALIBRATION_CHECKPOINT_INTERVAL", "5.0")),
             jwt_secret_key=get_env("JWT_SECRET_KEY", "09d25e094faa6ca2556c818166b7a9563b93f7099f6f0f4caa6cf63b88e8d3e7"),
             jwt_algorithm=get_env("JWT_ALGORITHM", "HS256"),
+            jwt_jwks_path=get_env("JWT_JWKS_PATH"),
+            jwt_private_key_path=get_env("JWT_PRIVATE_KEY_PATH"),
+            jwt_key_id=get_env("JWT_KEY_ID", "delta-signing-key"),
+            jwt_cache_size=int(get_env("JWT_CACHE_SIZE", "4096")),
+            jwt_cache_ttl=float(get_env("JWT_CACHE_TTL", "300")),
+            admission_max_concurrency=int(get_env("ADMISSION_MAX_CONCURRENCY", "16")),
+            admission_max_queue=int(get_env("ADMISSION_MAX_QUEUE", "64")),
+            admission_max_queued_per_user=int(get_env("ADMISSION_MAX_QUEUED_PER_USER", "8")),
+            admission_queue_timeout=float(get_env("ADMISSION_QUEUE_TIMEOUT", "30")),
+            chat_history_window=int(get_env("CHAT_HISTORY_WINDOW", "20")),
+            chat_max_conversations=int(get_env("CHAT_MAX_CONVERSATIONS", "10000")),
+            # Extra Markdown documents indexed next to the bundled knowledge base.
+            knowledge_dir=get_env("KNOWLEDGE_DIR") or None,
+            # "hashing" (offline) or "module:factory" returning an embedder.
+            embedder=get_env("EMBEDDER", "hashing"),
+            embedding_dim=int(get_env("EMBEDDING_DIM", "512")),
+            embedding_index_dir=get_env(
+                "EMBEDDING_INDEX_DIR",
+                os.path.join(tempfile.gettempdir(), "delta_embeddings"),
+            ),
+            embedding_ann_min_rows=int(get_env("EMBEDDING_ANN_MIN_ROWS", "50000")),
+            # Earlier answers kept for grounding; the oldest are compacted away.
+            embedding_answers_max=int(get_env("EMBEDDING_ANSWERS_MAX", "20000")),
+            # Entries kept per role; 0 disables the cache.
+            answer_cache_size=int(get_env("ANSWER_CACHE_SIZE", "2048")),
+            answer_cache_ttl=float(get_env("ANSWER_CACHE_TTL", "86400")),
+            answer_cache_threshold=float(get_env("ANSWER_CACHE_THRESHOLD", "0.95")),
+            # e.g. "EDUCATIONAL=0.9"; roles not listed use ANSWER_CACHE_THRESHOLD.
+            answer_cache_thresholds={
+                role.strip(): float(threshold)
+                for role, threshold in (
+                    item.split("=", 1) for item in get_env("ANSWER_CACHE_THRESHOLDS", "").split(",") if "=" in item
+                )
+            },
+            # Fraction of hits regenerated anyway to measure false hits.
+            answer_cache_sample_rate=float(get_env("ANSWER_CACHE_SAMPLE_RATE", "0.02")),
         )
 
 
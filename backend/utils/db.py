@@ -0,0 +1,81 @@
+# backend/utils/db.py
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from utils.config import get_settings
+
+_ENGINE: Optional[Engine] = None
+_SESSION_LOCAL: Optional[Callable[[], Session]] = None
+_ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+
+
+def create_db_engine(database_url: str) -> Engine:
+    """Create an engine; SQLite gets WAL mode so worker processes can share it."""
+    if database_url.startswith("sqlite"):
+        engine = create_engine(
+            database_url,
+            connect_args={"check_same_thread": False, "timeout": 30},
+        )
+
+        @event.listens_for(engine, "connect")
+        def _sqlite_pragmas(dbapi_connection, _record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute("PRAGMA busy_timeout=30000")
+            cursor.close()
+
+        return engine
+    return create_engine(database_url, pool_pre_ping=True)
+
+
+def get_engine() -> Engine:
+    global _ENGINE
+    if _ENGINE is None:
+        _ENGINE = create_db_engine(get_settings().database_url)
+    return _ENGINE
+
+
+def get_session_local() -> Callable[[], Session]:
+    global _SESSION_LOCAL
+    if _SESSION_LOCAL is None:
+        _SESSION_LOCAL = sessionmaker(bind=get_engine(), autoflush=False, expire_on_commit=False)
+    return _SESSION_LOCAL
+
+
+def init_db(engine: Optional[Engine] = None) -> None:
+    """Upgrade the schema to the newest alembic revision (see ``alembic/versions``)."""
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(str(_ALEMBIC_INI))
+    config.set_main_option("script_location", str(_ALEMBIC_INI.parent / "alembic"))
+    with (engine or get_engine()).begin() as connection:
+        config.attributes["connection"] = connection
+        command.upgrade(config, "head")
+
+
+def get_db() -> Iterator[Session]:
+    """FastAPI dependency yielding a session that is closed after the request."""
+    db = get_session_local()()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def dispose_engine() -> None:
+    """Forget the cached engine and session factory.
+
+    Forked processes call this first so they open their own connections; the
+    inherited ones are left for the parent to close.
+    """
+    global _ENGINE, _SESSION_LOCAL
+    if _ENGINE is not None:
+        _ENGINE.dispose(close=False)
+    _ENGINE = None
+    _SESSION_LOCAL = None
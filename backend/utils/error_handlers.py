@@ -13,11 +13,18 @@ log = logging.getLogger(__name__)
 
 class DeltaError(Exception):
     """Base class for DELTA-specific errors."""
-    def __init__(self, message: str, status_code: int = 500, error_code: Optional[str] = None):
+    def __init__(
+        self,
+        message: str,
+        status_code: int = 500,
+        error_code: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ):
         super().__init__(message)
         self.message = message
         self.status_code = status_code
         self.error_code = error_code
+        self.headers = headers
 
 class ValidationError(DeltaError):
     def __init__(self, message: str):
@@ -39,6 +46,20 @@ class AuthenticationError(DeltaError):
     def __init__(self, message: str = "Authentication failed"):
         super().__init__(message, status_code=401, error_code="AUTH_FAILED")
 
+class ConfigurationError(DeltaError):
+    def __init__(self, message: str):
+        super().__init__(message, status_code=500, error_code="CONFIGURATION_ERROR")
+
+class OverloadedError(DeltaError):
+    def __init__(self, message: str = "Server is at capacity, please retry", retry_after: int = 1):
+        super().__init__(
+            message,
+            status_code=429,
+            error_code="OVERLOADED",
+            headers={"Retry-After": str(max(1, int(retry_after)))}
+        )
+        self.retry_after = retry_after
+
 def register_exception_handlers(app, logger=None) -> None:
     current_log = logger or log
 
@@ -50,7 +71,7 @@ def register_exception_handlers(app, logger=None) -> None:
             "message": exc.message,
             "error_code": exc.error_code
         }
-        return JSONResponse(status_code=exc.status_code, content=content)
+        return JSONResponse(status_code=exc.status_code, content=content, headers=exc.headers)
 
     @app.exception_handler(HTTPException)
     async def http_exception_handler(request: Request, exc: HTTPException):
@@ -60,7 +81,11 @@ def register_exception_handlers(app, logger=None) -> None:
             "message": str(exc.detail),
             "error_code": f"HTTP_{exc.status_code}"
         }
-        return JSONResponse(status_code=exc.status_code, content=content)
+        return JSONResponse(
+            status_code=exc.status_code,
+            content=content,
+            headers=getattr(exc, "headers", None)
+        )
 
     @app.exception_handler(Exception)
     async def global_exception_handler(request: Request, exc: Exception):
@@ -0,0 +1,43 @@
+# backend/utils/file_lock.py
+import errno
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Union
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+
+class LockUnavailable(Exception):
+    """Raised when a non-blocking lock is already held elsewhere."""
+
+
+@contextmanager
+def file_lock(path: Union[str, Path], shared: bool = False, blocking: bool = True) -> Iterator[None]:
+    """Advisory ``flock`` on ``path`` shared between threads and processes.
+
+    Falls back to a no-op where ``fcntl`` is unavailable, which is only safe
+    for single-process deployments.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            flags = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+            if not blocking:
+                flags |= fcntl.LOCK_NB
+            try:
+                fcntl.flock(fd, flags)
+            except OSError as e:
+                if e.errno in (errno.EAGAIN, errno.EWOULDBLOCK, errno.EACCES):
+                    raise LockUnavailable(str(path)) from e
+                raise
+        yield
+    finally:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
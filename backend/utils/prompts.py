@@ -66,6 +66,15 @@ You are DELTA, an AI assistant specializing in hydrological education. Your role
 **Remember:** Your goal is to make learning about hydrology accessible, engaging, and enjoyable for users of all levels.
 """
 
+EDUCATIONAL_GROUNDING_TEMPLATE = """
+
+**Reference Material:**
+
+The passages below come from DELTA's hydrology knowledge base and were retrieved for this question. Base your explanation on them where they are relevant, cite them as [1], [2], ..., and say so when they do not cover the question rather than guessing.
+
+{passages}
+"""
+
 INDRA_CHAIRPERSON_PROMPT = """
 You are the Chairperson of INDRA, an expert system for hydrological modeling.
 You guide users through the process of setting up and running simulations.
@@ -76,4 +85,10 @@ MARTY_SYSTEM_PROMPT = """
 You are MARTy, a conversational AI assistant for hydrological research.
 You can interact with users via voice or text.
 ... (add detailed instructions for the MARTy role) ...
-"""
\ No newline at end of file
+"""
+# Provider replies that report a failure rather than answer the question.
+FAILED_REPLY_PREFIXES = ("Error:", "I'm sorry, I couldn't generate a response")
+
+
+def is_failed_reply(text: str) -> bool:
+    return not text.strip() or text.lstrip().startswith(FAILED_REPLY_PREFIXES)
@@ -165,5 +165,77 @@ export const apiClient = {
     }
     
     return result;
+  },
+
+  /**
+   * Consume a GET server-sent-events endpoint, invoking onEvent per frame.
+   * Resolves when the server closes the stream or the signal aborts it.
+   */
+  async events(
+    endpoint: string,
+    onEvent: (event: { id?: string; event: string; data: any }) => void,
+    signal?: AbortSignal
+  ): Promise<void> {
+    const response = await fetchWithRetry(`${API_BASE_URL}${endpoint}`, {
+      headers: { Accept: 'text/event-stream' },
+      signal,
+    });
+
+    if (!response.ok) {
+      let errorData: ApiErrorData;
+      try {
+        errorData = await response.json();
+      } catch (e) {
+        errorData = { message: `Stream Error ${response.status}` };
+      }
+      throw new ApiError(response.status, errorData);
+    }
+
+    if (!response.body) {
+      throw new Error('Response body is null');
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+
+      buffer += decoder.decode(value, { stream: true });
+      const frames = buffer.split('\n\n');
+      buffer = frames.pop() || '';
+
+      for (const frame of frames) {
+        let id: string | undefined;
+        let event = 'message';
+        let data = '';
+        for (const line of frame.split('\n')) {
+          if (line.startsWith('id: ')) id = line.slice(4);
+          else if (line.startsWith('event: ')) event = line.slice(7);
+          else if (line.startsWith('data: ')) data += line.slice(6);
+        }
+        if (!data) continue; // keep-alive comment
+        try {
+          onEvent({ id, event, data: JSON.parse(data) });
+        } catch (e) {
+          onEvent({ id, event, data });
+        }
+      }
+    }
+  },
+
+  /**
+   * GET a binary payload as an ArrayBuffer together with the response headers.
+   */
+  async binary(endpoint: string): Promise<{ buffer: ArrayBuffer; headers: Headers }> {
+    const response = await fetchWithRetry(`${API_BASE_URL}${endpoint}`, {
+      headers: { Accept: 'application/octet-stream' },
+    });
+    if (!response.ok) {
+      await handleResponse(response);
+    }
+    return { buffer: await response.arrayBuffer(), headers: response.headers };
   }
 };
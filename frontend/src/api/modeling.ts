@@ -3,6 +3,10 @@ import { apiClient } from './client';
 export interface ModelingJobResponse {
   message: string;
   job_id: number;
+  /** True when an identical queued, running or completed job was returned instead. */
+  reused?: boolean;
+  status?: string;
+  result?: any;
 }
 
 export interface JobStatusResponse {
@@ -13,22 +17,66 @@ export interface JobStatusResponse {
   parameters: any;
   created_at: string;
   updated_at: string;
+  metrics?: JobMetrics | null;
+  priority?: string | null;
+}
+
+export interface QueuedJob extends JobStatusResponse {
+  /** 1-based position in scheduling order; null once the job is running. */
+  queue_position: number | null;
+  estimated_start: string | null;
+}
+
+export interface JobMetrics {
+  wall_seconds: number;
+  phases: Record<string, number>;
+  completed: boolean;
+  warm?: boolean | null;
+  exit_code?: number | null;
+  cpu_user_seconds?: number;
+  cpu_system_seconds?: number;
+  peak_rss_mb?: number;
+  io_read_bytes?: number;
+  io_write_bytes?: number;
+  profile?: { function: string; calls: number; total_seconds: number; cumulative_seconds: number }[];
+}
+
+export interface MetricDistribution {
+  mean: number;
+  p50: number;
+  p95: number;
+  max: number;
+}
+
+export interface JobStats {
+  window: number;
+  types: Record<string, {
+    jobs: number;
+    phases: Record<string, MetricDistribution>;
+    [metric: string]: any;
+  }>;
 }
 
 /**
  * Submit a modeling job to the backend.
  * @param {string} model - The model to run (e.g., 'SUMMA').
  * @param {string} type - The job type (default 'SIMULATION').
+ * @param {boolean} force - Run again even if an identical job exists.
  * @returns {Promise<ModelingJobResponse>} The response data containing job_id.
  */
-export async function submitModelingJob(model: string, type: string = 'SIMULATION'): Promise<ModelingJobResponse> {
+export async function submitModelingJob(
+  model: string,
+  type: string = 'SIMULATION',
+  force: boolean = false
+): Promise<ModelingJobResponse> {
   try {
     return await apiClient.post<ModelingJobResponse>('/run_modeling', {
       type,
       parameters: {
         model,
         watershed: "Bow_at_Banff_lumped",
-      }
+      },
+      ...(force ? { force: true } : {}),
     });
   } catch (error) {
     console.error('submitModelingJob exception:', error);
@@ -42,4 +90,120 @@ export async function submitModelingJob(model: string, type: string = 'SIMULATIO
  */
 export async function getJobStatus(jobId: number): Promise<JobStatusResponse> {
   return await apiClient.get<JobStatusResponse>(`/jobs/${jobId}`);
-}
\ No newline at end of file
+}
+
+/**
+ * Resource metrics aggregated by job type over recently finished jobs.
+ * @param {number} window - How many of the most recent jobs to include.
+ */
+export async function getJobStats(window?: number): Promise<JobStats> {
+  const query = window ? `?window=${window}` : '';
+  return await apiClient.get<JobStats>(`/jobs/stats${query}`);
+}
+
+/**
+ * Running jobs, then queued jobs with their queue position and estimated start.
+ */
+export async function getPendingJobs(): Promise<QueuedJob[]> {
+  return await apiClient.get<QueuedJob[]>('/jobs/pending');
+}
+
+export interface JobEvent {
+  id?: string;
+  event: 'log' | 'status' | 'gap' | 'end' | string;
+  data: any;
+}
+
+/**
+ * Subscribe to live log lines and status changes for a job.
+ * Only new lines are sent; pass the last seen event id as `cursor` to resume.
+ * @returns {AbortController} Call `abort()` to stop listening.
+ */
+export function subscribeJobEvents(
+  jobId: number,
+  onEvent: (event: JobEvent) => void,
+  cursor?: string
+): AbortController {
+  const controller = new AbortController();
+  const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+  apiClient
+    .events(`/jobs/${jobId}/events${query}`, onEvent, controller.signal)
+    .catch((error) => {
+      if (error?.name !== 'AbortError') {
+        console.error('subscribeJobEvents exception:', error);
+      }
+    });
+  return controller;
+}
+export interface JobResultsInfo {
+  variables: string[];
+  hru_ids: (number | string)[];
+  time_steps: number;
+  start: string | null;
+  end: string | null;
+  attrs: Record<string, any>;
+}
+
+export interface JobResultsSlice {
+  time: string[];
+  hru_ids: (number | string)[];
+  values: Record<string, number[][]>;
+}
+
+export interface JobResultsQuery {
+  variables?: string[];
+  start?: string;
+  end?: string;
+  hrus?: (number | string)[];
+}
+
+/**
+ * Describe the stored output time series of a finished job.
+ * @param {number} jobId - The job ID.
+ */
+export async function getJobResults(jobId: number): Promise<JobResultsInfo> {
+  return await apiClient.get<JobResultsInfo>(`/jobs/${jobId}/results`);
+}
+
+/**
+ * Read only the requested variables, time range and HRUs of a job's outputs.
+ * Values are indexed `[time][hru]`.
+ */
+export async function queryJobResults(jobId: number, query: JobResultsQuery = {}): Promise<JobResultsSlice> {
+  const params = new URLSearchParams();
+  if (query.variables?.length) params.set('variables', query.variables.join(','));
+  if (query.start) params.set('start', query.start);
+  if (query.end) params.set('end', query.end);
+  query.hrus?.forEach((hru) => params.append('hru', String(hru)));
+  const suffix = params.toString() ? `?${params}` : '';
+  return await apiClient.get<JobResultsSlice>(`/jobs/${jobId}/results/query${suffix}`);
+}
+
+export interface JobSeries {
+  /** Epoch milliseconds. */
+  time: Float64Array;
+  values: Float32Array;
+}
+
+/**
+ * Fetch one variable/HRU downsampled to about `width` points for a chart.
+ * Uses the packed binary encoding: float64 epoch ms followed by float32 values.
+ */
+export async function getJobSeries(
+  jobId: number,
+  variable: string,
+  options: { hru?: number | string; start?: string; end?: string; width?: number; method?: 'minmax' | 'lttb' } = {}
+): Promise<JobSeries> {
+  const params = new URLSearchParams({ variable, format: 'binary' });
+  if (options.hru !== undefined) params.set('hru', String(options.hru));
+  if (options.start) params.set('start', options.start);
+  if (options.end) params.set('end', options.end);
+  if (options.width) params.set('width', String(options.width));
+  if (options.method) params.set('method', options.method);
+  const { buffer, headers } = await apiClient.binary(`/jobs/${jobId}/results/series?${params}`);
+  const length = Number(headers.get('X-Series-Length') ?? buffer.byteLength / 12);
+  return {
+    time: new Float64Array(buffer, 0, length),
+    values: new Float32Array(buffer, length * 8, length),
+  };
+}
@@ -29,26 +29,38 @@ const ConversationContext = createContext<ConversationContextType | undefined>(u
 
 export const ConversationProvider: React.FC<{ children: ReactNode }> = ({ children }) => {
   console.log("DELTA: ConversationProvider rendering");
-  const [currentConversationId, setCurrentConversationId] = useState<number | null>(999);
+  const [currentConversationId, setCurrentConversationId] = useState<number | null>(null);
   const [conversationHistory, dispatch] = useReducer(conversationReducer, []);
   const [activeMode, setActiveMode] = useState<string>('general');
   const [isLoading, setIsLoading] = useState<boolean>(false);
   const [error, setError] = useState<string | null>(null);
 
+  const allocateConversationId = useCallback(async (mode: string): Promise<number> => {
+    try {
+      const created = await apiClient.post<Conversation>('/conversations/', { active_mode: mode });
+      return created.id;
+    } catch (err) {
+      // Anonymous sessions cannot allocate ids; the server scopes their
+      // history by client address, so a random id only has to be unique here.
+      console.warn("DELTA: Could not allocate a conversation id, using a local one:", err);
+      return Math.floor(Math.random() * 2 ** 31);
+    }
+  }, []);
+
   const createNewConversation = useCallback(async (mode: string, userId = 101): Promise<number | null> => {
     setIsLoading(true);
     setError(null);
-    console.log("DELTA: Creating stateless session for mode:", mode);
+    console.log("DELTA: Creating session for mode:", mode);
     try {
-      // Mock conversation establishment
-      setCurrentConversationId(999);
+      const id = await allocateConversationId(mode);
+      setCurrentConversationId(id);
       dispatch({ type: "reset" });
       setActiveMode(mode);
-      return 999;
+      return id;
     } finally {
       setIsLoading(false);
     }
-  }, []);
+  }, [allocateConversationId]);
 
   const addMessage = useCallback((role: 'user' | 'assistant' | 'model', content: string) => {
     dispatch({ type: "add", message: { role, content } });
@@ -67,6 +79,11 @@ export const ConversationProvider: React.FC<{ children: ReactNode }> = ({ childr
     addMessage('user', text);
     
     try {
+      let conversationId = currentConversationId;
+      if (conversationId === null) {
+        conversationId = await allocateConversationId(activeMode);
+        setCurrentConversationId(conversationId);
+      }
       let fullResponse = '';
       dispatch({ type: "start_assistant_message" });
 
@@ -76,7 +93,7 @@ export const ConversationProvider: React.FC<{ children: ReactNode }> = ({ childr
 
       await apiClient.stream('/process_stream', { 
         user_input: text, 
-        conversation_id: 999 
+        conversation_id: conversationId
       }, (chunk: string) => {
         fullResponse += chunk;
         updateMessage(fullResponse);
@@ -93,7 +110,7 @@ export const ConversationProvider: React.FC<{ children: ReactNode }> = ({ childr
     } finally {
       setIsLoading(false);
     }
-  }, [addMessage]);
+  }, [addMessage, allocateConversationId, activeMode, currentConversationId]);
 
   const value: ConversationContextType = {
     currentConversationId,
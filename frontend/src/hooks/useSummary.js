@@ -10,7 +10,7 @@ export const useSummary = ({ currentConversationId, setIsProcessing }) => {
     try {
       setIsProcessing(true);
       const summary = await apiClient.get(`/summary/${currentConversationId}`);
-      setSummaryText(summary);
+      setSummaryText(summary?.summary || "No summary available yet.");
       setShowSummaryModal(true);
     } catch (error) {
       console.error("Summary Error:", error);